@@ -1,4 +1,11 @@
 import arcpy
+import os
+import sys
+
+# Make the helper modules (and the geodesic kernel of exercise 5) importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "exercise_5"))
+from nearest_stop import NearestStopIndex, read_input_points
 
 # Set the workspace environment (you might want to make this dynamic or set it within the tool properties later)
 arcpy.env.workspace = r"arcpy2.gdb"
@@ -29,37 +36,23 @@ def find_nearest_bus_stop():
             arcpy.AddError(f"Bus stops feature class {bus_stops_fc} does not exist!")
             return
 
-        # Run the Near analysis
+        # Read the bus stops and their names once and index them (the input is not modified)
         arcpy.AddMessage("Finding nearest bus stop...")
-        # Note: The Near tool adds fields to the input feature class [cite: 13]
-        arcpy.Near_analysis(
-            in_features=input_point_fc,
-            near_features=bus_stops_fc,
-            search_radius="#",  # No search radius limit
-            location="NO_LOCATION",
-            angle="NO_ANGLE",
-            method="GEODESIC"
-        )
-
-        # Use arcpy.da.SearchCursor to extract the distance and ObjectID [cite: 14]
-        # Get the distance and nearest bus stop ID from the input feature
-        with arcpy.da.SearchCursor(input_point_fc, ["NEAR_DIST", "NEAR_FID"]) as cursor:
-            for row in cursor:
-                near_distance = row[0]
-                near_fid = row[1]
-                break  # We only need the first row since we're working with a single point
+        stop_index = NearestStopIndex.from_feature_class(bus_stops_fc, "NAME")
+        if len(stop_index) == 0:
+            arcpy.AddError(f"Bus stops feature class {bus_stops_fc} has no stops!")
+            return
 
-        # Use a SearchCursor on 'stops_ms_mitte' with a where clause to get the name [cite: 15]
-        # Get the bus stop name using the NEAR_FID
-        with arcpy.da.SearchCursor(bus_stops_fc, ["NAME"], f"OBJECTID = {near_fid}") as cursor:
-            for row in cursor:
-                bus_stop_name = row[0]
-                break
+        # Geodesic distance to the nearest stop for all input points in one query
+        point_ids, lon, lat = read_input_points(input_point_fc)
+        distances, positions = stop_index.nearest(lon, lat)
 
         # Output the results to the Geoprocessing Window using arcpy.AddMessage [cite: 6]
-        arcpy.AddMessage(f"\nNearest bus stop found:")
-        arcpy.AddMessage(f"Bus Stop Name: {bus_stop_name}")
-        arcpy.AddMessage(f"Distance: {near_distance:.2f} meters")
+        for point_id, near_distance, position in zip(point_ids, distances[:, 0], positions[:, 0]):
+            _, bus_stop_name = stop_index.stop(position)
+            arcpy.AddMessage(f"\nNearest bus stop found:" if len(point_ids) == 1 else f"\nNearest bus stop found for point {point_id}:")
+            arcpy.AddMessage(f"Bus Stop Name: {bus_stop_name}")
+            arcpy.AddMessage(f"Distance: {near_distance:.2f} meters")
 
     except Exception as e:
         arcpy.AddError(f"An error occurred: {str(e)}")
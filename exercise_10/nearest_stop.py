@@ -0,0 +1,293 @@
+"""
+Nearest bus stop engine (exercises 10 and 11).
+
+The stops are read once into memory (coordinates and names) and indexed
+with a KD-tree, then k-nearest and radius queries are answered for many
+input points at once. Unlike arcpy.Near_analysis nothing is written to the
+input feature class, and the stop names need no second cursor.
+
+The tree is built over 3D unit-sphere coordinates, so it works for
+longitude/latitude anywhere. The candidates it returns are ranked by their
+ellipsoidal distance on GRS80 (geodesic.py from exercise 5), matching the
+GEODESIC method of the Near tool.
+
+Backends: scipy's cKDTree when installed, otherwise a pure NumPy KD-tree.
+Only from_feature_class needs arcpy.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from geodesic import MEAN_EARTH_RADIUS, geodesic_distance
+
+# Extra candidates fetched from the tree before the ellipsoidal ranking
+CANDIDATE_MARGIN = 4
+
+# Relative slack of spherical vs ellipsoidal distances for radius queries
+RADIUS_SLACK = 1.01
+
+
+def unit_vectors(lon, lat):
+    # (n, 3) points on the unit sphere, chord length grows with the distance
+    lon, lat = np.radians(np.asarray(lon, dtype=np.float64)), np.radians(np.asarray(lat, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_length(distance):
+    # Chord on the unit sphere of a surface distance in metres
+    return 2 * math.sin(min(distance / (2 * MEAN_EARTH_RADIUS), math.pi / 2))
+
+
+class KDTree:
+    """
+    Minimal KD-tree in NumPy with bucketed leaves.
+
+    Args:
+        points (ndarray): (n, d) coordinates
+        leaf_size (int): Maximum number of points per leaf
+    """
+
+    def __init__(self, points, leaf_size=16):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        # Nodes: (axis, split, left, right) for inner nodes, (-1, indices) for leaves
+        self.nodes = []
+        self.root = self._build(np.arange(len(self.points))) if len(self.points) else None
+
+    def _build(self, indices):
+        node = len(self.nodes)
+        if len(indices) <= self.leaf_size:
+            self.nodes.append((-1, indices))
+            return node
+        coordinates = self.points[indices]
+        axis = int(np.argmax(coordinates.max(axis=0) - coordinates.min(axis=0)))
+        order = np.argsort(coordinates[:, axis], kind='stable')
+        middle = len(indices) // 2
+        split = float(coordinates[order[middle], axis])
+        self.nodes.append(None)  # Placeholder, filled once the children exist
+        left = self._build(indices[order[:middle]])
+        right = self._build(indices[order[middle:]])
+        self.nodes[node] = (axis, split, left, right)
+        return node
+
+    def _leaf_distances(self, indices, point):
+        return np.sqrt(((self.points[indices] - point) ** 2).sum(axis=1))
+
+    def query(self, points, k=1):
+        """
+        k nearest neighbours of each point.
+
+        Returns:
+            tuple: (n, k) Euclidean distances and indices, inf/-1 where fewer than k points exist
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        distances = np.full((len(points), k), np.inf)
+        indices = np.full((len(points), k), -1, dtype=np.int64)
+        if self.root is None:
+            return distances, indices
+        for row, point in enumerate(points):
+            best = []  # Max-heap of (-distance, index)
+            stack = [(self.root, 0.0)]
+            while stack:
+                node, bound = stack.pop()
+                if len(best) == k and bound >= -best[0][0]:
+                    continue
+                entry = self.nodes[node]
+                if entry[0] == -1:
+                    leaf = entry[1]
+                    for distance, index in zip(self._leaf_distances(leaf, point).tolist(), leaf.tolist()):
+                        if len(best) < k:
+                            heapq.heappush(best, (-distance, index))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, index))
+                    continue
+                axis, split, left, right = entry
+                offset = point[axis] - split
+                near, far = (left, right) if offset < 0 else (right, left)
+                # Visit the near side first, it is on top of the stack
+                stack.append((far, max(bound, abs(offset))))
+                stack.append((near, bound))
+            found = sorted((-negative, index) for negative, index in best)
+            distances[row, :len(found)] = [distance for distance, _ in found]
+            indices[row, :len(found)] = [index for _, index in found]
+        return distances, indices
+
+    def query_radius(self, points, radius):
+        """
+        Indices of all points within a Euclidean radius of each point.
+
+        Returns:
+            list: One index array per query point
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        result = []
+        for point in points:
+            found = []
+            stack = [self.root] if self.root is not None else []
+            while stack:
+                entry = self.nodes[stack.pop()]
+                if entry[0] == -1:
+                    leaf = entry[1]
+                    found.append(leaf[self._leaf_distances(leaf, point) <= radius])
+                    continue
+                axis, split, left, right = entry
+                offset = point[axis] - split
+                if offset - radius < 0:
+                    stack.append(left)
+                if offset + radius >= 0:
+                    stack.append(right)
+            result.append(np.concatenate(found) if found else np.array([], dtype=np.int64))
+        return result
+
+
+class _ScipyTree:
+    # cKDTree with the interface of KDTree
+    def __init__(self, points):
+        from scipy.spatial import cKDTree
+        self.size = len(points)
+        self.tree = cKDTree(points)
+
+    def query(self, points, k=1):
+        distances, indices = self.tree.query(points, k=k)
+        distances, indices = distances.reshape(len(points), k), indices.reshape(len(points), k)
+        # cKDTree marks missing neighbours with index n
+        return distances, np.where(indices == self.size, -1, indices)
+
+    def query_radius(self, points, radius):
+        return [np.array(found, dtype=np.int64) for found in self.tree.query_ball_point(points, radius)]
+
+
+class NearestStopIndex:
+    """
+    In-memory index of bus stops for batch nearest-stop queries.
+
+    Args:
+        lon (array): Stop longitudes in degrees
+        lat (array): Stop latitudes in degrees
+        names (list): Stop names
+        ids (list): Stop object IDs, defaults to the positions
+        backend (str): 'scipy', 'numpy' or None to pick the first available
+    """
+
+    BACKENDS = ('scipy', 'numpy')
+
+    def __init__(self, lon, lat, names, ids=None, backend=None):
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.names = list(names)
+        self.ids = list(ids) if ids is not None else list(range(len(self.names)))
+        self.backend = backend or self._default_backend()
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {self.backend}")
+        points = unit_vectors(self.lon, self.lat)
+        self.tree = _ScipyTree(points) if self.backend == 'scipy' else KDTree(points)
+
+    @staticmethod
+    def _default_backend():
+        try:
+            import scipy.spatial  # noqa: F401
+            return 'scipy'
+        except ImportError:
+            return 'numpy'
+
+    @classmethod
+    def from_feature_class(cls, feature_class, name_field, where_clause=None, backend=None):
+        """
+        Read the stops of a feature class (or layer) with one SearchCursor.
+
+        The coordinates are requested in WGS84, whatever the feature class CRS.
+        """
+        import arcpy
+        lon, lat, names, ids = [], [], [], []
+        with arcpy.da.SearchCursor(feature_class, ["OID@", name_field, "SHAPE@XY"], where_clause,
+                                   spatial_reference=arcpy.SpatialReference(4326)) as cursor:
+            for oid, name, xy in cursor:
+                if xy is None or xy[0] is None:
+                    continue
+                ids.append(oid)
+                names.append(name)
+                lon.append(xy[0])
+                lat.append(xy[1])
+        return cls(lon, lat, names, ids, backend)
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(self, lon, lat, k=1):
+        """
+        The k nearest stops of each input point.
+
+        Args:
+            lon (array): Input longitudes in degrees
+            lat (array): Input latitudes in degrees
+            k (int): Number of stops per point
+
+        Returns:
+            tuple: (n, k) geodesic distances in metres and stop positions
+                (-1 / inf where there are fewer than k stops), nearest first
+        """
+        lon, lat = np.atleast_1d(np.asarray(lon, dtype=np.float64)), np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        candidates = min(k + CANDIDATE_MARGIN, len(self))
+        distances = np.full((len(lon), k), np.inf)
+        indices = np.full((len(lon), k), -1, dtype=np.int64)
+        if candidates == 0:
+            return distances, indices
+
+        # Candidates by chord length, ranked again by the ellipsoidal distance
+        _, found = self.tree.query(unit_vectors(lon, lat), k=candidates)
+        valid = found >= 0
+        safe = np.where(valid, found, 0)
+        geodesic = geodesic_distance(lon[:, None], lat[:, None], self.lon[safe], self.lat[safe])
+        geodesic = np.where(valid, geodesic, np.inf)
+        order = np.argsort(geodesic, axis=1, kind='stable')[:, :k]
+        rows = np.arange(len(lon))[:, None]
+        count = order.shape[1]
+        distances[:, :count] = geodesic[rows, order]
+        indices[:, :count] = np.where(valid[rows, order], found[rows, order], -1)
+        return distances, indices
+
+    def within(self, lon, lat, radius):
+        """
+        All stops within a geodesic radius of each input point.
+
+        Args:
+            radius (float): Search radius in metres
+
+        Returns:
+            list: Per input point a list of (distance in metres, stop position), nearest first
+        """
+        lon, lat = np.atleast_1d(np.asarray(lon, dtype=np.float64)), np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        found = self.tree.query_radius(unit_vectors(lon, lat), chord_length(radius * RADIUS_SLACK))
+        result = []
+        for x, y, candidates in zip(lon, lat, found):
+            distances = geodesic_distance(x, y, self.lon[candidates], self.lat[candidates])
+            keep = distances <= radius
+            result.append(sorted(zip(distances[keep].tolist(), candidates[keep].tolist())))
+        return result
+
+    def stop(self, position):
+        # (object ID, name) of a stop position
+        return self.ids[position], self.names[position]
+
+
+def read_input_points(feature_class):
+    """
+    Object IDs and WGS84 coordinates of the input points, read-only.
+
+    Returns:
+        tuple: (ids, lon, lat) lists
+    """
+    import arcpy
+    ids, lon, lat = [], [], []
+    with arcpy.da.SearchCursor(feature_class, ["OID@", "SHAPE@XY"],
+                               spatial_reference=arcpy.SpatialReference(4326)) as cursor:
+        for oid, xy in cursor:
+            if xy is None or xy[0] is None:
+                continue
+            ids.append(oid)
+            lon.append(xy[0])
+            lat.append(xy[1])
+    return ids, lon, lat
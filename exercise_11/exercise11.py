@@ -1,140 +1,134 @@
 import arcpy
-import time
+import os
+import sys
+
+# Make the step timer, the nearest stop engine of exercise 10 and the geodesic kernel of exercise 5 importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "exercise_10"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "exercise_5"))
+from nearest_stop import NearestStopIndex, read_input_points
+from step_timer import StepTimer, benchmark
 
 # Set the workspace environment 
 arcpy.env.workspace = r"arcpy2.gdb"
 
-def find_nearest_bus_stop():
+def analyze(input_point_fc, bus_stops_fc, name_field, name_value, timer, message=arcpy.AddMessage):
     """
-    Find the nearest bus stop to an input point feature class.
-    With user-configurable feature class, field filtering, and progress indication.
+    Run the nearest bus stop analysis, timing each stage.
+
+    Args:
+        input_point_fc (str): Input point feature class
+        bus_stops_fc (str): Bus stops feature class
+        name_field (str): Name field for filtering
+        name_value (str): Specific name value to filter by
+        timer (StepTimer): Records the stage timings
+        message (callable): Reports progress messages
+
+    Returns:
+        list: (input point ID, stop name, distance in meters) per input point, None on invalid input
     """
-    try:
-        # Initialize progress indicator
-        arcpy.SetProgressor("step", "Initializing analysis...", 0, 6, 1)
-        time.sleep(2)  # 2 second delay for observation
-        
-        # Get the input parameters from the tool
-        input_point_fc = arcpy.GetParameterAsText(0)  # Input point feature class
-        bus_stops_fc = arcpy.GetParameterAsText(1)    # Bus stops feature class
-        name_field = arcpy.GetParameterAsText(2)      # Name field for filtering
-        name_value = arcpy.GetParameterAsText(3)      # Specific name value to filter by
-
-        # Step 1: Validate input parameters
-        arcpy.SetProgressorLabel("Validating input parameters...")
-        arcpy.SetProgressorPosition(1)
-        time.sleep(2)
-        
+    # Step 1: Validate input parameters
+    with timer.step("validation", "Validating input parameters..."):
         # Check if input feature class exists
         if not arcpy.Exists(input_point_fc):
             arcpy.AddError(f"Input feature class {input_point_fc} does not exist!")
-            return
+            return None
 
         # Check if bus stops feature class exists
         if not arcpy.Exists(bus_stops_fc):
             arcpy.AddError(f"Bus stops feature class {bus_stops_fc} does not exist!")
-            return
+            return None
 
         # Validate that the name field exists in the feature class
         field_names = [field.name for field in arcpy.ListFields(bus_stops_fc)]
         if name_field not in field_names:
             arcpy.AddError(f"Field '{name_field}' does not exist in {bus_stops_fc}!")
-            return
+            return None
 
-        arcpy.AddMessage(f"Using feature class: {bus_stops_fc}")
-        arcpy.AddMessage(f"Filtering by field: {name_field} = '{name_value}'")
-
-        # Step 2: Create filtered layer
-        arcpy.SetProgressorLabel("Creating filtered layer...")
-        arcpy.SetProgressorPosition(2)
-        time.sleep(2)
-        
-        # Create a layer with the specified filter
-        filtered_layer = "filtered_stops_layer"
-        where_clause = f"{name_field} = '{name_value}'"
-        
-        # Make feature layer with the filter applied
-        arcpy.MakeFeatureLayer_management(
-            in_features=bus_stops_fc,
-            out_layer=filtered_layer,
-            where_clause=where_clause
-        )
-        
-        # Check if any features match the filter
-        result = arcpy.GetCount_management(filtered_layer)
-        feature_count = int(result.getOutput(0))
-        
-        if feature_count == 0:
-            arcpy.AddError(f"No features found with {name_field} = '{name_value}'")
-            return
-            
-        arcpy.AddMessage(f"Found {feature_count} feature(s) matching the filter criteria")
-
-        # Step 3: Prepare for Near analysis
-        arcpy.SetProgressorLabel("Preparing Near analysis...")
-        arcpy.SetProgressorPosition(3)
-        time.sleep(2)
-
-        # Step 4: Run the Near analysis
-        arcpy.SetProgressorLabel("Running Near analysis...")
-        arcpy.SetProgressorPosition(4)
-        time.sleep(2)
-        
-        arcpy.AddMessage("Finding nearest bus stop...")
-        # Note: The Near tool adds fields to the input feature class
-        arcpy.Near_analysis(
-            in_features=input_point_fc,
-            near_features=filtered_layer,  # Use the filtered layer instead of the full feature class
-            search_radius="#",  # No search radius limit
-            location="NO_LOCATION",
-            angle="NO_ANGLE",
-            method="GEODESIC"
-        )
-
-        # Step 5: Extract results
-        arcpy.SetProgressorLabel("Extracting analysis results...")
-        arcpy.SetProgressorPosition(5)
-        time.sleep(2)
-        
-        # Use arcpy.da.SearchCursor to extract the distance and ObjectID
-        # Get the distance and nearest bus stop ID from the input feature
-        with arcpy.da.SearchCursor(input_point_fc, ["NEAR_DIST", "NEAR_FID"]) as cursor:
-            for row in cursor:
-                near_distance = row[0]
-                near_fid = row[1]
-                break  # We only need the first row since we're working with a single point
-
-        # Check if a near feature was found
-        if near_fid == -1:
-            arcpy.AddError("No nearby features found within the search criteria")
+    message(f"Using feature class: {bus_stops_fc}")
+    message(f"Filtering by field: {name_field} = '{name_value}'")
+
+    # Step 2: Read the stops matching the filter with their names into an in-memory index
+    with timer.step("filter_stops", "Reading filtered bus stops..."):
+        field_delimiter = arcpy.AddFieldDelimiters(bus_stops_fc, name_field)
+        where_clause = f"{field_delimiter} = '{name_value}'"
+        stop_index = NearestStopIndex.from_feature_class(bus_stops_fc, name_field, where_clause)
+
+    # Check if any features match the filter
+    feature_count = len(stop_index)
+    if feature_count == 0:
+        arcpy.AddError(f"No features found with {name_field} = '{name_value}'")
+        return None
+    message(f"Found {feature_count} feature(s) matching the filter criteria")
+
+    # Step 3: Read the input points, no NEAR_* fields are added to the input
+    with timer.step("read_input", "Reading input points..."):
+        point_ids, lon, lat = read_input_points(input_point_fc)
+
+    # Check if there were input points to search from
+    if not point_ids:
+        arcpy.AddError(f"No input points found in {input_point_fc}")
+        return None
+
+    # Step 4: Query the nearest stops
+    with timer.step("nearest", "Finding nearest bus stops..."):
+        message("Finding nearest bus stop...")
+        distances, positions = stop_index.nearest(lon, lat)
+
+    # Step 5: Stop names come from the index, no second cursor is needed
+    with timer.step("results", "Extracting analysis results..."):
+        return [(point_id, stop_index.stop(position)[1], near_distance)
+                for point_id, near_distance, position in zip(point_ids, distances[:, 0], positions[:, 0])]
+
+
+def find_nearest_bus_stop():
+    """
+    Find the nearest bus stop to an input point feature class.
+    With user-configurable feature class, field filtering, progress indication and step timings.
+    """
+    try:
+        # Get the input parameters from the tool
+        input_point_fc = arcpy.GetParameterAsText(0)  # Input point feature class
+        bus_stops_fc = arcpy.GetParameterAsText(1)    # Bus stops feature class
+        name_field = arcpy.GetParameterAsText(2)      # Name field for filtering
+        name_value = arcpy.GetParameterAsText(3)      # Specific name value to filter by
+        # Optional: number of benchmark runs and a JSON lines file for the step timings
+        benchmark_runs = arcpy.GetParameterAsText(4) if arcpy.GetArgumentCount() > 4 else ""
+        timing_log = arcpy.GetParameterAsText(5) if arcpy.GetArgumentCount() > 5 else ""
+
+        # Initialize progress indicator, one step per stage plus the display
+        timer = StepTimer(total_steps=6, message=arcpy.AddMessage)
+        results = analyze(input_point_fc, bus_stops_fc, name_field, name_value, timer)
+        if results is None:
+            timer.finish()
             return
 
-        # Use a SearchCursor on the original feature class to get the name
-        # Get the bus stop name using the NEAR_FID
-        with arcpy.da.SearchCursor(bus_stops_fc, [name_field], f"OBJECTID = {near_fid}") as cursor:
-            for row in cursor:
-                bus_stop_name = row[0]
-                break
-
-        # Step 6: Display results
-        arcpy.SetProgressorLabel("Displaying results...")
-        arcpy.SetProgressorPosition(6)
-        time.sleep(2)
-
-        # Output the results to the Geoprocessing Window using arcpy.AddMessage
-        arcpy.AddMessage(f"\n" + "="*50)
-        arcpy.AddMessage(f"NEAREST BUS STOP ANALYSIS RESULTS")
-        arcpy.AddMessage(f"="*50)
-        arcpy.AddMessage(f"Nearest stop: {bus_stop_name}")
-        arcpy.AddMessage(f"Distance: {near_distance:.2f} meters")
-        arcpy.AddMessage(f"Filter used: {name_field} = '{name_value}'")
-        arcpy.AddMessage(f"="*50)
-
-        # Clean up the temporary layer
-        arcpy.Delete_management(filtered_layer)
-        
+        # Step 6: Output the results to the Geoprocessing Window using arcpy.AddMessage
+        with timer.step("display", "Displaying results..."):
+            arcpy.AddMessage(f"\n" + "="*50)
+            arcpy.AddMessage(f"NEAREST BUS STOP ANALYSIS RESULTS")
+            arcpy.AddMessage(f"="*50)
+            for point_id, bus_stop_name, near_distance in results:
+                if len(results) > 1:
+                    arcpy.AddMessage(f"Input point: {point_id}")
+                arcpy.AddMessage(f"Nearest stop: {bus_stop_name}")
+                arcpy.AddMessage(f"Distance: {near_distance:.2f} meters")
+            arcpy.AddMessage(f"Filter used: {name_field} = '{name_value}'")
+            arcpy.AddMessage(f"="*50)
+
+        # Report the wall time per stage
+        timer.report(timing_log or None, input=input_point_fc, stops=bus_stops_fc,
+                     filter=f"{name_field} = '{name_value}'")
+
+        # Optional benchmark mode: repeat the analysis and report p50/p95 latencies
+        if benchmark_runs and int(benchmark_runs) > 0:
+            arcpy.SetProgressorLabel(f"Benchmarking {benchmark_runs} runs...")
+            benchmark(lambda run_timer: analyze(input_point_fc, bus_stops_fc, name_field, name_value,
+                                                run_timer, message=lambda text: None),
+                      runs=int(benchmark_runs), message=arcpy.AddMessage)
+
         # Reset the progressor
-        arcpy.ResetProgressor()
+        timer.finish()
 
     except Exception as e:
         arcpy.AddError(f"An error occurred: {str(e)}")
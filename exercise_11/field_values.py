@@ -0,0 +1,275 @@
+"""
+Cached distinct values and counts of a field (exercise 11 tool validator).
+
+One cursor pass over a (dataset, field) fills a {value: count} dictionary.
+The result is kept for the session and reused by every validator call, so
+filling the dropdown and checking the chosen value are dictionary lookups.
+An entry is rebuilt once the modification time of the dataset changes;
+datasets without files (e.g. database connections) are read again once
+their entry is older than UNSIGNED_TTL seconds. Only the MAX_CACHED most
+recently used entries are kept, as every typed prefix adds one.
+
+For high-cardinality fields the scan is bounded: it stops collecting
+values after a cardinality cap and stops reading after a time budget. A
+HyperLogLog sketch estimates the number of distinct values, so the
+validator can show a truncated or prefix-filtered list instead. Text
+fields are filtered by prefix in the database with a case-insensitive
+LIKE; LIKE is not valid for numbers and dates, their values are filtered
+while scanning.
+"""
+
+from collections import OrderedDict
+import hashlib
+import math
+import os
+import time
+
+# Cached indexes per (dataset, field, where clause), least recently used first
+_indexes = OrderedDict()
+
+# Entries kept in the cache
+MAX_CACHED = 64
+
+# Seconds an index of a dataset without modification time is reused
+UNSIGNED_TTL = 30.0
+
+# Default bounds of a scan: distinct values kept and seconds spent reading
+MAX_VALUES = 10000
+TIME_BUDGET = 2.0
+
+# Field types a LIKE clause can filter
+TEXT_FIELD_TYPES = ('String',)
+
+
+def normalize_value(value):
+    # Dropdown form of a field value: stripped text, None for NULL or empty values
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def dataset_signature(dataset):
+    """
+    Modification time of the files behind a dataset.
+
+    Shapefiles and other file based data use their own file; feature
+    classes in a file geodatabase use the newest file of the .gdb folder,
+    as their storage files are not named after them.
+
+    Returns:
+        float: Newest modification time, None if no file could be found
+    """
+    import arcpy
+    path = arcpy.Describe(dataset).catalogPath
+    while path and not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    if not path:
+        return None
+    if os.path.isdir(path):
+        with os.scandir(path) as entries:
+            return max((entry.stat().st_mtime for entry in entries if entry.is_file()),
+                       default=os.path.getmtime(path))
+    return os.path.getmtime(path)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch estimating the number of distinct strings.
+
+    Args:
+        precision (int): log2 of the number of registers, the standard
+            error is about 1.04 / sqrt(2 ** precision) (1.6 % for 12)
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self._rank_bits = 64 - precision
+
+    def add(self, value):
+        hashed = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        register = hashed >> self._rank_bits
+        rest = hashed & ((1 << self._rank_bits) - 1)
+        # Position of the leftmost 1 bit in the remaining bits
+        rank = self._rank_bits - rest.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        raw = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.size and zeros:
+            # Linear counting for small cardinalities
+            return self.size * math.log(self.size / zeros)
+        return raw
+
+
+class FieldValueIndex:
+    """
+    Distinct values of a field with their number of rows.
+
+    Attributes:
+        counts (dict): Normalized value → number of rows
+        signature (float): Dataset modification time the index was built at
+        built_at (float): time.monotonic() when the index was built
+        complete (bool): False if the scan stopped at the cardinality cap or time budget
+        rows_scanned (int): Rows read by the scan
+        estimated_distinct (float): HyperLogLog estimate of the distinct values in the
+            rows scanned, a lower bound if the time budget ran out
+    """
+
+    def __init__(self, counts, signature=None, complete=True, rows_scanned=None, estimated_distinct=None):
+        self.counts = counts
+        self.signature = signature
+        self.complete = complete
+        self.rows_scanned = rows_scanned
+        self.estimated_distinct = len(counts) if estimated_distinct is None else estimated_distinct
+        self.built_at = time.monotonic()
+        self._sorted = None
+
+    def is_current(self, dataset):
+        # True while the dataset is unchanged, or for datasets without a modification time within the TTL
+        if self.signature is None:
+            return time.monotonic() - self.built_at < UNSIGNED_TTL
+        return self.signature == dataset_signature(dataset)
+
+    @classmethod
+    def build(cls, dataset, field_name, max_values=None, time_budget=None, where_clause=None, prefix=None):
+        """
+        Scan the field once, within the given bounds.
+
+        Values past max_values are no longer kept but still go into the
+        sketch; the scan ends when the time budget runs out. With a prefix
+        only the values starting with it (case-insensitive) are indexed.
+        """
+        import arcpy
+        prefix = prefix.lower() if prefix else None
+        counts = {}
+        sketch = HyperLogLog()
+        signature = dataset_signature(dataset)
+        complete = True
+        rows = 0
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        with arcpy.da.SearchCursor(dataset, [field_name], where_clause) as cursor:
+            for row in cursor:
+                rows += 1
+                value = normalize_value(row[0])
+                if value is not None and (prefix is None or value.lower().startswith(prefix)):
+                    sketch.add(value)
+                    if value in counts:
+                        counts[value] += 1
+                    elif max_values is None or len(counts) < max_values:
+                        counts[value] = 1
+                    else:
+                        complete = False
+                # Checking the clock every 1024 rows keeps the overhead low
+                if deadline is not None and not rows & 1023 and time.perf_counter() > deadline:
+                    complete = False
+                    break
+        estimate = len(counts) if complete else max(sketch.estimate(), len(counts))
+        return cls(counts, signature, complete, rows, estimate)
+
+    def values(self, prefix=None, limit=None):
+        """
+        Sorted distinct values, optionally only those starting with a prefix.
+
+        Args:
+            prefix (str): Case-insensitive prefix to filter by
+            limit (int): Maximum number of values returned
+        """
+        if self._sorted is None:
+            self._sorted = sorted(self.counts)
+        values = self._sorted
+        if prefix:
+            prefix = prefix.lower()
+            values = [value for value in values if value.lower().startswith(prefix)]
+        return values[:limit] if limit is not None else values
+
+    def count(self, value):
+        """
+        Rows with the (normalized) value.
+
+        Returns:
+            int: Row count (a lower bound for incomplete scans), None if an
+                incomplete scan did not see the value
+        """
+        count = self.counts.get(normalize_value(value), 0)
+        if count == 0 and not self.complete:
+            return None
+        return count
+
+    def __len__(self):
+        return len(self.counts)
+
+
+def field_value_index(dataset, field_name, max_values=MAX_VALUES, time_budget=TIME_BUDGET, where_clause=None,
+                      prefix=None):
+    """
+    Return the cached value index of a field, rebuilding it if the dataset changed.
+
+    Args:
+        dataset (str): Feature class, table or layer
+        field_name (str): Field to index
+        max_values (int): Cardinality cap, None for no cap
+        time_budget (float): Seconds the scan may take, None for no limit
+        where_clause (str): Optional filter, e.g. a prefix LIKE clause
+        prefix (str): Only index the values starting with it, filtered while scanning
+
+    Returns:
+        FieldValueIndex: Distinct values and counts
+    """
+    key = (dataset, field_name, where_clause, prefix)
+    index = _indexes.get(key)
+    if index is None or not index.is_current(dataset):
+        index = _indexes[key] = FieldValueIndex.build(dataset, field_name, max_values, time_budget,
+                                                      where_clause, prefix)
+    _indexes.move_to_end(key)
+    while len(_indexes) > MAX_CACHED:
+        _indexes.popitem(last=False)
+    return index
+
+
+def like_prefix(prefix, escape='\\'):
+    # LIKE pattern matching values that start with prefix, the wildcards % and _ are escaped
+    for char in (escape, '%', '_'):
+        prefix = prefix.replace(char, escape + char)
+    return prefix.replace("'", "''") + '%'
+
+
+def prefix_where_clause(delimited_field, prefix):
+    # Case-insensitive prefix match, as FieldValueIndex.values(prefix)
+    return f"UPPER({delimited_field}) LIKE UPPER('{like_prefix(prefix)}') ESCAPE '\\'"
+
+
+def is_text_field(dataset, field_name):
+    import arcpy
+    return any(field.name.lower() == field_name.lower() and field.type in TEXT_FIELD_TYPES
+               for field in arcpy.ListFields(dataset))
+
+
+def prefix_value_index(dataset, field_name, prefix, max_values=MAX_VALUES, time_budget=TIME_BUDGET):
+    """
+    Value index of only the rows whose value starts with a prefix.
+
+    Used when the full scan of a field was incomplete: for text fields the
+    database filters the rows, so the much smaller result usually fits
+    under the cap. Numeric and date fields are scanned again, keeping only
+    the values that start with the prefix.
+    """
+    if not is_text_field(dataset, field_name):
+        return field_value_index(dataset, field_name, max_values, time_budget, prefix=prefix)
+    import arcpy
+    where_clause = prefix_where_clause(arcpy.AddFieldDelimiters(dataset, field_name), prefix)
+    return field_value_index(dataset, field_name, max_values, time_budget, where_clause)
+
+
+def clear_cache(dataset=None):
+    # Drop the cached indexes of one dataset, or all of them
+    for key in [key for key in _indexes if dataset is None or key[0] == dataset]:
+        del _indexes[key]
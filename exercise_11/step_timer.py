@@ -0,0 +1,120 @@
+"""
+Step timing for geoprocessing tools (exercise 11).
+
+StepTimer replaces fixed delays between progressor steps: each stage runs
+in a `with timer.step(...)` block that moves the progressor and records
+its wall time. The timings can be reported as tool messages or as one
+JSON line per run in a log file; benchmark runs a tool function several
+times and summarizes the latency percentiles.
+"""
+
+from contextlib import contextmanager
+import json
+import time
+
+import numpy as np
+
+
+class StepTimer:
+    """
+    Records the wall time of named stages of one tool run.
+
+    Args:
+        total_steps (int): Number of progressor steps, 0 for no progressor
+        message (callable): Reports a line of text, e.g. arcpy.AddMessage
+        use_progressor (bool): Drive the arcpy step progressor
+    """
+
+    def __init__(self, total_steps=0, message=print, use_progressor=True):
+        self.total_steps = total_steps
+        self.message = message
+        self.use_progressor = use_progressor and total_steps > 0
+        self.timings = []
+        self._position = 0
+        self._start = time.perf_counter()
+        if self.use_progressor:
+            import arcpy
+            arcpy.SetProgressor("step", "Initializing analysis...", 0, total_steps, 1)
+
+    @contextmanager
+    def step(self, name, label=None):
+        """
+        Time one stage, advancing the progressor with the stage label.
+
+        Args:
+            name (str): Stage name used in the report, e.g. 'validation'
+            label (str): Progressor label, defaults to the name
+        """
+        self._position += 1
+        if self.use_progressor:
+            import arcpy
+            arcpy.SetProgressorLabel(label or name)
+            arcpy.SetProgressorPosition(self._position)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self):
+        # Wall time since the timer was created
+        return time.perf_counter() - self._start
+
+    def as_dict(self):
+        # {stage: seconds} plus the total, stages of the same name are summed
+        result = {}
+        for name, seconds in self.timings:
+            result[name] = result.get(name, 0.0) + seconds
+        result['total'] = self.total
+        return result
+
+    def report(self, log_path=None, **context):
+        """
+        Report the stage timings as messages and optionally append them to a log.
+
+        Args:
+            log_path (str): JSON lines file to append one record to
+            **context: Extra values stored with the log record, e.g. the tool parameters
+        """
+        timings = self.as_dict()
+        self.message("Step timings:")
+        for name, seconds in timings.items():
+            self.message(f"  {name:20s} {seconds * 1000:10.1f} ms")
+        if log_path:
+            record = dict(context, timestamp=time.time(), timings=timings)
+            with open(log_path, 'a', encoding='utf-8') as log:
+                log.write(json.dumps(record, default=str) + "\n")
+        return timings
+
+    def finish(self):
+        if self.use_progressor:
+            import arcpy
+            arcpy.ResetProgressor()
+
+
+def benchmark(run, runs=10, message=print):
+    """
+    Call a tool function several times and report p50/p95 latencies.
+
+    Args:
+        run (callable): Takes a StepTimer and performs one run of the tool
+        runs (int): Number of runs
+        message (callable): Reports a line of text
+
+    Returns:
+        dict: {stage: (p50, p95)} in seconds, including 'total'
+    """
+    samples = {}
+    for _ in range(runs):
+        timer = StepTimer(message=message, use_progressor=False)
+        run(timer)
+        for name, seconds in timer.as_dict().items():
+            samples.setdefault(name, []).append(seconds)
+
+    summary = {name: (float(np.percentile(values, 50)), float(np.percentile(values, 95)))
+               for name, values in samples.items()}
+    message(f"Latency over {runs} runs (p50 / p95):")
+    for name, (p50, p95) in summary.items():
+        message(f"  {name:20s} {p50 * 1000:10.1f} ms {p95 * 1000:10.1f} ms")
+    return summary
@@ -1,4 +1,48 @@
 import arcpy
+import os
+import sys
+
+# Make the value index module next to this file importable
+if "__file__" in globals():
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+try:
+    from field_values import field_value_index, prefix_value_index
+except ImportError:
+    # Validation code embedded in a toolbox has no file next to it, the field is scanned on every call
+    field_value_index = prefix_value_index = None
+
+
+class _ScannedValues(object):
+    """
+    Unique values of a field from one full cursor pass, used without field_values.
+    Offers the part of FieldValueIndex the validator uses.
+    """
+
+    complete = True
+
+    def __init__(self, feature_class, field_name):
+        self.counts = {}
+        with arcpy.da.SearchCursor(feature_class, [field_name]) as cursor:
+            for row in cursor:
+                if row[0] is not None:
+                    # Convert to string and strip whitespace
+                    value = str(row[0]).strip()
+                    if value:  # Only add non-empty values
+                        self.counts[value] = self.counts.get(value, 0) + 1
+
+    def values(self):
+        return sorted(self.counts)
+
+    def count(self, value):
+        return self.counts.get(str(value).strip(), 0)
+
+
+def _value_index(feature_class, field_name):
+    # Cached value index of a field, or a fresh scan if field_values could not be imported
+    if field_value_index is None:
+        return _ScannedValues(feature_class, field_name)
+    return field_value_index(feature_class, field_name)
+
 
 class ToolValidator(object):
     """
@@ -30,6 +74,7 @@ class ToolValidator(object):
         # Don't process if the name value parameter itself was just altered
         # This prevents clearing the value when user just selected it
         if self.params[3].altered:
+            self._update_prefix_list()
             return
 
         # Handle feature class parameter changes
@@ -88,28 +133,29 @@ class ToolValidator(object):
                     # Store current value to preserve it if possible
                     current_value = self.params[3].valueAsText if self.params[3].value else None
                     
-                    # Get unique values from selected field
-                    unique_values = set()
+                    # Get unique values from selected field (stripped, non-empty), cached per dataset and field
+                    # The scan is bounded by a cardinality cap and a time budget
                     try:
-                        with arcpy.da.SearchCursor(feature_class, [field_name]) as cursor:
-                            for row in cursor:
-                                if row[0] is not None:
-                                    # Convert to string and strip whitespace
-                                    value = str(row[0]).strip()
-                                    if value:  # Only add non-empty values
-                                        unique_values.add(value)
+                        index = _value_index(feature_class, field_name)
+                        value_list = index.values()
                     except Exception as cursor_error:
                         arcpy.AddError(f"Error reading field values from '{field_name}': {str(cursor_error)}")
                         self.params[3].enabled = False
                         return
                     
                     # Set up the filter for name value parameter
-                    if unique_values:
-                        value_list = sorted(list(unique_values))
+                    if not index.complete:
+                        # Too many values for a dropdown: the value is typed, a typed prefix narrows the list
+                        self.params[3].enabled = True
+                        self.params[3].filter.list = []
+                        arcpy.AddWarning(f"Field '{field_name}' has too many values for a list (about "
+                                         f"{index.estimated_distinct:,.0f} distinct in the first {index.rows_scanned:,} rows); "
+                                         f"type a value or the start of one")
+                    elif value_list:
                         self.params[3].enabled = True
                         # Set the filter to ValueList and populate it
                         self.params[3].filter.type = 'ValueList'
-                        self.params[3].filter.list = value_list
+                        self.params[3].filter.list = list(value_list)
                         # Only clear existing value if it's not in the new list
                         if current_value and current_value not in value_list:
                             self.params[3].value = None
@@ -133,6 +179,27 @@ class ToolValidator(object):
             self.params[3].value = None
             self.params[3].filter.list = []
 
+    def _update_prefix_list(self):
+        """
+        Offer the values starting with the typed text when the field has too many values for a full list.
+        The prefix is matched ignoring case, as in the cached value list, for every field type.
+        """
+        if not all(param.value for param in self.params[1:4]):
+            return
+        try:
+            feature_class = self.params[1].valueAsText
+            field_name = self.params[2].valueAsText
+            typed_value = self.params[3].valueAsText
+            index = _value_index(feature_class, field_name)
+            if index.complete or index.count(typed_value):
+                return
+            prefix_index = prefix_value_index(feature_class, field_name, typed_value.strip())
+            if prefix_index.complete and prefix_index.values():
+                self.params[3].filter.type = 'ValueList'
+                self.params[3].filter.list = list(prefix_index.values())
+        except Exception as e:
+            arcpy.AddError(f"Error filtering values by prefix: {str(e)}")
+
     def updateMessages(self):
         """
         Modify the messages created by internal validation for each tool parameter.
@@ -178,13 +245,15 @@ class ToolValidator(object):
                 field_value = self.params[3].valueAsText
                 
                 if arcpy.Exists(feature_class):
-                    # Check if the value exists in the field
-                    field_delimiter = arcpy.AddFieldDelimiters(feature_class, field_name)
-                    where_clause = f"{field_delimiter} = '{field_value}'"
-                    
-                    count = 0
-                    with arcpy.da.SearchCursor(feature_class, [field_name], where_clause) as cursor:
-                        count = sum(1 for _ in cursor)
+                    # Check if the value exists in the field, using the cached value counts
+                    count = _value_index(feature_class, field_name).count(field_value)
+                    if count is None:
+                        # The bounded scan did not see the value, ask the database for one matching row
+                        field_delimiter = arcpy.AddFieldDelimiters(feature_class, field_name)
+                        escaped_value = field_value.replace("'", "''")
+                        where_clause = f"{field_delimiter} = '{escaped_value}'"
+                        with arcpy.da.SearchCursor(feature_class, [field_name], where_clause) as cursor:
+                            count = sum(1 for _ in zip(range(1), cursor))
                     
                     if count == 0:
                         self.params[3].setWarningMessage(
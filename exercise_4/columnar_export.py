@@ -0,0 +1,194 @@
+"""
+Columnar export of layer attributes and coordinates (exercises 4.2 and 4.4).
+
+Columns are typed from the layer fields and written in batches of rows:
+as Arrow IPC (memory-mapped, zero-copy on read) or Parquet row groups when
+pyarrow is installed, and as an uncompressed NumPy .npz archive otherwise.
+
+The .npz fallback is not zero-copy: the writer holds every column of the
+whole export in memory, and reading copies each column out of the archive.
+"""
+
+import numpy as np
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import QgsFeatureRequest
+
+from feature_export import geometry_columns, layer_field_indices
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# NumPy dtype per QVariant field type, anything else is written as text
+NUMPY_TYPES = {
+    QVariant.Int: np.int64,
+    QVariant.UInt: np.int64,
+    QVariant.LongLong: np.int64,
+    QVariant.ULongLong: np.int64,
+    QVariant.Double: np.float64,
+    QVariant.Bool: np.bool_,
+}
+
+
+def column_types(layer, fields, geometry):
+    # Returns [(column name, numpy dtype or str for text)] of the exported columns
+    columns = []
+    for name in fields:
+        field_type = layer.fields().field(name).type()
+        columns.append((name, NUMPY_TYPES.get(field_type, str)))
+    if geometry == 'xy':
+        columns += [('X', np.float64), ('Y', np.float64)]
+    elif geometry == 'wkt':
+        columns.append(('WKT', str))
+    return columns
+
+
+def _arrow_type(dtype):
+    return {np.int64: pa.int64(), np.float64: pa.float64(), np.bool_: pa.bool_()}.get(dtype, pa.string())
+
+
+def _numpy_column(values, dtype):
+    # Convert one batch of values to an array plus a null mask
+    mask = np.array([value is None for value in values], dtype=bool)
+    if dtype is str:
+        return np.array(['' if value is None else str(value) for value in values], dtype=str), mask
+    fill = dtype(0)
+    return np.array([fill if value is None else value for value in values], dtype=dtype), mask
+
+
+def iter_column_batches(layer, fields, geometry, selected_only, batch_size):
+    # Yields {column: list of values} for batches of features
+    request = QgsFeatureRequest().setSubsetOfAttributes(fields, layer.fields())
+    if geometry is None:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+    features = layer.getSelectedFeatures(request) if selected_only else layer.getFeatures(request)
+    field_indices = layer_field_indices(layer, fields)
+    names = [name for name, _ in column_types(layer, fields, geometry)]
+
+    rows = []
+    for feature in features:
+        attributes = feature.attributes()
+        row = [attributes[index] for index in field_indices]
+        row.extend(geometry_columns(feature.geometry(), geometry))
+        # QGIS NULL values become None
+        rows.append([None if isinstance(value, QVariant) and value.isNull() else value for value in row])
+        if len(rows) == batch_size:
+            yield dict(zip(names, map(list, zip(*rows))))
+            rows = []
+    if rows:
+        yield dict(zip(names, map(list, zip(*rows))))
+
+
+def export_columnar(layer, output_path, fields=None, geometry='xy', selected_only=False,
+                    batch_size=65536, file_format=None):
+    """
+    Write layer attributes and coordinates as typed columns.
+
+    Args:
+        layer (QgsVectorLayer): Layer to export
+        output_path (str): Output file (.arrow, .parquet or .npz)
+        fields (list): Attribute fields to write, None writes all fields
+        geometry (str): 'xy' for X/Y columns, 'wkt' for a WKT column, None for no geometry
+        selected_only (bool): Export only the selected features
+        batch_size (int): Rows per record batch / Parquet row group
+        file_format (str): 'arrow', 'parquet' or 'npz', None decides by the file extension
+
+    Returns:
+        int: Number of rows written
+    """
+    if fields is None:
+        fields = layer.fields().names()
+    layer_field_indices(layer, fields)
+    columns = column_types(layer, fields, geometry)
+    batches = iter_column_batches(layer, fields, geometry, selected_only, batch_size)
+    return write_column_batches(output_path, columns, batches, file_format)
+
+
+def write_column_batches(output_path, columns, batches, file_format=None):
+    """
+    Write batches of column values to a columnar file.
+
+    Args:
+        output_path (str): Output file (.arrow, .parquet or .npz)
+        columns (list): (column name, numpy dtype or str for text) pairs
+        batches (iterable): {column name: list of values} per batch
+        file_format (str): 'arrow', 'parquet' or 'npz', None decides by the file extension
+
+    Returns:
+        int: Number of rows written
+    """
+    if file_format is None:
+        file_format = output_path.rsplit('.', 1)[-1].lower()
+        file_format = {'feather': 'arrow', 'ipc': 'arrow'}.get(file_format, file_format)
+    if file_format in ('arrow', 'parquet') and pa is None:
+        raise ImportError(f"pyarrow is needed for {file_format} output, use an .npz file instead")
+    if file_format not in ('arrow', 'parquet', 'npz'):
+        raise ValueError(f"Unknown columnar format: {file_format}")
+
+    rows = 0
+
+    if file_format == 'npz':
+        # All batches are collected first, np.savez writes whole arrays
+        chunks = {name: [] for name, _ in columns}
+        masks = {name: [] for name, _ in columns}
+        for batch in batches:
+            for name, dtype in columns:
+                values, mask = _numpy_column(batch[name], dtype)
+                chunks[name].append(values)
+                masks[name].append(mask)
+            rows += len(batch[columns[0][0]])
+        arrays = {}
+        for name, dtype in columns:
+            empty = np.array([], dtype=str if dtype is str else dtype)
+            arrays[name] = np.concatenate(chunks[name]) if chunks[name] else empty
+            mask = np.concatenate(masks[name]) if masks[name] else np.array([], dtype=bool)
+            if mask.any():
+                arrays[f'{name}__null'] = mask
+        # Uncompressed, so every column is one contiguous block in the archive
+        np.savez(output_path, **arrays)
+        return rows
+
+    schema = pa.schema([(name, _arrow_type(dtype)) for name, dtype in columns])
+    if file_format == 'arrow':
+        writer = pa.ipc.new_file(output_path, schema)
+    else:
+        writer = pq.ParquetWriter(output_path, schema)
+    with writer:
+        for batch in batches:
+            arrays = []
+            for name, dtype in columns:
+                values = batch[name]
+                if dtype is str:
+                    values = [None if value is None else str(value) for value in values]
+                arrays.append(pa.array(values, type=schema.field(name).type))
+            record_batch = pa.record_batch(arrays, schema=schema)
+            if file_format == 'arrow':
+                writer.write_batch(record_batch)
+            else:
+                # One row group per batch
+                writer.write_table(pa.Table.from_batches([record_batch]))
+            rows += record_batch.num_rows
+    return rows
+
+
+def read_columnar(path):
+    """
+    Read a file written by export_columnar.
+
+    Arrow IPC files are memory-mapped, so the columns are not copied.
+    Columns of an .npz archive are read into memory, one copy each.
+
+    Returns:
+        pyarrow.Table or dict: Table for Arrow/Parquet, {column: array} for .npz
+    """
+    if path.lower().endswith('.npz'):
+        with np.load(path) as archive:
+            return {name: archive[name] for name in archive.files}
+    if pa is None:
+        raise ImportError(f"pyarrow is needed to read {path}, only .npz files can be read without it")
+    if path.lower().endswith('.parquet'):
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
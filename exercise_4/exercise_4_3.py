@@ -2,39 +2,33 @@
 from qgis.core import QgsVectorLayer, QgsProject
 from qgis.core import *
 import os
+import sys
+
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from layer_loader import load_folder_into_project
+from shapefile_manifest import write_manifest
 
 # Path to the Muenster folder and project
 muenster_folder = "D:/study/UniMuenster/Sose2025/PythonInQgisandArcgis/week4/Muenster"
 project_path = "D:/study/UniMuenster/Sose2025/PythonInQgisandArcgis/week4/myFirstProject.qgz"
 
-# Create QGIS instance and start new project
-project = QgsProject.instance()
-
-# Get all shapefiles from Muenster folder using os.listdir()
-shapefile_paths = []
-for file in os.listdir(muenster_folder):
-    if file.lower().endswith('.shp'):
-        # Create complete path
-        full_path = os.path.join(muenster_folder, file)
-        shapefile_paths.append(full_path)
-        print(f"Found shapefile: {full_path}")
+# Manifest mode only reads the shapefile headers and writes a catalog file next to the project;
+# layers are opened later on first access through shapefile_manifest.LazyLayerCatalog
+manifest_mode = False
+manifest_path = os.path.splitext(project_path)[0] + "_manifest.json"
 
-# Add each shapefile to the project
-for shapefile_path in shapefile_paths:
-    # Get original filename without extension using os.path.basename()
-    layer_name = os.path.splitext(os.path.basename(shapefile_path))[0]
+if manifest_mode:
+    # Read only the headers (geometry type, feature count, extent, CRS) of every shapefile
+    write_manifest(muenster_folder, manifest_path)
+else:
+    # Create QGIS instance and start new project
+    project = QgsProject.instance()
     
-    # Create layer
-    layer = QgsVectorLayer(shapefile_path, layer_name, "ogr")
+    # Find all shapefiles below the Muenster folder, open them in parallel
+    # and add them to the project in one call
+    load_folder_into_project(project, muenster_folder, max_workers=8)
     
-    # Check if layer is valid
-    if not layer.isValid():
-        print(f"Error loading the layer: {layer_name}")
-    else:
-        # Add layer to project
-        project.addMapLayer(layer)
-        print(f"Added layer: {layer_name}")
-
-# Save project
-project.write(project_path)
-print("Project saved successfully!")
+    # Save project
+    project.write(project_path)
+    print("Project saved successfully!")
@@ -1,24 +1,36 @@
 from qgis.core import QgsProject
-import processing  # Import the processing module for geospatial analysis
+import numpy as np
+import os
+import sys
+
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from columnar_export import write_column_batches
+from point_counting import count_layer_points
+from grouped_counts import grouped_counts
+
+# Optional typed columnar output of the counts (.arrow/.parquet need pyarrow, .npz always works), None to skip
+output_columnar_path = None
 
 # Retrieve the layers from the current project
 districts_layer = QgsProject.instance().mapLayersByName('Muenster_City_Districts')[0]  # Get the districts layer
 schools_layer = QgsProject.instance().mapLayersByName('Schools')[0]  # Get the schools layer
 
-# Define parameters for the processing algorithm
-params = {
-    'POLYGONS': districts_layer,  # Input polygons (districts)
-    'POINTS': schools_layer,  # Input points (schools)
-    'FIELD': 'SCHOOLS_COUNT',  # Field to store the count of schools
-    'OUTPUT': 'memory:'  # Output layer will be stored in memory
-}
-
-# Run the processing algorithm to count points in polygons
-result = processing.run("qgis:countpointsinpolygon", params)  # Execute the algorithm
-output_layer = result['OUTPUT']  # Get the output layer from the result
+# Count the schools per district with the vectorized engine (no intermediate memory layer)
+school_counts = count_layer_points(districts_layer, schools_layer, name_field='Name')
 
 # Print the results of the school count per district
-for feature in output_layer.getFeatures():  # Iterate over each feature in the output layer
-    district_name = feature['Name']  # Get the name of the district
-    school_count = feature['SCHOOLS_COUNT']  # Get the count of schools in the district
-    print(f"{district_name}: {school_count:.1f}")  # Print the district name and school count formatted to one decimal
\ No newline at end of file
+for district_name, school_count in school_counts.items():
+    print(f"{district_name}: {school_count:.1f}")  # Print the district name and school count formatted to one decimal
+
+# Print the schools per district grouped by school type (cached until one of the layers changes)
+schools_by_type = grouped_counts(districts_layer, schools_layer, 'SchoolType')
+for district_name, school_type, count in schools_by_type.table():
+    print(f"{district_name} - {school_type}: {count}")
+
+# Write the counts per district as typed columns
+if output_columnar_path:
+    columns = [('Name', str), ('SCHOOLS_COUNT', np.int64)]
+    write_column_batches(output_columnar_path, columns,
+                         [{'Name': list(school_counts), 'SCHOOLS_COUNT': list(school_counts.values())}])
+    print(f"School counts have been written to {output_columnar_path}")
\ No newline at end of file
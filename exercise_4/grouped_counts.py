@@ -0,0 +1,189 @@
+"""
+Grouped point counts per district and category (exercises 4.4 and 5.1).
+
+One pass over the points fills a district × category count matrix, e.g.
+schools per district by SchoolType, optionally with the sum and mean of a
+numeric field. The districts are found through a spatial index with
+prepared geometries. Result tables are cached per layer pair and field
+combination and dropped when one of the layers changes, so dashboards can
+query any category without another scan.
+
+Points whose category is NULL are counted under the category None.
+QGIS is only imported by compute_grouped_counts, the count matrix itself
+is plain NumPy.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# The layer cache is shared with other exercises
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from layer_cache import LayerCache
+
+# Cached tables per (districts layer id, points layer id, category field, value field, name field)
+_tables = LayerCache()
+
+# Default of GroupedCounts.count: all categories (None is the NULL category)
+_ALL = object()
+
+
+class GroupedCounts:
+    """
+    District × category count matrix with optional sums of a numeric field.
+
+    Attributes:
+        districts (list): District names (rows)
+        categories (list): Category values (columns), sorted, None (NULL) last
+        counts (ndarray): Point count per district and category
+        sums (ndarray): Sum of the value field per cell, None without value field
+    """
+
+    def __init__(self, districts, categories, counts, sums=None):
+        self.districts = districts
+        self.categories = categories
+        self.counts = counts
+        self.sums = sums
+        self._rows = {name: i for i, name in enumerate(districts)}
+        self._columns = {category: j for j, category in enumerate(categories)}
+
+    @classmethod
+    def from_cells(cls, districts, cells, with_sums=False):
+        """
+        Build the matrix from one (district row, category, value) tuple per point.
+
+        Args:
+            districts (list): District names, indexed by the district rows
+            cells (list): Category None stands for NULL, value is ignored without sums
+            with_sums (bool): Also sum the values per cell
+        """
+        # Sort the categories for stable columns
+        categories = sorted({category for _, category, _ in cells},
+                            key=lambda category: (category is None, str(category)))
+        columns = {category: j for j, category in enumerate(categories)}
+        counts = np.zeros((len(districts), len(categories)), dtype=np.int64)
+        sums = np.zeros((len(districts), len(categories)), dtype=np.float64) if with_sums else None
+        if cells:
+            rows = np.array([row for row, _, _ in cells], dtype=np.int64)
+            cell_columns = np.array([columns[category] for _, category, _ in cells], dtype=np.int64)
+            np.add.at(counts, (rows, cell_columns), 1)
+            if sums is not None:
+                values = np.array([0.0 if value is None else value for _, _, value in cells], dtype=np.float64)
+                np.add.at(sums, (rows, cell_columns), values)
+        return cls(districts, categories, counts, sums)
+
+    def count(self, district, category=_ALL):
+        # Points of one category (None for NULL) in a district, or all points of the district
+        row = self.counts[self._rows[district]]
+        if category is _ALL:
+            return int(row.sum())
+        column = self._columns.get(category)
+        return int(row[column]) if column is not None else 0
+
+    def total(self, district):
+        # All points of a district
+        return self.count(district)
+
+    def mean(self, district, category):
+        # Mean of the value field for one cell, None if the cell is empty or there is no value field
+        column = self._columns.get(category)
+        if self.sums is None or column is None:
+            return None
+        row = self._rows[district]
+        count = int(self.counts[row, column])
+        return float(self.sums[row, column]) / count if count else None
+
+    def table(self):
+        # Rows of (district, category, count[, sum, mean]) for all non-empty cells
+        rows = []
+        for i, district in enumerate(self.districts):
+            for j, category in enumerate(self.categories):
+                count = int(self.counts[i, j])
+                if count == 0:
+                    continue
+                if self.sums is None:
+                    rows.append((district, category, count))
+                else:
+                    total = float(self.sums[i, j])
+                    rows.append((district, category, count, total, total / count))
+        return rows
+
+
+def compute_grouped_counts(districts_layer, points_layer, category_field, value_field=None,
+                           name_field='Name'):
+    """
+    Count the points per district and category in one pass over the points.
+
+    Args:
+        districts_layer (QgsVectorLayer): District polygons
+        points_layer (QgsVectorLayer): Points to count, e.g. schools
+        category_field (str): Field of the points to group by, e.g. 'SchoolType'
+        value_field (str): Optional numeric field of the points to sum
+        name_field (str): District name field
+
+    Returns:
+        GroupedCounts: The count matrix
+    """
+    from qgis.PyQt.QtCore import QVariant
+    from qgis.core import (QgsCoordinateTransform, QgsFeatureRequest, QgsGeometry, QgsProject,
+                           QgsSpatialIndex)
+
+    def value_of(feature, field_name):
+        # Attribute value with QGIS NULL as None, NULL QVariants would each form their own group
+        value = feature[field_name]
+        return None if isinstance(value, QVariant) and value.isNull() else value
+
+    # Index the districts once
+    index = QgsSpatialIndex()
+    district_rows = {}
+    districts = []
+    geometries = {}
+    engines = {}
+    for feature in districts_layer.getFeatures():
+        if not feature.hasGeometry():
+            continue
+        fid = feature.id()
+        index.addFeature(feature)
+        district_rows[fid] = len(districts)
+        districts.append(feature[name_field])
+        # Keep the geometry alive, the engine only references it
+        geometries[fid] = feature.geometry()
+        engines[fid] = QgsGeometry.createGeometryEngine(geometries[fid].constGet())
+        engines[fid].prepareGeometry()
+
+    transform = None
+    if points_layer.crs() != districts_layer.crs():
+        transform = QgsCoordinateTransform(points_layer.crs(), districts_layer.crs(), QgsProject.instance())
+
+    # Single pass over the points, only the grouping (and value) field is read
+    fields = [category_field] + ([value_field] if value_field else [])
+    request = QgsFeatureRequest().setSubsetOfAttributes(fields, points_layer.fields())
+    cells = []
+    for feature in points_layer.getFeatures(request):
+        if not feature.hasGeometry():
+            continue
+        geometry = feature.geometry()
+        if transform is not None:
+            geometry.transform(transform)
+        geometry_part = geometry.constGet()
+        for fid in index.intersects(geometry.boundingBox()):
+            if engines[fid].intersects(geometry_part):
+                value = value_of(feature, value_field) if value_field else None
+                cells.append((district_rows[fid], value_of(feature, category_field), value))
+                break
+
+    return GroupedCounts.from_cells(districts, cells, with_sums=bool(value_field))
+
+
+def grouped_counts(districts_layer, points_layer, category_field, value_field=None, name_field='Name'):
+    """
+    Cached version of compute_grouped_counts.
+
+    The table is computed on the first call and returned from the cache
+    until one of the two layers changes.
+    """
+    key = (districts_layer.id(), points_layer.id(), category_field, value_field, name_field)
+    return _tables.get(key, (districts_layer, points_layer),
+                       lambda: compute_grouped_counts(districts_layer, points_layer, category_field,
+                                                      value_field, name_field))
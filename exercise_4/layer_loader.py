@@ -0,0 +1,156 @@
+"""
+Parallel shapefile discovery and loading (exercise 4.3).
+
+Folders are walked recursively with os.scandir, the shapefiles are validated
+and opened in a thread pool (opening is dominated by file I/O, which is slow
+on network shares), and all valid layers are added to the project with one
+addMapLayers call.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+# Files that must exist next to a .shp for it to be readable
+REQUIRED_SIDECARS = ['.shx', '.dbf']
+
+
+def find_shapefiles(folder):
+    """
+    Recursively find all shapefiles below a folder.
+
+    Args:
+        folder (str): Folder to search
+
+    Returns:
+        list: Sorted paths of all .shp files
+    """
+    shapefile_paths = []
+    folders = [folder]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.name.lower().endswith('.shp') and entry.is_file():
+                    shapefile_paths.append(entry.path)
+    return sorted(shapefile_paths)
+
+
+def missing_sidecars(shapefile_path):
+    # Returns the required sidecar extensions that do not exist for a shapefile
+    stem = os.path.splitext(shapefile_path)[0]
+    return [extension for extension in REQUIRED_SIDECARS
+            if not (os.path.exists(stem + extension) or os.path.exists(stem + extension.upper()))]
+
+
+def open_layer(shapefile_path):
+    """
+    Validate and open one shapefile.
+
+    Args:
+        shapefile_path (str): Path of the .shp file
+
+    Returns:
+        tuple: (layer or None, seconds, error message or None)
+    """
+    # QGIS is imported here so find_shapefiles also works without it
+    from qgis.PyQt.QtCore import QCoreApplication
+    from qgis.core import QgsVectorLayer
+
+    start = time.perf_counter()
+    layer_name = os.path.splitext(os.path.basename(shapefile_path))[0]
+
+    missing = missing_sidecars(shapefile_path)
+    if missing:
+        return None, time.perf_counter() - start, f"missing {', '.join(missing)}"
+
+    layer = QgsVectorLayer(shapefile_path, layer_name, "ogr")
+    if not layer.isValid():
+        return None, time.perf_counter() - start, "layer is not valid"
+
+    # Layers opened in a worker thread must live in the main thread to join the project
+    app = QCoreApplication.instance()
+    if app is not None:
+        layer.moveToThread(app.thread())
+    return layer, time.perf_counter() - start, None
+
+
+def open_layers(shapefile_paths, max_workers=8):
+    """
+    Open many shapefiles, in a thread pool if max_workers > 1.
+
+    Args:
+        shapefile_paths (list): Paths of the .shp files
+        max_workers (int): Number of threads, 1 opens the files one after another
+
+    Returns:
+        list: (path, layer or None, seconds, error or None) in input order
+    """
+    if max_workers <= 1:
+        results = [open_layer(path) for path in shapefile_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(open_layer, shapefile_paths))
+    return [(path,) + result for path, result in zip(shapefile_paths, results)]
+
+
+def load_folder_into_project(project, folder, max_workers=8):
+    """
+    Add all shapefiles below a folder to a project.
+
+    Args:
+        project (QgsProject): Project receiving the layers
+        folder (str): Folder searched recursively
+        max_workers (int): Number of threads used to open the layers
+
+    Returns:
+        list: (path, layer or None, seconds, error or None) per shapefile
+    """
+    results = open_layers(find_shapefiles(folder), max_workers)
+
+    for path, layer, seconds, error in results:
+        if error:
+            print(f"Error loading the layer {path}: {error} ({seconds * 1000:.0f} ms)")
+        else:
+            print(f"Opened layer: {layer.name()} ({seconds * 1000:.0f} ms)")
+
+    # One call for all layers instead of one per layer
+    layers = [layer for _, layer, _, error in results if not error]
+    project.addMapLayers(layers)
+    print(f"Added {len(layers)} of {len(results)} layers")
+    return results
+
+
+def benchmark_loading(folder, max_workers=8):
+    """
+    Compare opening all shapefiles of a folder sequentially and in parallel.
+
+    Args:
+        folder (str): Folder searched recursively
+        max_workers (int): Number of threads for the parallel run
+
+    Returns:
+        dict: Wall time in seconds of both runs and the speedup
+    """
+    shapefile_paths = find_shapefiles(folder)
+
+    start = time.perf_counter()
+    open_layers(shapefile_paths, max_workers=1)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    open_layers(shapefile_paths, max_workers=max_workers)
+    parallel = time.perf_counter() - start
+
+    result = {
+        'shapefiles': len(shapefile_paths),
+        'sequential_seconds': sequential,
+        'parallel_seconds': parallel,
+        'speedup': sequential / parallel if parallel else float('inf'),
+    }
+    print(f"{len(shapefile_paths)} shapefiles")
+    print(f"Sequential: {sequential:.2f} s")
+    print(f"Parallel:   {parallel:.2f} s ({max_workers} threads)")
+    print(f"Speedup:    {result['speedup']:.1f}x")
+    return result
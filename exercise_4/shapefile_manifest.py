@@ -0,0 +1,218 @@
+"""
+Lazy shapefile manifest (exercise 4.3).
+
+Instead of opening every shapefile, only the file headers are read with a
+pure-Python reader: geometry type and extent from the .shp header, feature
+count from the .shx size, record count and fields from the .dbf header and
+the CRS from the .prj. The result is written to a JSON catalog file, and
+layers are only opened when they are first accessed through LazyLayerCatalog.
+"""
+
+import json
+import os
+import struct
+import time
+
+from layer_loader import find_shapefiles
+
+# Shape types of the ESRI shapefile specification
+SHAPE_TYPES = {
+    0: 'Null', 1: 'Point', 3: 'PolyLine', 5: 'Polygon', 8: 'MultiPoint',
+    11: 'PointZ', 13: 'PolyLineZ', 15: 'PolygonZ', 18: 'MultiPointZ',
+    21: 'PointM', 23: 'PolyLineM', 25: 'PolygonM', 28: 'MultiPointM',
+    31: 'MultiPatch',
+}
+
+# dBase field type codes
+DBF_FIELD_TYPES = {'C': 'String', 'N': 'Number', 'F': 'Float', 'L': 'Boolean', 'D': 'Date', 'M': 'Memo'}
+
+
+def _sidecar(shapefile_path, extension):
+    # Path of a sidecar file in lower or upper case, or None if it does not exist
+    stem = os.path.splitext(shapefile_path)[0]
+    for candidate in (stem + extension, stem + extension.upper()):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def read_shp_header(shp_path):
+    """
+    Read the 100 byte main file header of a .shp file.
+
+    Returns:
+        dict: 'geometry_type' and 'extent' [xmin, ymin, xmax, ymax]
+    """
+    with open(shp_path, 'rb') as shp_file:
+        header = shp_file.read(100)
+    if len(header) < 100 or struct.unpack('>i', header[0:4])[0] != 9994:
+        raise ValueError(f"{shp_path} is not a shapefile")
+    shape_type = struct.unpack('<i', header[32:36])[0]
+    xmin, ymin, xmax, ymax = struct.unpack('<4d', header[36:68])
+    return {
+        'geometry_type': SHAPE_TYPES.get(shape_type, f'Unknown ({shape_type})'),
+        'extent': [xmin, ymin, xmax, ymax],
+    }
+
+
+def read_shx_count(shx_path):
+    # The index file has a 100 byte header and one 8 byte record per feature
+    return (os.path.getsize(shx_path) - 100) // 8
+
+
+def read_dbf_header(dbf_path):
+    """
+    Read record count and field descriptors from a .dbf header.
+
+    Returns:
+        dict: 'record_count' and 'fields' (list of {name, type, length, decimals})
+    """
+    with open(dbf_path, 'rb') as dbf_file:
+        header = dbf_file.read(32)
+        record_count, header_length = struct.unpack('<IH', header[4:10])
+        descriptors = dbf_file.read(header_length - 32)
+
+    fields = []
+    for offset in range(0, len(descriptors) - 31, 32):
+        descriptor = descriptors[offset:offset + 32]
+        if descriptor[0] == 0x0D:  # Header terminator
+            break
+        name = descriptor[:11].split(b'\0', 1)[0].decode('latin-1')
+        field_type = chr(descriptor[11])
+        fields.append({
+            'name': name,
+            'type': DBF_FIELD_TYPES.get(field_type, field_type),
+            'length': descriptor[16],
+            'decimals': descriptor[17],
+        })
+    return {'record_count': record_count, 'fields': fields}
+
+
+def read_shapefile_header(shapefile_path):
+    """
+    Collect the manifest entry of one shapefile from its headers only.
+
+    Args:
+        shapefile_path (str): Path of the .shp file
+
+    Returns:
+        dict: Name, path, geometry type, feature count, extent, CRS and fields
+    """
+    entry = {
+        'name': os.path.splitext(os.path.basename(shapefile_path))[0],
+        'path': shapefile_path,
+    }
+    entry.update(read_shp_header(shapefile_path))
+
+    shx_path = _sidecar(shapefile_path, '.shx')
+    dbf_path = _sidecar(shapefile_path, '.dbf')
+    prj_path = _sidecar(shapefile_path, '.prj')
+
+    dbf = read_dbf_header(dbf_path) if dbf_path else {'record_count': None, 'fields': []}
+    entry['feature_count'] = read_shx_count(shx_path) if shx_path else dbf['record_count']
+    entry['fields'] = dbf['fields']
+    entry['crs_wkt'] = None
+    if prj_path:
+        with open(prj_path, 'r', encoding='utf-8', errors='replace') as prj_file:
+            entry['crs_wkt'] = prj_file.read().strip()
+    return entry
+
+
+def build_manifest(folder):
+    """
+    Read the headers of all shapefiles below a folder.
+
+    Args:
+        folder (str): Folder searched recursively
+
+    Returns:
+        list: Manifest entries; unreadable files get an 'error' entry
+    """
+    manifest = []
+    for shapefile_path in find_shapefiles(folder):
+        try:
+            manifest.append(read_shapefile_header(shapefile_path))
+        except (OSError, ValueError, struct.error) as e:
+            manifest.append({'name': os.path.splitext(os.path.basename(shapefile_path))[0],
+                             'path': shapefile_path, 'error': str(e)})
+    return manifest
+
+
+def write_manifest(folder, manifest_path):
+    """
+    Build the manifest of a folder and write it to a JSON catalog file.
+
+    Returns:
+        list: The manifest entries
+    """
+    start = time.perf_counter()
+    manifest = build_manifest(folder)
+    with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump({'folder': folder, 'layers': manifest}, manifest_file, indent=2)
+    print(f"Wrote manifest of {len(manifest)} shapefiles to {manifest_path} "
+          f"in {time.perf_counter() - start:.2f} s")
+    return manifest
+
+
+def catalog_names(manifest, folder):
+    """
+    Unique catalog name of every manifest entry.
+
+    Shapefiles are named after their file; files with the same name in
+    different subfolders are named by their path relative to the folder
+    instead, so none of them is hidden by another.
+
+    Returns:
+        list: Names in manifest order
+    """
+    counts = {}
+    for entry in manifest:
+        counts[entry['name']] = counts.get(entry['name'], 0) + 1
+    names = []
+    for entry in manifest:
+        if counts[entry['name']] == 1:
+            names.append(entry['name'])
+        else:
+            relative = os.path.splitext(os.path.relpath(entry['path'], folder))[0]
+            names.append(relative.replace(os.sep, '/'))
+    return names
+
+
+class LazyLayerCatalog:
+    """
+    Catalog of shapefiles that opens a layer only when it is first accessed.
+
+    Layers are named as in catalog_names.
+
+    Args:
+        manifest_path (str): JSON catalog written by write_manifest
+        project (QgsProject): If given, layers are added to it when opened
+    """
+
+    def __init__(self, manifest_path, project=None):
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            catalog = json.load(manifest_file)
+        manifest = catalog['layers']
+        self.entries = dict(zip(catalog_names(manifest, catalog['folder']), manifest))
+        self.project = project
+        self.layers = {}
+
+    def names(self):
+        # Sorted names of all readable shapefiles
+        return sorted(name for name, entry in self.entries.items() if 'error' not in entry)
+
+    def info(self, name):
+        # Header information of a shapefile, without opening it
+        return self.entries[name]
+
+    def layer(self, name):
+        # Opens the layer on first access, later calls return the same layer
+        if name not in self.layers:
+            from qgis.core import QgsVectorLayer
+            layer = QgsVectorLayer(self.entries[name]['path'], name, "ogr")
+            if not layer.isValid():
+                raise Exception(f"Error loading the layer: {name}")
+            if self.project is not None:
+                self.project.addMapLayer(layer)
+            self.layers[name] = layer
+        return self.layers[name]
@@ -0,0 +1,199 @@
+"""
+Batch coordinate transformation from WGS84 lon/lat to ETRS89 / UTM.
+
+Input is processed in chunks of NumPy arrays so whole CSV files of GPS fixes
+can be reprojected with bounded memory. The transformer object is created
+once per CRS pair and cached. Three backends are tried in order:
+
+- pyproj (vectorized, ships with most QGIS installations)
+- QgsCoordinateTransform (one cached instance, per-point loop)
+- a pure-NumPy transverse Mercator implementation for headless runs
+"""
+
+import csv
+import functools
+
+import numpy as np
+
+# Semi-major axis and flattening of GRS80, the ellipsoid of ETRS89
+GRS80_A = 6378137.0
+GRS80_F = 1 / 298.257222101
+
+
+def utm_zone_from_epsg(epsg):
+    # Returns the UTM zone number for ETRS89 (258xx) and WGS84 (326xx) UTM codes
+    if 25828 <= epsg <= 25838:
+        return epsg - 25800
+    if 32601 <= epsg <= 32660:
+        return epsg - 32600
+    raise ValueError(f"EPSG:{epsg} is not a northern UTM zone")
+
+
+def utm_forward(lon, lat, zone, a=GRS80_A, f=GRS80_F):
+    """
+    Project lon/lat arrays to UTM easting/northing (northern hemisphere).
+
+    Uses the Krüger series of the transverse Mercator projection, which is
+    accurate to well below a millimetre inside the zone. The WGS84 → ETRS89
+    datum shift (below one metre) is not applied.
+
+    Args:
+        lon (array-like): Longitudes in degrees
+        lat (array-like): Latitudes in degrees
+        zone (int): UTM zone number
+
+    Returns:
+        tuple: (easting, northing) as float64 arrays
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+
+    k0 = 0.9996
+    n = f / (2 - f)
+    big_a = a / (1 + n) * (1 + n ** 2 / 4 + n ** 4 / 64)
+    alpha = (n / 2 - 2 * n ** 2 / 3 + 5 * n ** 3 / 16,
+             13 * n ** 2 / 48 - 3 * n ** 3 / 5,
+             61 * n ** 3 / 240)
+
+    phi = np.radians(lat)
+    dlam = np.radians(lon - (zone * 6 - 183))
+    c = 2 * np.sqrt(n) / (1 + n)
+    sin_phi = np.sin(phi)
+    t = np.sinh(np.arctanh(sin_phi) - c * np.arctanh(c * sin_phi))
+    xi = np.arctan2(t, np.cos(dlam))
+    eta = np.arctanh(np.sin(dlam) / np.sqrt(1 + t ** 2))
+
+    easting = eta.copy()
+    northing = xi.copy()
+    for j, alpha_j in enumerate(alpha, start=1):
+        easting += alpha_j * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        northing += alpha_j * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+
+    return 500000.0 + k0 * big_a * easting, k0 * big_a * northing
+
+
+@functools.lru_cache(maxsize=None)
+def _pyproj_transformer(source_epsg, target_epsg):
+    from pyproj import Transformer
+    return Transformer.from_crs(source_epsg, target_epsg, always_xy=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _qgis_transform(source_epsg, target_epsg):
+    from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject
+    if isinstance(target_epsg, str):
+        target_crs = QgsCoordinateReferenceSystem.fromWkt(target_epsg)
+    else:
+        target_crs = QgsCoordinateReferenceSystem(target_epsg)
+    return QgsCoordinateTransform(QgsCoordinateReferenceSystem(source_epsg), target_crs,
+                                  QgsProject.instance())
+
+
+class BatchTransformer:
+    """
+    Vectorized WGS84 → UTM transformer working on chunks of arrays.
+
+    Args:
+        target_epsg (int or str): Target CRS, ETRS89 / UTM zone 32N by default; a WKT
+            string for CRSs without EPSG code (not supported by the numpy backend)
+        backend (str): 'pyproj', 'qgis', 'numpy' or None to pick the first available
+        chunk_size (int): Number of points transformed per chunk
+    """
+
+    BACKENDS = ('pyproj', 'qgis', 'numpy')
+
+    def __init__(self, target_epsg=25832, backend=None, chunk_size=100000):
+        self.source_epsg = 4326
+        self.target_epsg = target_epsg
+        self.chunk_size = chunk_size
+        self.backend = backend or self._detect_backend()
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown transform backend: {self.backend}")
+        if self.backend == 'numpy':
+            if isinstance(target_epsg, str):
+                raise ValueError("The numpy backend needs an EPSG code of a UTM zone, not a WKT definition")
+            self.zone = utm_zone_from_epsg(target_epsg)
+
+    def _detect_backend(self):
+        # Use the first backend that can be imported
+        try:
+            import pyproj  # noqa: F401
+            return 'pyproj'
+        except ImportError:
+            pass
+        try:
+            import qgis.core  # noqa: F401
+            return 'qgis'
+        except ImportError:
+            return 'numpy'
+
+    def _transform_chunk(self, lon, lat):
+        if self.backend == 'pyproj':
+            transformer = _pyproj_transformer(self.source_epsg, self.target_epsg)
+            return transformer.transform(lon, lat)
+        if self.backend == 'qgis':
+            from qgis.core import QgsPointXY
+            transform = _qgis_transform(self.source_epsg, self.target_epsg)
+            easting = np.empty(len(lon))
+            northing = np.empty(len(lon))
+            for i, (x, y) in enumerate(zip(lon.tolist(), lat.tolist())):
+                point = transform.transform(QgsPointXY(x, y))
+                easting[i] = point.x()
+                northing[i] = point.y()
+            return easting, northing
+        return utm_forward(lon, lat, self.zone)
+
+    def transform(self, lon, lat):
+        """
+        Transform lon/lat arrays to easting/northing arrays.
+
+        Args:
+            lon (array-like): Longitudes in degrees
+            lat (array-like): Latitudes in degrees
+
+        Returns:
+            tuple: (easting, northing) as float64 arrays
+        """
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        if lon.shape != lat.shape:
+            raise ValueError("lon and lat must have the same shape")
+
+        easting = np.empty_like(lon)
+        northing = np.empty_like(lat)
+        for start in range(0, len(lon), self.chunk_size):
+            stop = start + self.chunk_size
+            easting[start:stop], northing[start:stop] = self._transform_chunk(lon[start:stop], lat[start:stop])
+        return easting, northing
+
+    def iter_csv(self, csv_path, lat_column='lat', lon_column='lon', delimiter=','):
+        """
+        Stream a CSV file of WGS84 fixes and yield transformed chunks.
+
+        Only one chunk of coordinates is held in memory at a time.
+
+        Args:
+            csv_path (str): Path to the CSV file
+            lat_column (str): Header of the latitude column
+            lon_column (str): Header of the longitude column
+            delimiter (str): CSV delimiter
+
+        Yields:
+            tuple: (easting, northing) arrays of at most chunk_size points
+        """
+        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile, delimiter=delimiter)
+            lon = np.empty(self.chunk_size)
+            lat = np.empty(self.chunk_size)
+            count = 0
+            for row in reader:
+                lon[count] = float(row[lon_column])
+                lat[count] = float(row[lat_column])
+                count += 1
+                if count == self.chunk_size:
+                    yield self._transform_chunk(lon, lat)
+                    lon = np.empty(self.chunk_size)
+                    lat = np.empty(self.chunk_size)
+                    count = 0
+            if count:
+                yield self._transform_chunk(lon[:count], lat[:count])
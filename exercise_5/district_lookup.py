@@ -0,0 +1,156 @@
+"""
+District lookup engine for the Geoguesser script (exercise 5.2).
+
+The districts are put into an R-tree (QgsSpatialIndex) once. A lookup only
+runs the exact containment test against the districts whose bounding box
+contains the point, using prepared geometry engines.
+"""
+
+import time
+
+import numpy as np
+from qgis.core import (QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsGeometry,
+                       QgsPointXY, QgsProject, QgsRectangle, QgsSpatialIndex)
+
+from coordinate_transform import BatchTransformer
+
+
+class DistrictLookup:
+    """
+    Point-in-district lookup over a city districts polygon layer.
+
+    Args:
+        districts_layer (QgsVectorLayer): Polygon layer with the city districts
+        name_field (str): Field holding the district name
+    """
+
+    def __init__(self, districts_layer, name_field='Name'):
+        self.crs = districts_layer.crs()
+        self.index = QgsSpatialIndex()
+        self.names = {}
+        self.geometries = {}
+        self.engines = {}
+
+        # Read the districts once and index their bounding boxes
+        for feature in districts_layer.getFeatures():
+            geometry = feature.geometry()
+            if geometry.isNull() or geometry.isEmpty():
+                continue
+            fid = feature.id()
+            self.index.addFeature(feature)
+            self.names[fid] = feature[name_field]
+            # Keep the geometry alive, the engine only references it
+            self.geometries[fid] = geometry
+            engine = QgsGeometry.createGeometryEngine(geometry.constGet())
+            engine.prepareGeometry()
+            self.engines[fid] = engine
+
+        # Cached batch transformer used for lat/lon input; custom CRSs have no EPSG code
+        # (postgisSrid() is 0 for them) and are passed as WKT
+        authid = self.crs.authid()
+        if authid.upper().startswith('EPSG:'):
+            self.transformer = BatchTransformer(target_epsg=int(authid.split(':', 1)[1]))
+        else:
+            self.transformer = BatchTransformer(target_epsg=self.crs.toWkt())
+
+    def lookup_point(self, x, y):
+        # Returns the name of the district containing (x, y) in layer CRS, or None
+        point = QgsGeometry.fromPointXY(QgsPointXY(x, y))
+        for fid in self.index.intersects(QgsRectangle(x, y, x, y)):
+            if self.engines[fid].contains(point.constGet()):
+                return self.names[fid]
+        return None
+
+    def lookup_many(self, coordinates):
+        """
+        Look up the district for a batch of WGS84 coordinates.
+
+        Args:
+            coordinates (iterable): (lat, lon) pairs
+
+        Returns:
+            list: District name per coordinate, None where no district contains it
+        """
+        coordinates = np.asarray(list(coordinates), dtype=np.float64).reshape(-1, 2)
+        easting, northing = self.transformer.transform(coordinates[:, 1], coordinates[:, 0])
+        return self.lookup_xy_many(easting, northing)
+
+    def lookup_xy_many(self, xs, ys):
+        # Look up already projected coordinates (layer CRS)
+        return [self.lookup_point(x, y) for x, y in zip(np.asarray(xs).tolist(), np.asarray(ys).tolist())]
+
+    def lookup_csv(self, csv_path, lat_column='lat', lon_column='lon', delimiter=','):
+        """
+        Look up the district for every WGS84 fix in a CSV file.
+
+        The file is reprojected chunk by chunk, so memory stays bounded.
+
+        Args:
+            csv_path (str): Path to the CSV file
+            lat_column (str): Header of the latitude column
+            lon_column (str): Header of the longitude column
+            delimiter (str): CSV delimiter
+
+        Yields:
+            str: District name per row, None where no district contains it
+        """
+        for easting, northing in self.transformer.iter_csv(csv_path, lat_column, lon_column, delimiter):
+            yield from self.lookup_xy_many(easting, northing)
+
+    def lookup(self, lat, lon):
+        # Single coordinate version of lookup_many
+        return self.lookup_many([(lat, lon)])[0]
+
+
+def linear_lookup_many(districts_layer, coordinates, name_field='Name'):
+    # Reference implementation: the per-point loop over all districts used by exercise_5_2.py
+    transform = QgsCoordinateTransform(QgsCoordinateReferenceSystem(4326), districts_layer.crs(),
+                                       QgsProject.instance())
+    results = []
+    for lat, lon in coordinates:
+        point_geometry = QgsGeometry.fromPointXY(transform.transform(QgsPointXY(lon, lat)))
+        district_name = None
+        for feature in districts_layer.getFeatures():
+            if feature.geometry().contains(point_geometry):
+                district_name = feature[name_field]
+                break
+        results.append(district_name)
+    return results
+
+
+def benchmark_lookup(districts_layer, coordinates, name_field='Name'):
+    """
+    Compare bulk throughput of DistrictLookup against the linear scan.
+
+    Args:
+        districts_layer (QgsVectorLayer): City districts layer
+        coordinates (list): (lat, lon) pairs to look up
+        name_field (str): Field holding the district name
+
+    Returns:
+        dict: Points per second for both methods and the speedup
+    """
+    coordinates = list(coordinates)
+
+    start = time.perf_counter()
+    linear_results = linear_lookup_many(districts_layer, coordinates, name_field)
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lookup = DistrictLookup(districts_layer, name_field)
+    indexed_results = lookup.lookup_many(coordinates)
+    indexed_time = time.perf_counter() - start
+
+    if linear_results != indexed_results:
+        print("Warning: indexed and linear lookup results differ!")
+
+    result = {
+        'points': len(coordinates),
+        'linear_points_per_sec': len(coordinates) / linear_time if linear_time else float('inf'),
+        'indexed_points_per_sec': len(coordinates) / indexed_time if indexed_time else float('inf'),
+        'speedup': linear_time / indexed_time if indexed_time else float('inf'),
+    }
+    print(f"Linear scan:  {result['linear_points_per_sec']:.0f} points/s")
+    print(f"Indexed:      {result['indexed_points_per_sec']:.0f} points/s (including index build)")
+    print(f"Speedup:      {result['speedup']:.1f}x")
+    return result
@@ -1,6 +1,12 @@
 from qgis.PyQt.QtWidgets import QInputDialog, QMessageBox
-from qgis.core import QgsVectorLayer, QgsFeatureRequest, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject, QgsPointXY, QgsGeometry
+from qgis.core import QgsProject
 from qgis.utils import iface
+import os
+import sys
+
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from district_lookup import DistrictLookup
 
 # Get the currently loaded layer by name
 city_districts_layer = QgsProject.instance().mapLayersByName("Muenster_City_Districts")[0]
@@ -16,30 +22,13 @@ if bOk:
         # Parse the input coordinates
         lat, lon = map(float, sCoords.split(','))
 
-        # Define the CRS for WGS84 and ETRS89 32N
-        crsWGS84 = QgsCoordinateReferenceSystem(4326)  # WGS 84
-        crsETRS89_32N = QgsCoordinateReferenceSystem(25832)  # ETRS89 / UTM zone 32N
-
-        # Create a coordinate transform
-        transformation = QgsCoordinateTransform(crsWGS84, crsETRS89_32N, QgsProject.instance())
-
-        # Transform the input coordinates to ETRS89 32N
-        pointWGS84 = QgsPointXY(lon, lat)
-        pointETRS89_32N = transformation.transform(pointWGS84)
-
-        # Create a point geometry
-        point_geometry = QgsGeometry.fromPointXY(pointETRS89_32N)
-
-        # Check if the point falls within any city district using spatial relationship
-        found_district = False
-        for feature in city_districts_layer.getFeatures():
-            if feature.geometry().contains(point_geometry):
-                district_name = feature['Name']
-                QMessageBox.information(parent, "Geoguesser Result", f"The coordinates fall within the district: {district_name}")
-                found_district = True
-                break
+        # Look up the district through the spatial index of the districts
+        lookup = DistrictLookup(city_districts_layer)
+        district_name = lookup.lookup(lat, lon)
 
-        if not found_district:
+        if district_name is not None:
+            QMessageBox.information(parent, "Geoguesser Result", f"The coordinates fall within the district: {district_name}")
+        else:
             # Point is not within any city district
             QMessageBox.information(parent, "Geoguesser Result", "The coordinates do not fall within any city district.")
 
@@ -0,0 +1,141 @@
+"""
+Indexed "schools in district" query service (exercise 5.1).
+
+The schools are kept in a spatial index and every district gets a prepared
+geometry, so a query only tests the schools inside the district's bounding
+box. Distances to the district centroid are computed for all schools of a
+district at once with vectorized ellipsoidal math. Results are memoized per
+district and dropped as soon as the districts or schools layer is edited.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from qgis.core import (QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsGeometry,
+                       QgsProject, QgsSpatialIndex)
+
+from geodesic import geodesic_distance
+
+# The layer cache is shared with other exercises
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from layer_cache import LayerCache
+
+# Geographic CRS of ETRS89, distances are measured on its ellipsoid (GRS80)
+ETRS89_GEOGRAPHIC = QgsCoordinateReferenceSystem(4258)
+
+# Services per (districts layer id, schools layer id, name field)
+_services = LayerCache()
+
+
+class SchoolQueryService:
+    """
+    Answers "which schools are in district X and how far from its centre".
+
+    Args:
+        districts_layer (QgsVectorLayer): City districts polygon layer
+        schools_layer (QgsVectorLayer): Schools point layer
+        name_field (str): District name field
+    """
+
+    def __init__(self, districts_layer, schools_layer, name_field='Name'):
+        self.districts_layer = districts_layer
+        self.schools_layer = schools_layer
+        self.name_field = name_field
+        self._districts = None
+        self._schools = None
+        self._results = {}
+
+    def invalidate(self):
+        # Drop indexes and memoized results, they are rebuilt on the next query
+        self._districts = None
+        self._schools = None
+        self._results = {}
+
+    def _load_districts(self):
+        # District geometries by name, prepared engines are created on first use
+        if self._districts is None:
+            self._districts = {str(feature[self.name_field]): {'geometry': feature.geometry(), 'engine': None}
+                               for feature in self.districts_layer.getFeatures()}
+        return self._districts
+
+    def _load_schools(self):
+        # Spatial index, attributes and geographic coordinates of all schools
+        if self._schools is None:
+            to_geographic = QgsCoordinateTransform(self.schools_layer.crs(), ETRS89_GEOGRAPHIC,
+                                                   QgsProject.instance())
+            index = QgsSpatialIndex()
+            features = {}
+            for school in self.schools_layer.getFeatures():
+                if not school.hasGeometry():
+                    continue
+                index.addFeature(school)
+                point = school.geometry().centroid().asPoint()
+                lonlat = to_geographic.transform(point)
+                features[school.id()] = {
+                    'name': school['Name'],
+                    'type': school['SchoolType'],
+                    'geometry': school.geometry(),
+                    'lon': lonlat.x(),
+                    'lat': lonlat.y(),
+                }
+            self._schools = {'index': index, 'features': features}
+        return self._schools
+
+    def district_names(self):
+        # Alphabetically sorted district names
+        return sorted(self._load_districts())
+
+    def schools_in_district(self, district_name):
+        """
+        Schools inside a district with their distance to the district centroid.
+
+        Args:
+            district_name (str): Name of the district
+
+        Returns:
+            list: Dicts with 'id', 'name', 'type' and 'distance_km', in layer order
+        """
+        if district_name in self._results:
+            return self._results[district_name]
+
+        district = self._load_districts()[district_name]
+        schools = self._load_schools()
+        if district['engine'] is None:
+            district['engine'] = QgsGeometry.createGeometryEngine(district['geometry'].constGet())
+            district['engine'].prepareGeometry()
+
+        # Only the schools in the district's bounding box are tested exactly
+        engine = district['engine']
+        candidates = sorted(schools['index'].intersects(district['geometry'].boundingBox()))
+        inside = [fid for fid in candidates
+                  if engine.contains(schools['features'][fid]['geometry'].constGet())]
+
+        # Distances of all schools to the centroid in one vectorized call
+        to_geographic = QgsCoordinateTransform(self.districts_layer.crs(), ETRS89_GEOGRAPHIC,
+                                               QgsProject.instance())
+        centroid = to_geographic.transform(district['geometry'].centroid().asPoint())
+        lon = np.array([schools['features'][fid]['lon'] for fid in inside])
+        lat = np.array([schools['features'][fid]['lat'] for fid in inside])
+        distances = geodesic_distance(centroid.x(), centroid.y(), lon, lat) / 1000  # Convert to kilometers
+
+        result = [{'id': fid,
+                   'name': schools['features'][fid]['name'],
+                   'type': schools['features'][fid]['type'],
+                   'distance_km': float(distance)}
+                  for fid, distance in zip(inside, distances)]
+        self._results[district_name] = result
+        return result
+
+
+def school_query_service(districts_layer, schools_layer, name_field='Name'):
+    """
+    Return the shared query service of a districts/schools layer pair.
+
+    The service (and its memoized results) survives between script runs in
+    the same QGIS session, until one of its layers is edited or removed.
+    """
+    key = (districts_layer.id(), schools_layer.id(), name_field)
+    return _services.get(key, (districts_layer, schools_layer),
+                         lambda: SchoolQueryService(districts_layer, schools_layer, name_field))
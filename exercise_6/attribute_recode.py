@@ -0,0 +1,83 @@
+"""
+Code-to-label attribute recoding stage (exercise 6.2).
+
+The column is read in one request without geometries, only the features
+whose value actually changes are collected, and those are applied in a
+single edit command. On commit the edit buffer writes them to the data
+provider as one changeAttributeValues batch.
+"""
+
+from collections import Counter
+
+from qgis.core import QgsFeatureRequest
+
+
+def recode_changes(layer, field_name, mapping):
+    """
+    Compute the attribute changes of a recoding without touching the layer.
+
+    Args:
+        layer (QgsVectorLayer): Layer to recode
+        field_name (str): Field holding the codes
+        mapping (dict): Code → label, values not in the mapping are kept
+
+    Returns:
+        tuple: ({feature id: new value}, Counter of (old, new) pairs)
+    """
+    field_index = layer.fields().indexOf(field_name)
+    if field_index == -1:
+        raise Exception(f"Field '{field_name}' does not exist in {layer.name()}")
+
+    # Only the one column is fetched, no geometry
+    request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes([field_index])
+
+    changes = {}
+    counts = Counter()
+    for feature in layer.getFeatures(request):
+        value = feature[field_index]
+        if value in mapping and mapping[value] != value:
+            changes[feature.id()] = mapping[value]
+            counts[(value, mapping[value])] += 1
+    return changes, counts
+
+
+def recode_attribute(layer, field_name, mapping, dry_run=False):
+    """
+    Replace codes by labels in one field of a layer.
+
+    If the layer is not in edit mode an edit session is opened and committed;
+    if it already is, the changes are left in the edit buffer for the caller
+    to commit.
+
+    Args:
+        layer (QgsVectorLayer): Layer to recode
+        field_name (str): Field holding the codes
+        mapping (dict): Code → label, e.g. {'H': 'Hallenbad', 'F': 'Freibad'}
+        dry_run (bool): Only report what would change
+
+    Returns:
+        dict: 'features_changed' and 'changes' ({'H -> Hallenbad': count})
+    """
+    changes, counts = recode_changes(layer, field_name, mapping)
+    report = {
+        'features_changed': len(changes),
+        'changes': {f"{old} -> {new}": count for (old, new), count in counts.items()},
+    }
+    if dry_run or not changes:
+        return report
+
+    field_index = layer.fields().indexOf(field_name)
+    own_session = not layer.isEditable()
+    if own_session:
+        layer.startEditing()
+
+    # One edit command for all changed features
+    layer.beginEditCommand(f"Recode {field_name}")
+    for fid, value in changes.items():
+        layer.changeAttributeValue(fid, field_index, value)
+    layer.endEditCommand()
+
+    if own_session and not layer.commitChanges():
+        raise Exception(f"Failed to commit recoded values: {layer.commitErrors()}")
+    return report
@@ -1,16 +1,12 @@
 from qgis.PyQt.QtCore import QVariant
-from qgis.core import QgsVectorLayer, QgsField, QgsFeature, QgsGeometry, QgsProject
-import csv
+from qgis.core import QgsVectorLayer, QgsField, QgsProject
+import os
 import sys
 
-# increase the csv field size limit
-maxInt = sys.maxsize
-while True:
-    try:
-        csv.field_size_limit(maxInt)
-        break
-    except OverflowError:
-        maxInt = int(maxInt/2)
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from land_value_loader import LandValueLoader
+from geometry_cache import load_with_cache
 
 # Define the path to the CSV file
 csv_file_path = "D:/study/UniMuenster/Sose2025/PythonInQgisandArcgis/week6/Data for Session 6/standard_land_value_muenster.csv"
@@ -29,30 +25,13 @@ else:
                             QgsField('district', QVariant.String)])
     layer.updateFields()
 
-    # Open the CSV file and read its contents
-    with open(csv_file_path, 'r') as csvfile:
-        csvreader = csv.reader(csvfile, delimiter=';')  # use ; as delimiter
-        next(csvreader)  # Skip the header line
-
-        for row in csvreader:
-            # Extract the information from the CSV row
-            standard_land_value = float(row[0].replace(',', '.'))
-            land_type = row[1]
-            district = row[2]
-            wkt_geometry = row[3]
-
-            # Create a new feature
-            feature = QgsFeature(layer.fields())
-            feature.setAttribute('standard_land_value', standard_land_value)
-            feature.setAttribute('type', land_type)
-            feature.setAttribute('district', district)
-
-            # Set the geometry from the WKT string
-            geometry = QgsGeometry.fromWkt(wkt_geometry)
-            feature.setGeometry(geometry)
-
-            # Add the feature to the layer
-            provider.addFeature(feature)
+    # Stream the CSV file into the layer in batches
+    # (set workers to e.g. 4 to parse the WKT polygons in parallel processes)
+    loader = LandValueLoader(batch_size=5000, workers=0)
+    # The parsed geometries are kept in a binary sidecar cache, the WKT is only parsed when the CSV changed
+    result = load_with_cache(csv_file_path, layer, loader)
+    source = "sidecar cache" if result['cache_hit'] else "CSV file"
+    print(f"Loaded {result['rows']} features from {source} in {result['seconds']:.1f} s ({result['rows_per_sec']:.0f} rows/s)")
 
     # Update the layer's extent
     layer.updateExtents()
@@ -1,5 +1,12 @@
-from qgis.core import QgsVectorLayer, QgsField, QgsProject, QgsExpression, QgsFeatureRequest
+from qgis.core import QgsVectorLayer, QgsField, QgsProject
 from qgis.PyQt.QtCore import QVariant
+import os
+import sys
+
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from spatial_join import point_in_polygon_join
+from attribute_recode import recode_attribute
 
 # Define the paths to the shapefiles
 pools_layer_path = "D:/study/UniMuenster/Sose2025/PythonInQgisandArcgis/week6/Data for Session 6/public_swimming_pools.shp"
@@ -17,34 +24,18 @@ if not districts_layer.isValid():
     print("City districts layer failed to load!")
     exit()
 
-# Start editing the swimming pools layer
-pools_layer.startEditing()
-
-# Modify the 'Type' column
-for feature in pools_layer.getFeatures():
-    type_value = feature['Type']
-    if type_value == 'H':
-        feature['Type'] = 'Hallenbad'
-    elif type_value == 'F':
-        feature['Type'] = 'Freibad'
-    pools_layer.updateFeature(feature)
+# Modify the 'Type' column (only features whose value changes are written)
+type_report = recode_attribute(pools_layer, 'Type', {'H': 'Hallenbad', 'F': 'Freibad'})
+print(f"Recoded 'Type' of {type_report['features_changed']} swimming pools: {type_report['changes']}")
 
 # Add a new column 'district'
 pools_layer.dataProvider().addAttributes([QgsField('district', QVariant.String, len=50)])
 pools_layer.updateFields()
 
 # Identify the city district for each pool and update the 'district' column
-for pool_feature in pools_layer.getFeatures():
-    pool_geometry = pool_feature.geometry()
-    request = QgsFeatureRequest().setFilterRect(pool_geometry.boundingBox())
-    for district_feature in districts_layer.getFeatures(request):
-        if pool_geometry.within(district_feature.geometry()):
-            pool_feature['district'] = district_feature['name']  # Assuming the district name is in the 'name' field
-            pools_layer.updateFeature(pool_feature)
-            break
-
-# Commit the changes
-pools_layer.commitChanges()
+# (one pass over the pools, one bulk attribute write)
+joined_count = point_in_polygon_join(pools_layer, districts_layer, {'name': 'district'})  # Assuming the district name is in the 'name' field
+print(f"Assigned a district to {joined_count} swimming pools")
 
 # Add the modified layer to the map
 QgsProject.instance().addMapLayer(pools_layer)
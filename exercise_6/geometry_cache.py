@@ -0,0 +1,372 @@
+"""
+Binary sidecar cache for the parsed land value geometries (exercise 6.1).
+
+The first load parses the WKT text once and writes a columnar file next to
+the CSV: the land values as float64, and the WKB geometries, types and
+districts as offset arrays plus one byte blob each. The cache is keyed by
+the size and modification time of the CSV file. Later loads memory-map the
+cache and read the columns straight from the mapping instead of parsing
+text again.
+
+File layout:
+    8 bytes magic, 8 bytes header length, JSON header, padding to 8 bytes,
+    then the column sections listed in the header (offsets relative to the
+    end of the padded header).
+
+The cache is optional: if it cannot be written, e.g. because the CSV lies
+in a read-only folder, or cannot be read, load_with_cache parses the CSV.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+MAGIC = b'LVGCACHE'
+FORMAT_VERSION = 1
+
+# Column sections in file order: (name, dtype or None for byte blobs)
+SECTIONS = [
+    ('values', '<f8'),
+    ('wkb_offsets', '<i8'),
+    ('wkb', None),
+    ('type_offsets', '<i8'),
+    ('type', None),
+    ('district_offsets', '<i8'),
+    ('district', None),
+]
+
+# Errors of a cache file that cannot be read, e.g. a truncated or foreign file
+READ_ERRORS = (OSError, ValueError, struct.error)
+
+
+def cache_path_for(csv_path):
+    # Sidecar file name next to the CSV file
+    return csv_path + '.wkbcache'
+
+
+def source_key(csv_path):
+    # Size and modification time identify the version of the source file
+    stat = os.stat(csv_path)
+    return {'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns}
+
+
+def write_cache(cache_path, key, batches):
+    """
+    Write the cache file from batches of column values.
+
+    Every column is spooled to its own temporary file first, so memory only
+    holds one batch regardless of the file size.
+
+    Args:
+        cache_path (str): Path of the cache file to write
+        key (dict): Source key stored in the header
+        batches (iterable): Batches of (values, wkb_list, types, districts)
+
+    Returns:
+        int: Number of rows written
+    """
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    spools = {name: tempfile.TemporaryFile(dir=directory) for name, _ in SECTIONS}
+    ends = {'wkb': 0, 'type': 0, 'district': 0}
+    for name in ends:
+        spools[f'{name}_offsets'].write(np.zeros(1, dtype='<i8').tobytes())
+
+    rows = 0
+    try:
+        for values, wkb_list, types, districts in batches:
+            spools['values'].write(np.asarray(values, dtype='<f8').tobytes())
+            columns = {
+                'wkb': [wkb or b'' for wkb in wkb_list],
+                'type': [value.encode('utf-8') for value in types],
+                'district': [value.encode('utf-8') for value in districts],
+            }
+            for name, items in columns.items():
+                lengths = np.fromiter((len(item) for item in items), dtype='<i8', count=len(items))
+                offsets = ends[name] + np.cumsum(lengths)
+                spools[f'{name}_offsets'].write(offsets.astype('<i8').tobytes())
+                spools[name].write(b''.join(items))
+                if len(items):
+                    ends[name] = int(offsets[-1])
+            rows += len(values)
+
+        # Lay out the sections one after another, each aligned to 8 bytes
+        sections = {}
+        position = 0
+        for name, _ in SECTIONS:
+            size = spools[name].tell()
+            sections[name] = [position, size]
+            position += size + (-size % 8)
+
+        header = dict(key, version=FORMAT_VERSION, rows=rows, sections=sections)
+        header_bytes = json.dumps(header).encode('utf-8')
+        header_bytes += b' ' * (-len(header_bytes) % 8)
+
+        temporary_path = cache_path + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as cache_file:
+                cache_file.write(MAGIC + struct.pack('<Q', len(header_bytes)) + header_bytes)
+                for name, _ in SECTIONS:
+                    spool = spools[name]
+                    size = spool.tell()
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, cache_file)
+                    cache_file.write(b'\0' * (-size % 8))
+            # Replace atomically so readers never see a half written cache
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            # Do not leave a half written file behind, e.g. when the disk is full
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    return rows
+
+
+def read_header(cache_path):
+    # Returns (header dict, data offset) of a cache file, or (None, None) if it is no cache
+    with open(cache_path, 'rb') as cache_file:
+        if cache_file.read(len(MAGIC)) != MAGIC:
+            return None, None
+        header_length = struct.unpack('<Q', cache_file.read(8))[0]
+        header = json.loads(cache_file.read(header_length).decode('utf-8'))
+    return header, len(MAGIC) + 8 + header_length
+
+
+class CachedColumns:
+    """
+    Read-only, memory-mapped view of a cache file.
+
+    The numeric columns are NumPy arrays backed by the mapping, the byte
+    columns are sliced from it and copied to bytes on access, so no view
+    into the mapping leaves the object.
+
+    Args:
+        cache_path (str): Path of the cache file
+    """
+
+    def __init__(self, cache_path):
+        self.header, data_offset = read_header(cache_path)
+        if self.header is None:
+            raise ValueError(f"{cache_path} is not a geometry cache file")
+        self.rows = self.header['rows']
+
+        self._file = open(cache_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        self.sections = {}
+        for name, dtype in SECTIONS:
+            offset, size = self.header['sections'][name]
+            start = data_offset + offset
+            if dtype is None:
+                self.sections[name] = self._buffer[start:start + size]
+            else:
+                self.sections[name] = np.frombuffer(self._mmap, dtype=dtype,
+                                                    count=size // np.dtype(dtype).itemsize, offset=start)
+        self.values = self.sections['values']
+
+    def _item(self, name, index):
+        offsets = self.sections[f'{name}_offsets']
+        return self.sections[name][offsets[index]:offsets[index + 1]]
+
+    def wkb(self, index):
+        # WKB of one row (empty if the geometry was invalid)
+        return bytes(self._item('wkb', index))
+
+    def text(self, name, index):
+        # 'type' or 'district' value of one row
+        return bytes(self._item(name, index)).decode('utf-8')
+
+    def close(self):
+        # Release all views into the mapping before unmapping it
+        sections, self.sections, self.values = self.sections, {}, None
+        for name in list(sections):
+            section = sections.pop(name)
+            if isinstance(section, memoryview):
+                section.release()
+        section = None
+        self._buffer.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A column array is still referenced outside, the mapping is freed with it
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GeometryCache:
+    """
+    Sidecar cache of one land value CSV file.
+
+    Args:
+        csv_path (str): Path to the land value CSV file
+        cache_path (str): Path of the cache file, defaults to a sidecar next to the CSV
+    """
+
+    def __init__(self, csv_path, cache_path=None):
+        self.csv_path = csv_path
+        self.cache_path = cache_path or cache_path_for(csv_path)
+
+    def is_valid(self):
+        # True if the cache exists and was built from the current version of the CSV
+        if not os.path.exists(self.cache_path):
+            return False
+        try:
+            header, _ = read_header(self.cache_path)
+        except READ_ERRORS:
+            return False
+        if header is None or header.get('version') != FORMAT_VERSION:
+            return False
+        key = source_key(self.csv_path)
+        return all(header.get(name) == value for name, value in key.items())
+
+    def build(self, loader):
+        """
+        Parse the CSV once and write the cache.
+
+        Args:
+            loader (LandValueLoader): Loader used to read and parse the CSV in batches
+
+        Returns:
+            int: Number of rows written
+        """
+        from land_value_loader import parse_attributes
+
+        def batches():
+            for rows, geometries in loader.parsed_batches(self.csv_path):
+                attributes = [parse_attributes(row) for row in rows]
+                wkb_list = [geometry if isinstance(geometry, bytes) or geometry is None
+                            else bytes(geometry.asWkb()) for geometry in geometries]
+                yield ([a[0] for a in attributes], wkb_list,
+                       [a[1] for a in attributes], [a[2] for a in attributes])
+
+        return write_cache(self.cache_path, source_key(self.csv_path), batches())
+
+    def load(self, layer, batch_size=5000):
+        """
+        Load the cached features into a layer, one addFeatures call per batch.
+
+        Args:
+            layer (QgsVectorLayer): Polygon layer with the land value fields
+            batch_size (int): Number of features per addFeatures call
+
+        Returns:
+            dict: Number of rows, seconds taken and rows per second
+        """
+        from qgis.core import QgsFeature, QgsGeometry
+        from land_value_loader import LAND_VALUE_FIELDS
+
+        start = time.perf_counter()
+        provider = layer.dataProvider()
+        fields = layer.fields()
+        value_index, type_index, district_index = [fields.indexOf(name) for name in LAND_VALUE_FIELDS]
+
+        with CachedColumns(self.cache_path) as columns:
+            values = columns.values.tolist()
+            for batch_start in range(0, columns.rows, batch_size):
+                features = []
+                for i in range(batch_start, min(batch_start + batch_size, columns.rows)):
+                    feature = QgsFeature(fields)
+                    feature.setAttribute(value_index, values[i])
+                    feature.setAttribute(type_index, columns.text('type', i))
+                    feature.setAttribute(district_index, columns.text('district', i))
+                    wkb = columns.wkb(i)
+                    if wkb:
+                        geometry = QgsGeometry()
+                        geometry.fromWkb(wkb)
+                        feature.setGeometry(geometry)
+                    features.append(feature)
+                ok, _ = provider.addFeatures(features)
+                if not ok:
+                    raise Exception(f"Failed to add batch starting at row {batch_start}")
+            rows = columns.rows
+
+        layer.updateExtents()
+        elapsed = time.perf_counter() - start
+        return {
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed else float('inf'),
+        }
+
+
+def load_with_cache(csv_path, layer, loader):
+    """
+    Load the land values from the sidecar cache, building it first if it is stale.
+
+    If the cache cannot be written or read, the CSV is loaded directly
+    with the loader and 'cache_hit' is False.
+
+    Args:
+        csv_path (str): Path to the land value CSV file
+        layer (QgsVectorLayer): Polygon layer with the land value fields
+        loader (LandValueLoader): Loader used to parse the CSV when the cache is stale
+
+    Returns:
+        dict: Load statistics plus 'cache_hit'
+    """
+    cache = GeometryCache(csv_path)
+    cache_hit = cache.is_valid()
+    if not cache_hit:
+        try:
+            cache.build(loader)
+        except OSError:
+            # The cache cannot be written, e.g. the folder of the CSV is read-only
+            return dict(loader.load(csv_path, layer, progress=None), cache_hit=False)
+    try:
+        result = cache.load(layer, loader.batch_size)
+    except READ_ERRORS:
+        # The cache was replaced or cut off since it was checked
+        return dict(loader.load(csv_path, layer, progress=None), cache_hit=False)
+    result['cache_hit'] = cache_hit
+    return result
+
+
+def benchmark_cache(csv_path, create_layer, loader):
+    """
+    Compare a cold WKT parse with a warm load from the sidecar cache.
+
+    Args:
+        csv_path (str): Path to the land value CSV file
+        create_layer (callable): Returns a new empty land value layer
+        loader (LandValueLoader): Loader used for the cold parse
+
+    Returns:
+        dict: Seconds for the cold parse, cache build and warm load, and the speedup
+    """
+    cold = loader.load(csv_path, create_layer(), progress=None)
+
+    cache = GeometryCache(csv_path)
+    start = time.perf_counter()
+    cache.build(loader)
+    build_seconds = time.perf_counter() - start
+
+    warm = cache.load(create_layer(), loader.batch_size)
+
+    result = {
+        'rows': cold['rows'],
+        'cold_parse_seconds': cold['seconds'],
+        'cache_build_seconds': build_seconds,
+        'warm_load_seconds': warm['seconds'],
+        'speedup': cold['seconds'] / warm['seconds'] if warm['seconds'] else float('inf'),
+    }
+    print(f"Cold WKT parse:   {result['cold_parse_seconds']:.2f} s ({cold['rows_per_sec']:.0f} rows/s)")
+    print(f"Cache build:      {result['cache_build_seconds']:.2f} s")
+    print(f"Warm cache load:  {result['warm_load_seconds']:.2f} s ({warm['rows_per_sec']:.0f} rows/s)")
+    print(f"Speedup:          {result['speedup']:.1f}x")
+    return result
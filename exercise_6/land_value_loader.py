@@ -0,0 +1,164 @@
+"""
+Streaming loader for the standard land value CSV (exercise 6.1).
+
+Rows are read in fixed-size batches, turned into a list of QgsFeature and
+inserted with one addFeatures call per batch, so only one batch is held in
+memory at a time. Parsing the WKT polygons can optionally be moved to a pool
+of worker processes, which hand back WKB to the QGIS process.
+"""
+
+from collections import deque
+import csv
+import os
+import sys
+import time
+
+from qgis.core import QgsFeature, QgsGeometry
+
+# The worker pool is shared with other exercises
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from worker_pool import map_jobs
+
+# Attribute fields of the land value layer, in CSV column order
+LAND_VALUE_FIELDS = ['standard_land_value', 'type', 'district']
+
+
+def raise_csv_field_size_limit():
+    # The WKT polygons are larger than the default csv field size limit
+    max_int = sys.maxsize
+    while True:
+        try:
+            csv.field_size_limit(max_int)
+            break
+        except OverflowError:
+            max_int = int(max_int / 2)
+
+
+def iter_row_batches(csv_path, batch_size, delimiter=';'):
+    """
+    Read a CSV file in batches of rows, skipping the header line.
+
+    Args:
+        csv_path (str): Path to the CSV file
+        batch_size (int): Number of rows per batch
+        delimiter (str): CSV delimiter
+
+    Yields:
+        list: Up to batch_size rows
+    """
+    raise_csv_field_size_limit()
+    with open(csv_path, 'r', newline='') as csvfile:
+        csvreader = csv.reader(csvfile, delimiter=delimiter)
+        next(csvreader, None)  # Skip the header line
+        batch = []
+        for row in csvreader:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def parse_attributes(row):
+    # Returns (standard_land_value, type, district) of a CSV row
+    return float(row[0].replace(',', '.')), row[1], row[2]
+
+
+def wkt_to_wkb(wkt_strings):
+    # Worker function: parse WKT with OGR and return WKB, no QGIS needed in the worker
+    from osgeo import ogr
+    wkb_list = []
+    for wkt in wkt_strings:
+        geometry = ogr.CreateGeometryFromWkt(wkt)
+        wkb_list.append(bytes(geometry.ExportToIsoWkb()) if geometry is not None else None)
+    return wkb_list
+
+
+class LandValueLoader:
+    """
+    Loads the land value CSV into a polygon layer in batches.
+
+    Args:
+        batch_size (int): Number of rows inserted per addFeatures call
+        workers (int): Worker processes for WKT parsing, 0 parses in this process
+    """
+
+    def __init__(self, batch_size=5000, workers=0):
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def build_features(self, rows, fields, geometries):
+        # Create the features of one batch, geometries is a list of QgsGeometry or WKB bytes
+        indices = [fields.indexOf(name) for name in LAND_VALUE_FIELDS]
+        features = []
+        for row, geometry in zip(rows, geometries):
+            feature = QgsFeature(fields)
+            for index, value in zip(indices, parse_attributes(row)):
+                feature.setAttribute(index, value)
+            if isinstance(geometry, bytes):
+                wkb = geometry
+                geometry = QgsGeometry()
+                geometry.fromWkb(wkb)
+            if geometry is not None:
+                feature.setGeometry(geometry)
+            features.append(feature)
+        return features
+
+    def parsed_batches(self, csv_path):
+        # Yields (rows, geometries) per batch, parsing in worker processes if configured
+        batches = iter_row_batches(csv_path, self.batch_size)
+        if not self.workers:
+            for rows in batches:
+                yield rows, [QgsGeometry.fromWkt(row[3]) for row in rows]
+            return
+
+        # map_jobs keeps a bounded number of batches in flight, so memory stays flat,
+        # and yields them in order: the rows of a batch are the oldest ones queued here
+        queued = deque()
+
+        def wkt_jobs():
+            for rows in batches:
+                queued.append(rows)
+                yield ([row[3] for row in rows],)
+
+        for _, wkb_list, error in map_jobs(wkt_to_wkb, wkt_jobs(), self.workers):
+            if error is not None:
+                raise error
+            yield queued.popleft(), wkb_list
+
+    def load(self, csv_path, layer, progress=print):
+        """
+        Load the CSV file into a layer.
+
+        Args:
+            csv_path (str): Path to the land value CSV file
+            layer (QgsVectorLayer): Polygon layer with the land value fields
+            progress (callable): Called with a status message per batch, None for silence
+
+        Returns:
+            dict: Number of rows, seconds taken and rows per second
+        """
+        provider = layer.dataProvider()
+        fields = layer.fields()
+        total_rows = 0
+        start = time.perf_counter()
+
+        for rows, geometries in self.parsed_batches(csv_path):
+            features = self.build_features(rows, fields, geometries)
+            # One insert per batch instead of one per feature
+            ok, _ = provider.addFeatures(features)
+            if not ok:
+                raise Exception(f"Failed to add batch after row {total_rows}")
+            total_rows += len(features)
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress(f"Loaded {total_rows} rows ({total_rows / elapsed:.0f} rows/s)")
+
+        layer.updateExtents()
+        elapsed = time.perf_counter() - start
+        return {
+            'rows': total_rows,
+            'seconds': elapsed,
+            'rows_per_sec': total_rows / elapsed if elapsed else float('inf'),
+        }
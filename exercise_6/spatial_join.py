@@ -0,0 +1,105 @@
+"""
+Point-in-polygon join stage (exercise 6.2).
+
+The polygon layer is read into a spatial index once, every point is
+assigned the attributes of the polygon containing it in a single pass, and
+all attribute changes are written with one changeAttributeValues call. The
+same stage joins districts to schools, swimming pools or house numbers.
+"""
+
+from qgis.core import (QgsCoordinateTransform, QgsFeatureRequest, QgsField, QgsGeometry,
+                       QgsProject, QgsSpatialIndex)
+
+
+class PolygonIndex:
+    """
+    Spatial index plus prepared geometries of a polygon layer.
+
+    Args:
+        polygon_layer (QgsVectorLayer): Polygon layer to index
+        fields (list): Polygon fields whose values are kept in memory
+    """
+
+    def __init__(self, polygon_layer, fields):
+        self.crs = polygon_layer.crs()
+        self.attributes = {}
+        self.geometries = {}
+        self.engines = {}
+
+        request = QgsFeatureRequest().setSubsetOfAttributes(fields, polygon_layer.fields())
+        features = [feature for feature in polygon_layer.getFeatures(request)
+                    if feature.hasGeometry() and not feature.geometry().isEmpty()]
+        self.index = QgsSpatialIndex()
+        self.index.addFeatures(features)
+
+        for feature in features:
+            fid = feature.id()
+            self.attributes[fid] = [feature[field] for field in fields]
+            # Keep the geometry alive, the engine only references it
+            self.geometries[fid] = feature.geometry()
+            engine = QgsGeometry.createGeometryEngine(self.geometries[fid].constGet())
+            engine.prepareGeometry()
+            self.engines[fid] = engine
+
+    def containing(self, geometry):
+        # Returns the attributes of the first polygon containing the geometry, or None
+        geometry_part = geometry.constGet()
+        for fid in self.index.intersects(geometry.boundingBox()):
+            if self.engines[fid].contains(geometry_part):
+                return self.attributes[fid]
+        return None
+
+
+def point_in_polygon_join(point_layer, polygon_layer, field_map):
+    """
+    Copy attributes of the containing polygon to every point of a layer.
+
+    Target fields that do not exist yet are added to the point layer with
+    the type of the polygon field. The point layer must not be in edit mode,
+    the changes are written straight to its data provider.
+
+    Args:
+        point_layer (QgsVectorLayer): Layer receiving the attributes
+        polygon_layer (QgsVectorLayer): Layer providing the attributes
+        field_map (dict): Polygon field name → point field name,
+            e.g. {'Name': 'district'}
+
+    Returns:
+        int: Number of points that fell into a polygon
+    """
+    polygon_fields = list(field_map)
+    point_fields = [field_map[name] for name in polygon_fields]
+    provider = point_layer.dataProvider()
+
+    # Add missing target fields with the type of the source field
+    missing = [QgsField(polygon_layer.fields().field(source)) for source, target in field_map.items()
+               if point_layer.fields().indexOf(target) == -1]
+    for field in missing:
+        field.setName(field_map[field.name()])
+    if missing:
+        provider.addAttributes(missing)
+        point_layer.updateFields()
+    field_indices = [point_layer.fields().indexOf(name) for name in point_fields]
+
+    polygons = PolygonIndex(polygon_layer, polygon_fields)
+    transform = None
+    if point_layer.crs() != polygons.crs:
+        transform = QgsCoordinateTransform(point_layer.crs(), polygons.crs, QgsProject.instance())
+
+    # Single pass over the points, only the geometry is needed
+    changes = {}
+    for point in point_layer.getFeatures(QgsFeatureRequest().setNoAttributes()):
+        if not point.hasGeometry():
+            continue
+        geometry = point.geometry()
+        if transform is not None:
+            geometry.transform(transform)
+        values = polygons.containing(geometry)
+        if values is not None:
+            changes[point.id()] = dict(zip(field_indices, values))
+
+    # Write all attribute changes in one call
+    if changes and not provider.changeAttributeValues(changes):
+        raise Exception(f"Failed to write joined attributes to {point_layer.name()}")
+    point_layer.reload()
+    return len(changes)
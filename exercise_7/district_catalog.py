@@ -0,0 +1,99 @@
+"""
+Cached catalog of the city districts: name → feature id → geometry/bbox.
+
+The catalog of a layer is built once and shared by initAlgorithm,
+processAlgorithm and the statistics engine. It is dropped as soon as the
+layer reports a data change or is deleted, so the next request rebuilds it
+from the current layer version.
+"""
+
+import os
+import sys
+
+# The layer cache is shared with other exercises
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from layer_cache import LayerCache
+
+# Field names tried (in order) for the district name
+DISTRICT_NAME_FIELDS = ['Name', 'name', 'NAME', 'District', 'DISTRICT']
+
+# Catalogs per layer id
+_catalogs = LayerCache()
+
+
+def resolve_name_field(layer, candidates=DISTRICT_NAME_FIELDS):
+    # Returns the first candidate field that exists in the layer, or None
+    field_names = layer.fields().names()
+    for field_name in candidates:
+        if field_name in field_names:
+            return field_name
+    return None
+
+
+class DistrictCatalog:
+    """
+    District features of one layer, looked up by name.
+
+    Args:
+        layer (QgsVectorLayer): City districts polygon layer
+    """
+
+    def __init__(self, layer):
+        self.layer_id = layer.id()
+        self.name_field = resolve_name_field(layer)
+        if self.name_field is None:
+            raise Exception("No district name field found in the districts layer")
+
+        self.fids_by_name = {}
+        self.features = {}
+        self.bboxes = {}
+        for feature in layer.getFeatures():
+            name = feature[self.name_field]
+            if not name:
+                continue
+            fid = feature.id()
+            self.fids_by_name[str(name)] = fid
+            self.features[fid] = feature
+            self.bboxes[fid] = feature.geometry().boundingBox()
+
+    def names(self):
+        # Alphabetically sorted list of district names
+        return sorted(self.fids_by_name)
+
+    def feature_id(self, name):
+        # Feature id of a district, or None
+        return self.fids_by_name.get(name)
+
+    def feature(self, name):
+        # District feature for a name, or None
+        fid = self.fids_by_name.get(name)
+        return self.features[fid] if fid is not None else None
+
+    def geometry(self, name):
+        # District geometry for a name, or None
+        feature = self.feature(name)
+        return feature.geometry() if feature is not None else None
+
+    def bbox(self, name):
+        # District bounding box for a name, or None
+        fid = self.fids_by_name.get(name)
+        return self.bboxes[fid] if fid is not None else None
+
+
+def invalidate(layer_id):
+    # Drop the cached catalog of a layer
+    _catalogs.invalidate(layer_id)
+
+
+def district_catalog(layer):
+    """
+    Return the cached catalog of a districts layer, building it if needed.
+
+    Args:
+        layer (QgsVectorLayer): City districts polygon layer
+
+    Returns:
+        DistrictCatalog: Catalog of the current layer version
+    """
+    # Any change of the layer data makes the catalog stale
+    return _catalogs.get(layer.id(), (layer,), lambda: DistrictCatalog(layer))
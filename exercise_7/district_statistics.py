@@ -0,0 +1,84 @@
+"""
+Single-pass district statistics for the City District Profile algorithm.
+
+Every point/polygon layer is scanned once. Each feature is assigned to the
+districts it intersects through a spatial index over the district polygons,
+so the counts for all districts are available after one pass and a profile
+for any district afterwards is a dictionary lookup.
+"""
+
+from qgis.core import QgsFeatureRequest, QgsGeometry, QgsSpatialIndex
+
+
+class DistrictStatisticsEngine:
+    """
+    Counts features per district with one scan per layer.
+
+    Args:
+        catalog (DistrictCatalog): Catalog of the city districts layer
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.index = QgsSpatialIndex()
+        self.geometries = {}
+        self.engines = {}
+        # Counts per layer key: {key: {district fid: count}}
+        self.counts = {}
+
+        # The catalog already holds the districts, no extra layer scan needed
+        for fid, feature in catalog.features.items():
+            geometry = feature.geometry()
+            if geometry.isNull() or geometry.isEmpty():
+                continue
+            self.index.addFeature(fid, catalog.bboxes[fid])
+            # Keep the geometry alive, the engine only references it
+            self.geometries[fid] = geometry
+            engine = QgsGeometry.createGeometryEngine(geometry.constGet())
+            engine.prepareGeometry()
+            self.engines[fid] = engine
+
+    def district_names(self):
+        # Alphabetically sorted list of all district names
+        return self.catalog.names()
+
+    def count_layer(self, key, layer):
+        """
+        Count the features of a layer per district in a single scan.
+
+        The result is stored under key, later calls with the same key return
+        the stored counts without scanning the layer again.
+
+        Args:
+            key (str): Name the counts are stored under, e.g. 'households'
+            layer (QgsVectorLayer): Layer whose features are counted, None counts nothing
+
+        Returns:
+            dict: Feature count per district feature id
+        """
+        if key in self.counts:
+            return self.counts[key]
+
+        counts = dict.fromkeys(self.engines, 0)
+        if layer is not None:
+            # Geometry is all we need, skip reading the attributes
+            request = QgsFeatureRequest().setNoAttributes()
+            for feature in layer.getFeatures(request):
+                geometry = feature.geometry()
+                if geometry.isNull():
+                    continue
+                geometry_part = geometry.constGet()
+                for fid in self.index.intersects(geometry.boundingBox()):
+                    if self.engines[fid].intersects(geometry_part):
+                        counts[fid] += 1
+
+        self.counts[key] = counts
+        return counts
+
+    def district_feature(self, district_name):
+        # Returns the district feature for a name, or None
+        return self.catalog.feature(district_name)
+
+    def statistics(self, district_name, key):
+        # Returns the stored count of a layer key for one district
+        return self.counts[key].get(self.catalog.feature_id(district_name), 0)
@@ -4,22 +4,18 @@ from qgis.core import (
                        QgsProcessingAlgorithm,
                        QgsProcessingParameterEnum,
                        QgsProcessingParameterFileDestination,
-                       QgsProject,
-                       QgsRectangle)
-from qgis.utils import iface
-import time
+                       QgsProcessingParameterFolderDestination,
+                       QgsProcessingParameterString,
+                       QgsProject)
 import os
+import sys
 
-# Import reportlab components
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER
-except ImportError:
-    pass  # Will be handled in processAlgorithm
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from district_catalog import district_catalog
+from district_statistics import DistrictStatisticsEngine
+from profile_pdf import build_profile_pdf, build_profile_pdfs
+from map_renderer import QgisMapRenderer, padded_extent
 
 
 class CreateCityDistrictProfile(QgsProcessingAlgorithm):
@@ -29,6 +25,11 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
     DISTRICT_NAME = 'DISTRICT_NAME'
     FEATURE_TYPE = 'FEATURE_TYPE'
     OUTPUT_PDF = 'OUTPUT_PDF'
+    BATCH_DISTRICTS = 'BATCH_DISTRICTS'
+    OUTPUT_FOLDER = 'OUTPUT_FOLDER'
+
+    # Renderer used for the map images, any object with render(extent, output_path)
+    map_renderer = None
 
     def tr(self, string):
         # Returns a translatable string with the self.tr() function.
@@ -57,46 +58,20 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
     def shortHelpString(self):
         # Returns a localised short helper string for the algorithm
         return self.tr("Creates a comprehensive PDF profile for a selected city district in Münster. "
-                      "The profile includes district information, statistics, and a map image.")
+                      "The profile includes district information, statistics, and a map image. "
+                      "In batch mode (comma separated district names or 'all') one PDF per district "
+                      "is written to the output folder.")
 
     def get_district_names(self):
         # Returns an alphabetically sorted list of city district names
         try:
             # Get the city districts layer by name
-            project = QgsProject.instance()
-            layer = None
-            
-            # Try to find the layer by name variations
-            layer_names = ['Muenster_City_Districts', 'City_Districts', 'Districts']
-            for name in layer_names:
-                layers = project.mapLayersByName(name)
-                if layers:
-                    layer = layers[0]
-                    break
-            
+            layer = self.find_layer(['Muenster_City_Districts', 'City_Districts', 'Districts'])
             if not layer:
                 return ['No districts layer found']
             
-            # Extract district names from the 'Name' field
-            district_names = []
-            for feature in layer.getFeatures():
-                try:
-                    name = feature['Name']
-                    if name:
-                        district_names.append(str(name))
-                except:
-                    # Try alternative field names if 'Name' doesn't exist
-                    for field_name in ['name', 'NAME', 'District', 'DISTRICT']:
-                        try:
-                            name = feature[field_name]
-                            if name:
-                                district_names.append(str(name))
-                                break
-                        except:
-                            continue
-            
-            # Return alphabetically sorted list
-            return sorted(district_names)
+            # Names come from the cached catalog, the layer is only read when it changed
+            return district_catalog(layer).names()
         
         except Exception as e:
             return [f'Error loading districts: {str(e)}']
@@ -131,46 +106,59 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
             QgsProcessingParameterFileDestination(
                 self.OUTPUT_PDF,
                 self.tr('Output PDF File'),
-                fileFilter='PDF files (*.pdf)'
+                fileFilter='PDF files (*.pdf)',
+                optional=True
+            )
+        )
+        
+        # Batch mode: list of district names or 'all'
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.BATCH_DISTRICTS,
+                self.tr("Batch mode: districts (comma separated or 'all')"),
+                optional=True
             )
         )
+        
+        # Output folder for batch mode
+        self.addParameter(
+            QgsProcessingParameterFolderDestination(
+                self.OUTPUT_FOLDER,
+                self.tr('Batch mode: output folder'),
+                optional=True
+            )
+        )
+
+    def find_layer(self, layer_names):
+        # Returns the first project layer matching one of the names, or None
+        project = QgsProject.instance()
+        for name in layer_names:
+            layers = project.mapLayersByName(name)
+            if layers:
+                return layers[0]
+        return None
+
+    def get_statistics_engine(self):
+        # Returns the statistics engine, rebuilt when the districts catalog changed
+        districts_layer = self.find_layer(['Muenster_City_Districts', 'City_Districts', 'Districts'])
+        if not districts_layer:
+            raise Exception("City districts layer not found")
+        catalog = district_catalog(districts_layer)
+        engine = getattr(self, 'statistics_engine', None)
+        if engine is None or engine.catalog is not catalog:
+            self.statistics_engine = DistrictStatisticsEngine(catalog)
+        return self.statistics_engine
 
     def get_district_statistics(self, district_name, feature_type):
         # Calculate statistics for the selected district
-        project = QgsProject.instance()
+        # Each layer is scanned once for all districts, later calls are lookups
         statistics = {}
         
         try:
-            # Get city districts layer
-            districts_layer = None
-            for name in ['Muenster_City_Districts', 'City_Districts', 'Districts']:
-                layers = project.mapLayersByName(name)
-                if layers:
-                    districts_layer = layers[0]
-                    break
-            
-            if not districts_layer:
-                raise Exception("City districts layer not found")
+            engine = self.get_statistics_engine()
             
             # Find the selected district feature
-            district_feature = None
-            for feature in districts_layer.getFeatures():
-                try:
-                    if str(feature['Name']) == district_name:
-                        district_feature = feature
-                        break
-                except:
-                    # Try alternative field names
-                    for field_name in ['name', 'NAME', 'District', 'DISTRICT']:
-                        try:
-                            if str(feature[field_name]) == district_name:
-                                district_feature = feature
-                                break
-                        except:
-                            continue
-                    if district_feature:
-                        break
-            
+            district_feature = engine.district_feature(district_name)
             if not district_feature:
                 raise Exception(f"District '{district_name}' not found")
             
@@ -189,50 +177,22 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
             statistics['area_km2'] = round(area_sqm / 1000000, 2)
             
             # Count households
-            households_count = 0
-            house_numbers_layers = project.mapLayersByName('House_Numbers')
-            if house_numbers_layers:
-                house_layer = house_numbers_layers[0]
-                for house_feature in house_layer.getFeatures():
-                    if house_feature.geometry().intersects(district_geom):
-                        households_count += 1
-            statistics['households'] = households_count
+            engine.count_layer('households', self.find_layer(['House_Numbers']))
+            statistics['households'] = engine.statistics(district_name, 'households')
             
             # Count parcels
-            parcels_count = 0
-            parcels_layers = project.mapLayersByName('Muenster_Parcels')
-            if not parcels_layers:
-                parcels_layers = project.mapLayersByName('Parcels')
-            if parcels_layers:
-                parcels_layer = parcels_layers[0]
-                for parcel_feature in parcels_layer.getFeatures():
-                    if parcel_feature.geometry().intersects(district_geom):
-                        parcels_count += 1
-            statistics['parcels'] = parcels_count
+            engine.count_layer('parcels', self.find_layer(['Muenster_Parcels', 'Parcels']))
+            statistics['parcels'] = engine.statistics(district_name, 'parcels')
             
             # Count schools or swimming pools based on user selection
             if feature_type == 0:  # Schools
-                feature_count = 0
-                schools_layers = project.mapLayersByName('Schools')
-                if schools_layers:
-                    schools_layer = schools_layers[0]
-                    for school_feature in schools_layer.getFeatures():
-                        if school_feature.geometry().intersects(district_geom):
-                            feature_count += 1
+                engine.count_layer('schools', self.find_layer(['Schools']))
                 statistics['feature_type'] = 'Schools'
-                statistics['feature_count'] = feature_count
+                statistics['feature_count'] = engine.statistics(district_name, 'schools')
             else:  # Swimming Pools
-                feature_count = 0
-                pools_layers = project.mapLayersByName('public_swimmings_pools')
-                if not pools_layers:
-                    pools_layers = project.mapLayersByName('Swimming_Pools')
-                if pools_layers:
-                    pools_layer = pools_layers[0]
-                    for pool_feature in pools_layer.getFeatures():
-                        if pool_feature.geometry().intersects(district_geom):
-                            feature_count += 1
+                engine.count_layer('pools', self.find_layer(['public_swimmings_pools', 'Swimming_Pools']))
                 statistics['feature_type'] = 'Swimming Pools'
-                statistics['feature_count'] = feature_count
+                statistics['feature_count'] = engine.statistics(district_name, 'pools')
             
             # Store geometry for map creation
             statistics['geometry'] = district_geom
@@ -242,33 +202,17 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
         
         return statistics
 
-    def create_map_image(self, district_geometry, output_dir):
+    def create_map_image(self, district_geometry, output_dir, file_name='district_map.png'):
         # Create a map image of the selected district
         try:
-            # Get map canvas
-            canvas = iface.mapCanvas()
-            
-            # Zoom to district extent with some padding
+            # Render the district extent with 10% padding offscreen
             extent = district_geometry.boundingBox()
-            # Add 10% padding
-            width = extent.width() * 0.1
-            height = extent.height() * 0.1
-            padded_extent = QgsRectangle(
-                extent.xMinimum() - width,
-                extent.yMinimum() - height,
-                extent.xMaximum() + width,
-                extent.yMaximum() + height
-            )
-            
-            canvas.setExtent(padded_extent)
-            canvas.refresh()
+            extent = padded_extent((extent.xMinimum(), extent.yMinimum(),
+                                    extent.xMaximum(), extent.yMaximum()))
             
-            # Wait for refresh
-            time.sleep(5)
-            
-            # Save map image
-            map_image_path = os.path.join(output_dir, 'district_map.png')
-            canvas.saveAsImage(map_image_path)
+            renderer = self.map_renderer if self.map_renderer is not None else QgisMapRenderer()
+            map_image_path = os.path.join(output_dir, file_name)
+            renderer.render(extent, map_image_path)
             
             return map_image_path
             
@@ -278,91 +222,12 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
     def create_pdf(self, statistics, output_file):
         # Create the PDF profile document
         try:
-            # Create document
-            doc = SimpleDocTemplate(output_file, pagesize=A4)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                alignment=TA_CENTER,
-                spaceAfter=30
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=16,
-                spaceAfter=12
-            )
-            
-            # Title
-            title = Paragraph(f"City District Profile: {statistics['name']}", title_style)
-            story.append(title)
-            story.append(Spacer(1, 20))
-            
-            # District Information Section
-            story.append(Paragraph("District Information", heading_style))
-            
-            district_data = [
-                ['District Name:', statistics['name']],
-                ['Parent District:', statistics['parent_district']],
-                ['Area:', f"{statistics['area_km2']} km²"],
-                ['Number of Households:', str(statistics['households'])],
-                ['Number of Parcels:', str(statistics['parcels'])],
-            ]
-            
-            # Add feature-specific information
-            if statistics['feature_count'] > 0:
-                district_data.append([f"Number of {statistics['feature_type']}:", str(statistics['feature_count'])])
-            else:
-                district_data.append([f"Number of {statistics['feature_type']}:", f"No {statistics['feature_type'].lower()} in this district"])
-            
-            # Create table
-            district_table = Table(district_data, colWidths=[2.5*inch, 3*inch])
-            district_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('BACKGROUND', (1, 0), (1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(district_table)
-            story.append(Spacer(1, 30))
-            
-            # Map Section
-            story.append(Paragraph("District Map", heading_style))
-            
-            # Try to add map image
+            # Render the map image here, the document itself needs no QGIS objects
             output_dir = os.path.dirname(output_file)
             map_image_path = self.create_map_image(statistics['geometry'], output_dir)
             
-            if map_image_path and os.path.exists(map_image_path):
-                try:
-                    # Add map image to PDF
-                    img = Image(map_image_path, width=6*inch, height=4*inch)
-                    story.append(img)
-                except:
-                    story.append(Paragraph("Map image could not be created", styles['Normal']))
-            else:
-                story.append(Paragraph("Map image could not be created", styles['Normal']))
-            
-            story.append(Spacer(1, 20))
-            
-            # Footer
-            footer_text = f"Generated on {time.strftime('%Y-%m-%d %H:%M:%S')}"
-            footer = Paragraph(footer_text, styles['Normal'])
-            story.append(footer)
-            
-            # Build PDF
-            doc.build(story)
+            pdf_statistics = {key: value for key, value in statistics.items() if key != 'geometry'}
+            build_profile_pdf(pdf_statistics, map_image_path, output_file)
             
             return True
             
@@ -388,6 +253,11 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
                     "in the QGIS Python console."
                 )
             
+            # Batch mode if a list of districts is given
+            batch_districts = self.parameterAsString(parameters, self.BATCH_DISTRICTS, context)
+            if batch_districts and batch_districts.strip():
+                return self.process_batch(parameters, context, feedback, batch_districts)
+            
             # Get parameters
             district_names = self.get_district_names()
             district_index = self.parameterAsInt(parameters, self.DISTRICT_NAME, context)
@@ -395,6 +265,8 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
             
             feature_type = self.parameterAsInt(parameters, self.FEATURE_TYPE, context)
             output_file = self.parameterAsFileOutput(parameters, self.OUTPUT_PDF, context)
+            if not output_file:
+                raise QgsProcessingException("No output PDF file given")
             
             feedback.pushInfo(f"Creating profile for district: {district_name}")
             
@@ -415,4 +287,59 @@ class CreateCityDistrictProfile(QgsProcessingAlgorithm):
             return {self.OUTPUT_PDF: output_file}
             
         except Exception as e:
-            raise QgsProcessingException(f"Error in processAlgorithm: {str(e)}")
\ No newline at end of file
+            raise QgsProcessingException(f"Error in processAlgorithm: {str(e)}")
+
+    def process_batch(self, parameters, context, feedback, batch_districts):
+        # Create one PDF profile per district, sharing layers and statistics between them
+        output_folder = self.parameterAsString(parameters, self.OUTPUT_FOLDER, context)
+        if not output_folder:
+            raise QgsProcessingException("Batch mode needs an output folder")
+        os.makedirs(output_folder, exist_ok=True)
+        
+        feature_type = self.parameterAsInt(parameters, self.FEATURE_TYPE, context)
+        
+        # Resolve the district list
+        engine = self.get_statistics_engine()
+        if batch_districts.strip().lower() == 'all':
+            district_names = engine.district_names()
+        else:
+            district_names = [name.strip() for name in batch_districts.split(',') if name.strip()]
+        
+        unknown = [name for name in district_names if engine.district_feature(name) is None]
+        if unknown:
+            raise QgsProcessingException(f"Unknown districts: {', '.join(unknown)}")
+        
+        feedback.pushInfo(f"Creating profiles for {len(district_names)} districts in {output_folder}")
+        
+        # Statistics and map images need QGIS, so they are prepared here.
+        # Every layer is scanned once for all districts on the first call.
+        jobs = []
+        for i, district_name in enumerate(district_names):
+            if feedback.isCanceled():
+                return {self.OUTPUT_FOLDER: output_folder}
+            
+            statistics = self.get_district_statistics(district_name, feature_type)
+            if 'error' in statistics:
+                raise QgsProcessingException(f"Error calculating statistics for {district_name}: {statistics['error']}")
+            
+            file_stem = ''.join(c if c.isalnum() or c in '-_' else '_' for c in district_name)
+            map_image_path = self.create_map_image(statistics.pop('geometry'), output_folder, f"{file_stem}_map.png")
+            jobs.append((statistics, map_image_path, os.path.join(output_folder, f"{file_stem}.pdf")))
+            
+            feedback.setProgress(50 * (i + 1) / len(district_names))
+        
+        # The PDFs themselves are rendered in parallel worker processes
+        feedback.pushInfo("Rendering PDF profiles...")
+        failed = 0
+        for i, (output_file, error) in enumerate(build_profile_pdfs(jobs)):
+            if error:
+                failed += 1
+                feedback.reportError(f"Error creating {output_file}: {error}")
+            else:
+                feedback.pushInfo(f"PDF profile created: {output_file}")
+            feedback.setProgress(50 + 50 * (i + 1) / len(jobs))
+            if feedback.isCanceled():
+                break
+        
+        feedback.pushInfo(f"Created {len(jobs) - failed} of {len(jobs)} profiles")
+        return {self.OUTPUT_FOLDER: output_folder}
\ No newline at end of file
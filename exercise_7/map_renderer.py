@@ -0,0 +1,109 @@
+"""
+Offscreen map rendering for the district profiles.
+
+A renderer renders an extent straight into an image file and returns once
+the render has finished. QgisMapRenderer uses a QGIS map renderer job and
+needs no map canvas, so it also works headless. PlaceholderRenderer is a
+pure-Python stand-in that writes a plain PNG, for runs without QGIS.
+"""
+
+import struct
+import zlib
+
+
+def padded_extent(extent, padding=0.1, min_padding=1.0):
+    """
+    Grow an extent by a fraction of its width and height on every side.
+
+    A side of zero length, e.g. of a point or a straight north-south line,
+    gets the padding of the other side, or min_padding if both are zero,
+    so the renderer never gets an empty extent.
+
+    Args:
+        extent (tuple): (xmin, ymin, xmax, ymax)
+        padding (float): Fraction of width/height added on each side
+        min_padding (float): Padding in map units of a zero-size extent
+
+    Returns:
+        tuple: Padded (xmin, ymin, xmax, ymax)
+    """
+    xmin, ymin, xmax, ymax = extent
+    width = (xmax - xmin) * padding
+    height = (ymax - ymin) * padding
+    width, height = width or height or min_padding, height or width or min_padding
+    return xmin - width, ymin - height, xmax + width, ymax + height
+
+
+class QgisMapRenderer:
+    """
+    Renders the visible project layers offscreen with QgsMapRendererParallelJob.
+
+    Args:
+        layers (list): Layers to render, defaults to the checked layers of the project
+        size (tuple): Image size in pixels (width, height)
+        dpi (int): Output resolution
+    """
+
+    def __init__(self, layers=None, size=(1200, 800), dpi=96):
+        self.layers = layers
+        self.size = size
+        self.dpi = dpi
+
+    def render(self, extent, output_path):
+        # Render the extent to output_path and block until the job has finished
+        from qgis.PyQt.QtCore import QSize
+        from qgis.PyQt.QtGui import QColor
+        from qgis.core import QgsMapRendererParallelJob, QgsMapSettings, QgsProject, QgsRectangle
+
+        project = QgsProject.instance()
+        layers = self.layers if self.layers is not None else project.layerTreeRoot().checkedLayers()
+
+        settings = QgsMapSettings()
+        settings.setLayers(layers)
+        settings.setDestinationCrs(project.crs())
+        settings.setBackgroundColor(QColor(255, 255, 255))
+        settings.setOutputSize(QSize(*self.size))
+        settings.setOutputDpi(self.dpi)
+        settings.setExtent(QgsRectangle(*extent))
+
+        job = QgsMapRendererParallelJob(settings)
+        job.start()
+        job.waitForFinished()
+
+        if not job.renderedImage().save(output_path, 'PNG'):
+            raise IOError(f"Could not save map image to {output_path}")
+        return output_path
+
+
+class PlaceholderRenderer:
+    """
+    Pure-Python stand-in renderer writing a single-colour PNG.
+
+    Args:
+        size (tuple): Image size in pixels (width, height)
+        color (tuple): RGB fill colour
+    """
+
+    def __init__(self, size=(1200, 800), color=(230, 230, 230)):
+        self.size = size
+        self.color = color
+        self.rendered_extents = []
+
+    def render(self, extent, output_path):
+        # Write the PNG and remember the extent that was asked for
+        width, height = self.size
+        row = b'\x00' + bytes(self.color) * width  # filter byte + RGB pixels
+        data = zlib.compress(row * height)
+
+        def chunk(tag, payload):
+            return (struct.pack('>I', len(payload)) + tag + payload +
+                    struct.pack('>I', zlib.crc32(tag + payload) & 0xffffffff))
+
+        with open(output_path, 'wb') as png:
+            png.write(b'\x89PNG\r\n\x1a\n')
+            png.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+            png.write(chunk(b'IDAT', data))
+            png.write(chunk(b'IEND', b''))
+
+        self.rendered_extents.append(tuple(extent))
+        return output_path
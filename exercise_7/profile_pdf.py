@@ -0,0 +1,141 @@
+"""
+PDF rendering for city district profiles.
+
+Kept free of QGIS imports so the PDFs of a batch run can be built in worker
+processes. The statistics passed in must be plain Python values (no
+QgsGeometry), the map image is rendered beforehand in the QGIS process.
+"""
+
+import os
+import sys
+import time
+
+# The worker pool is shared with other exercises
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from worker_pool import map_jobs
+
+# Import reportlab components
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+except ImportError:
+    pass  # Will be handled in processAlgorithm
+
+
+def build_profile_pdf(statistics, map_image_path, output_file):
+    """
+    Build the PDF profile document of one district.
+
+    Args:
+        statistics (dict): District statistics without the geometry
+        map_image_path (str): Path of the district map image, or None
+        output_file (str): Path of the PDF to write
+
+    Returns:
+        str: Path of the written PDF
+    """
+    # Create document
+    doc = SimpleDocTemplate(output_file, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        alignment=TA_CENTER,
+        spaceAfter=30
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12
+    )
+
+    # Title
+    title = Paragraph(f"City District Profile: {statistics['name']}", title_style)
+    story.append(title)
+    story.append(Spacer(1, 20))
+
+    # District Information Section
+    story.append(Paragraph("District Information", heading_style))
+
+    district_data = [
+        ['District Name:', statistics['name']],
+        ['Parent District:', statistics['parent_district']],
+        ['Area:', f"{statistics['area_km2']} km²"],
+        ['Number of Households:', str(statistics['households'])],
+        ['Number of Parcels:', str(statistics['parcels'])],
+    ]
+
+    # Add feature-specific information
+    if statistics['feature_count'] > 0:
+        district_data.append([f"Number of {statistics['feature_type']}:", str(statistics['feature_count'])])
+    else:
+        district_data.append([f"Number of {statistics['feature_type']}:", f"No {statistics['feature_type'].lower()} in this district"])
+
+    # Create table
+    district_table = Table(district_data, colWidths=[2.5*inch, 3*inch])
+    district_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 0), (1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    story.append(district_table)
+    story.append(Spacer(1, 30))
+
+    # Map Section
+    story.append(Paragraph("District Map", heading_style))
+
+    if map_image_path and os.path.exists(map_image_path):
+        try:
+            # Add map image to PDF
+            img = Image(map_image_path, width=6*inch, height=4*inch)
+            story.append(img)
+        except:
+            story.append(Paragraph("Map image could not be created", styles['Normal']))
+    else:
+        story.append(Paragraph("Map image could not be created", styles['Normal']))
+
+    story.append(Spacer(1, 20))
+
+    # Footer
+    footer_text = f"Generated on {time.strftime('%Y-%m-%d %H:%M:%S')}"
+    footer = Paragraph(footer_text, styles['Normal'])
+    story.append(footer)
+
+    # Build PDF
+    doc.build(story)
+
+    return output_file
+
+
+def build_profile_pdfs(jobs, max_workers=None):
+    """
+    Build many profile PDFs in parallel worker processes.
+
+    PDFs the worker pool could not build, because it did not start or
+    broke, are built one after another in this process.
+
+    Args:
+        jobs (list): (statistics, map_image_path, output_file) tuples
+        max_workers (int): Number of worker processes, defaults to the CPU count
+
+    Yields:
+        tuple: (output_file, error message or None) as each PDF finishes, in job order
+    """
+    for (_, _, output_file), _, error in map_jobs(build_profile_pdf, jobs, max_workers):
+        yield output_file, str(error) if error is not None else None
@@ -0,0 +1,263 @@
+"""
+Incremental refresh of active_assets (exercise 9.1).
+
+Instead of deleting and re-copying active_assets, a change journal
+remembers for every copied feature its source feature class, source
+object ID, object ID in active_assets and a hash of the copied values.
+A refresh reads the active rows of each source once and then
+
+- inserts the rows that are not in the journal yet,
+- updates the rows whose hash changed,
+- deletes the rows that are no longer active (or no longer exist),
+
+Every run still reads all active rows of every source (one cursor pass
+each, to hash them), but only the changed rows are written, instead of
+deleting and re-inserting the whole inventory.
+
+The journal is a SQLite file next to the geodatabase. It stores the
+field lists of the sources it was built from: when one of them changes,
+the target has to be rebuilt and the journal starts over. New sources
+are simply synced. The journal is marked dirty while a source is being
+synced; if a run stops half way, the mark stays and the next run
+rebuilds the target, as the journal may no longer match it.
+
+Point geometries are read as SHAPE@XY, as by the parallel rebuild.
+Sources with Z or M values are read as full SHAPE@ geometries instead,
+so their Z and M values are copied and a change of them alone is
+detected: geometries are hashed by their WKB.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from cursor_copy import ArcpyBackend, ColumnMap
+
+# Geometry token of the synced rows, part of the hash
+GEOMETRY_FIELD = 'SHAPE@XY'
+# Geometry token of sources with Z or M values, SHAPE@XY would drop them
+GEOMETRY_FIELD_ZM = 'SHAPE@'
+
+
+def journal_path_for(gdb_path, target_name='active_assets'):
+    # The journal lives next to the geodatabase folder, not inside it
+    return f"{os.path.normpath(gdb_path)}.{target_name}.journal.sqlite"
+
+
+def _stable_value(value):
+    # Geometry objects have no stable repr, their WKB includes Z and M
+    wkb = getattr(value, 'WKB', None)
+    return bytes(wkb) if wkb is not None else value
+
+
+def row_hash(values):
+    # Stable hash of the copied values of one row
+    return hashlib.blake2b(repr(tuple(_stable_value(value) for value in values)).encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+
+class SyncJournal:
+    """
+    Change journal of the rows copied into the target.
+
+    Args:
+        path (str): SQLite file, created if missing
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                source_fc TEXT NOT NULL,
+                source_oid INTEGER NOT NULL,
+                target_oid INTEGER NOT NULL,
+                row_hash TEXT NOT NULL,
+                PRIMARY KEY (source_fc, source_oid)
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def close(self):
+        self.connection.close()
+
+    def schema(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_schema(self, schema):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (json.dumps(schema),))
+
+    def reset(self, schema):
+        # Forget every row, e.g. after the target was rebuilt
+        with self.connection:
+            self.connection.execute("DELETE FROM rows")
+            self.connection.execute("DELETE FROM meta WHERE key LIKE 'dirty:%'")
+        self.set_schema(schema)
+
+    def mark_dirty(self, source):
+        # Set before the target rows of a source are changed
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES (?, '1')", (f'dirty:{source}',))
+
+    def mark_clean(self, source):
+        # Cleared once the journal records every change of the source
+        with self.connection:
+            self.connection.execute("DELETE FROM meta WHERE key = ?", (f'dirty:{source}',))
+
+    def is_dirty(self):
+        # True if the sync of some source did not finish
+        return self.connection.execute("SELECT 1 FROM meta WHERE key LIKE 'dirty:%'").fetchone() is not None
+
+    def sources(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT source_fc FROM rows")]
+
+    def entries(self, source):
+        # {source oid: (target oid, hash)} of one source
+        cursor = self.connection.execute(
+            "SELECT source_oid, target_oid, row_hash FROM rows WHERE source_fc = ?", (source,))
+        return {source_oid: (target_oid, hashed) for source_oid, target_oid, hashed in cursor}
+
+    def apply(self, source, upserts, deleted):
+        """
+        Record the changes of one source in one transaction.
+
+        Args:
+            upserts (list): (source oid, target oid, hash) of inserted and updated rows
+            deleted (list): Source oids whose rows were removed from the target
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)",
+                [(source, source_oid, target_oid, hashed) for source_oid, target_oid, hashed in upserts])
+            self.connection.executemany(
+                "DELETE FROM rows WHERE source_fc = ? AND source_oid = ?",
+                [(source, source_oid) for source_oid in deleted])
+
+
+class AssetSync:
+    """
+    Applies the changes of source feature classes to the target.
+
+    Args:
+        target (str): Target feature class, e.g. active_assets
+        journal (SyncJournal): Change journal of the target
+        backend: ArcpyBackend (default) or cursor_copy.MemoryBackend
+        constant_fields (list): Target fields filled per source, e.g. ['SOURCE_FC']
+    """
+
+    def __init__(self, target, journal, backend=None, constant_fields=('SOURCE_FC',)):
+        self.target = target
+        self.journal = journal
+        self.backend = backend or ArcpyBackend()
+        self.constant_fields = list(constant_fields)
+        self.target_fields = self.backend.list_fields(target)
+
+    def geometry_field(self, source):
+        return GEOMETRY_FIELD_ZM if self.backend.has_z_or_m(source) else GEOMETRY_FIELD
+
+    def column_map(self, source, source_fields=None):
+        if source_fields is None:
+            source_fields = self.backend.list_fields(source)
+        return ColumnMap(source_fields, self.target_fields, self.geometry_field(source), self.constant_fields)
+
+    def schema(self, sources):
+        # Field lists per source, the journal is only valid for the schema it was built with
+        return {source: self.backend.list_fields(source) for source in sorted(sources)}
+
+    def schema_matches(self, sources):
+        # True if the journal can be used: the last run finished and no known source changed its fields
+        stored = self.journal.schema()
+        if stored is None or self.journal.is_dirty():
+            return False
+        return all(stored.get(source, fields) == fields for source, fields in self.schema(sources).items())
+
+    def record_schema(self, sources):
+        # Remember the field lists of the synced sources, keeping the journal rows
+        stored = self.journal.schema() or {}
+        stored.update(self.schema(sources))
+        self.journal.set_schema(stored)
+
+    def sync(self, source, where_clause=None, on_error=print):
+        """
+        Bring the target rows of one source up to date.
+
+        Returns:
+            dict: Number of 'inserted', 'updated', 'deleted' and 'unchanged' rows
+        """
+        columns = self.column_map(source)
+        constants = (source,)
+        journal = self.journal.entries(source)
+
+        inserts, updates = [], {}
+        seen = set()
+        with self.backend.search(source, ['OID@'] + columns.search_fields, where_clause) as rows:
+            for row in rows:
+                source_oid = row[0]
+                seen.add(source_oid)
+                values = columns.getter(row[1:]) + constants
+                hashed = row_hash(values)
+                entry = journal.get(source_oid)
+                if entry is None:
+                    inserts.append((source_oid, values, hashed))
+                elif entry[1] != hashed:
+                    updates[entry[0]] = (source_oid, values, hashed)
+
+        # Until the journal is updated below, the target and the journal may disagree
+        self.journal.mark_dirty(source)
+
+        # Rows that are no longer active or were deleted in the source
+        gone = [source_oid for source_oid in journal if source_oid not in seen]
+        deleted = 0
+        if gone:
+            deleted = self.backend.delete_rows(self.target, [journal[source_oid][0] for source_oid in gone])
+            self.journal.apply(source, [], gone)
+
+        updated = 0
+        if updates:
+            found = self.backend.update_rows(
+                self.target, columns.insert_fields,
+                {target_oid: values for target_oid, (_, values, _) in updates.items()})
+            self.journal.apply(source, [(source_oid, target_oid, hashed)
+                                        for target_oid, (source_oid, _, hashed) in updates.items()
+                                        if target_oid in found], [])
+            updated = len(found)
+            # Rows that were removed from the target outside this tool are inserted again
+            inserts.extend(entry for target_oid, entry in updates.items() if target_oid not in found)
+
+        inserted = []
+        if inserts:
+            with self.backend.insert(self.target, columns.insert_fields) as insert_row:
+                for source_oid, values, hashed in inserts:
+                    try:
+                        inserted.append((source_oid, insert_row(values), hashed))
+                    except Exception as e:
+                        on_error(f"    Error inserting row: {str(e)}")
+            self.journal.apply(source, inserted, [])
+
+        self.journal.mark_clean(source)
+        return {'inserted': len(inserted), 'updated': updated, 'deleted': deleted,
+                'unchanged': len(seen) - len(inserts) - updated}
+
+    def remove_sources(self, keep):
+        """
+        Delete the target rows of journal sources that are not synced anymore.
+
+        Args:
+            keep (list): Sources that are still part of the consolidation
+
+        Returns:
+            int: Number of rows deleted
+        """
+        deleted = 0
+        for source in self.journal.sources():
+            if source in keep:
+                continue
+            entries = self.journal.entries(source)
+            self.journal.mark_dirty(source)
+            deleted += self.backend.delete_rows(self.target, [target_oid for target_oid, _ in entries.values()])
+            self.journal.apply(source, [], list(entries))
+            self.journal.mark_clean(source)
+        return deleted
@@ -2,65 +2,27 @@
 Exercise 9.1: Using arcpy.da cursors
 """
 
+import argparse
 import arcpy
 import os
+import sys
 
+# Make the helper modules next to this script importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from cursor_copy import CopyEngine
+from asset_sync import AssetSync, SyncJournal, journal_path_for
+from parallel_scan import copy_parallel, inspect_schemas, worker_count
 
-def process_geodatabase(gdb_path):
 
+def create_active_assets(gdb_path, active_assets_fc, first_point_fc):
+    """
+    Create the active_assets feature class based on the first point feature class.
     
-   ## Args:gdb_path (str): Path to the geodatabase
-    
-    # Set workspace to the geodatabase
-    arcpy.env.workspace = gdb_path
-    
-    # Get list of all feature classes in the geodatabase
-    feature_classes = arcpy.ListFeatureClasses()
-    
-    if not feature_classes:
-        print("No feature classes found in the geodatabase.")
-        return
-    
-    # Initialize variables for the new feature class
-    active_assets_fc = "active_assets"
+    Returns:
+        bool: True if the feature class was created
+    """
     active_assets_path = os.path.join(gdb_path, active_assets_fc)
     
-    # Variables to track processing
-    point_feature_classes = []
-    total_active_features = 0
-    first_point_fc = None
-    
-    print(f"Processing geodatabase: {gdb_path}")
-    print(f"Found {len(feature_classes)} feature classes")
-    
-    # First pass: identify Point-Geometry feature classes and check for 'status' field
-    for fc in feature_classes:
-        try:
-            # Get feature class description
-            desc = arcpy.Describe(fc)
-            
-            # Check if it's a Point geometry type
-            if desc.shapeType == "Point":
-                print(f"\nFound Point feature class: {fc}")
-                
-                # Check if 'status' field exists
-                fields = [field.name.lower() for field in arcpy.ListFields(fc)]
-                if 'status' in fields:
-                    point_feature_classes.append(fc)
-                    if first_point_fc is None:
-                        first_point_fc = fc
-                    print(f"  - Has 'status' field: Yes")
-                else:
-                    print(f"  - Has 'status' field: No (skipping)")
-                    
-        except Exception as e:
-            print(f"Error processing feature class {fc}: {str(e)}")
-    
-    if not point_feature_classes:
-        print("\nNo Point feature classes with 'status' field found.")
-        return
-    
-    # Create the active_assets feature class based on the first point feature class
     try:
         if arcpy.Exists(active_assets_path):
             print(f"\nDeleting existing {active_assets_fc} feature class...")
@@ -102,79 +64,150 @@ def process_geodatabase(gdb_path):
         
     except Exception as e:
         print(f"Error creating active_assets feature class: {str(e)}")
-        return
+        return False
     
-    # Second pass: Process each Point feature class and copy active features
+    return True
+
+
+def sync_active_assets(active_assets_path, journal, point_feature_classes, where_clause):
+    """
+    Apply the changes of the point feature classes to an existing active_assets.
+    
+    Only new active features are inserted, changed ones updated and features that are
+    no longer active deleted, using the change journal of the previous runs.
+    """
+    sync = AssetSync(active_assets_path, journal)
+    totals = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
     for fc in point_feature_classes:
         try:
-            print(f"\nProcessing feature class: {fc}")
-            
-            # Get all field names for the current feature class (excluding system fields)
-            fc_fields = arcpy.ListFields(fc)
-            data_fields = []
-            
-            for field in fc_fields:
-                if field.name.lower() not in ['objectid', 'globalid']:
-                    data_fields.append(field.name)
-            
-            # Add SHAPE@ token for geometry
-            search_fields = data_fields + ['SHAPE@']
-            
-            # Create search cursor with filter for 'active' status
-            where_clause = "status = 'active'"
-            active_count = 0
+            print(f"\nSyncing feature class: {fc}")
+            changes = sync.sync(fc, where_clause)
+            print(f"  - Inserted: {changes['inserted']}, updated: {changes['updated']}, "
+                  f"deleted: {changes['deleted']}, unchanged: {changes['unchanged']}")
+            for key in totals:
+                totals[key] += changes[key]
+        except Exception as e:
+            print(f"Error syncing feature class {fc}: {str(e)}")
+    
+    # Feature classes that were removed or lost their 'status' field
+    removed = sync.remove_sources(point_feature_classes)
+    totals['deleted'] += removed
+    sync.record_schema(point_feature_classes)
+    
+    print(f"\n=== Incremental Refresh Complete ===")
+    print(f"Total Point feature classes synced: {len(point_feature_classes)}")
+    print(f"Inserted: {totals['inserted']}, updated: {totals['updated']}, "
+          f"deleted: {totals['deleted']}, unchanged: {totals['unchanged']}")
+    return totals
+
+
+def process_geodatabase(gdb_path, workers=1, incremental=False):
+
+    
+   ## Args:gdb_path (str): Path to the geodatabase
+   ##      workers (int): Worker processes reading the feature classes, 1 (default) reads them in this process,
+   ##                     None uses worker processes only for many feature classes
+   ##      incremental (bool): Update active_assets from the change journal instead of rebuilding it
+    
+    # Set workspace to the geodatabase
+    arcpy.env.workspace = gdb_path
+    
+    # Get list of all feature classes in the geodatabase
+    feature_classes = arcpy.ListFeatureClasses()
+    
+    if not feature_classes:
+        print("No feature classes found in the geodatabase.")
+        return
+    
+    # Initialize variables for the new feature class
+    active_assets_fc = "active_assets"
+    active_assets_path = os.path.join(gdb_path, active_assets_fc)
+    
+    # Variables to track processing
+    point_feature_classes = []
+    total_active_features = 0
+    first_point_fc = None
+    
+    print(f"Processing geodatabase: {gdb_path}")
+    print(f"Found {len(feature_classes)} feature classes")
+    
+    # The previous output is rebuilt, never read as a source
+    feature_classes = [fc for fc in feature_classes if fc.lower() != active_assets_fc]
+    
+    # First pass: identify Point-Geometry feature classes and check for 'status' field
+    # With more than one worker the feature classes are described concurrently in worker processes
+    schemas = inspect_schemas(gdb_path, feature_classes, workers)
+    point_schemas = []
+    for fc in feature_classes:
+        schema = schemas[fc]
+        if 'error' in schema:
+            print(f"Error processing feature class {fc}: {schema['error']}")
+            continue
+        
+        # Check if it's a Point geometry type
+        if schema['shape_type'] == "Point":
+            print(f"\nFound Point feature class: {fc}")
             
-            with arcpy.da.SearchCursor(fc, search_fields, where_clause) as search_cursor:
-                # Get field names for insert cursor (excluding SHAPE@ for now)
-                insert_fields = []
-                for field_name in data_fields:
-                    # Check if field exists in active_assets
-                    try:
-                        arcpy.ListFields(active_assets_path, field_name)[0]
-                        insert_fields.append(field_name)
-                    except IndexError:
-                        # Field doesn't exist in target, we'll skip it
-                        pass
-                
-                # Add SOURCE_FC and SHAPE@ fields
-                insert_fields.extend(['SOURCE_FC', 'SHAPE@'])
+            # Check if 'status' field exists
+            fields = [name.lower() for name in schema['fields']]
+            if 'status' in fields:
+                point_feature_classes.append(fc)
+                point_schemas.append(schema)
+                if first_point_fc is None:
+                    first_point_fc = fc
+                print(f"  - Has 'status' field: Yes")
+            else:
+                print(f"  - Has 'status' field: No (skipping)")
+    
+    if not point_feature_classes:
+        print("\nNo Point feature classes with 'status' field found.")
+        return
+    
+    where_clause = "status = 'active'"
+    
+    # Incremental mode: keep active_assets and only apply the changes since the last run
+    if incremental:
+        journal = SyncJournal(journal_path_for(gdb_path, active_assets_fc))
+        try:
+            if arcpy.Exists(active_assets_path) and AssetSync(active_assets_path, journal).schema_matches(point_feature_classes):
+                print(f"\nUpdating existing {active_assets_fc} feature class incrementally...")
+            elif create_active_assets(gdb_path, active_assets_fc, first_point_fc):
+                journal.reset({})
+            else:
+                return
+            sync_active_assets(active_assets_path, journal, point_feature_classes, where_clause)
+        finally:
+            journal.close()
+        return
+    
+    if not create_active_assets(gdb_path, active_assets_fc, first_point_fc):
+        return
+    
+    # A journal of an earlier incremental run no longer matches the rebuilt feature class
+    journal_path = journal_path_for(gdb_path, active_assets_fc)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    
+    # Second pass: Process each Point feature class and copy active features
+    if worker_count(point_feature_classes, workers) == 1:
+        # The copy engine maps the columns once per feature class and inserts the rows in batches
+        copy_engine = CopyEngine(active_assets_path)
+        for fc in point_feature_classes:
+            try:
+                print(f"\nProcessing feature class: {fc}")
+                active_count = copy_engine.copy(fc, where_clause)
+                print(f"  - Active features found and copied: {active_count}")
+                total_active_features += active_count
                 
-                # Create insert cursor for active_assets
-                with arcpy.da.InsertCursor(active_assets_path, insert_fields) as insert_cursor:
-                    
-                    for row in search_cursor:
-                        try:
-                            # Prepare the new row for insertion
-                            new_row = []
-                            
-                            # Map data from search cursor to insert cursor
-                            for field_name in insert_fields:
-                                if field_name == 'SOURCE_FC':
-                                    new_row.append(fc)
-                                elif field_name == 'SHAPE@':
-                                    # Get geometry from the last item in search row
-                                    new_row.append(row[-1])
-                                else:
-                                    # Find the field index in the search cursor
-                                    try:
-                                        field_index = data_fields.index(field_name)
-                                        new_row.append(row[field_index])
-                                    except ValueError:
-                                        # Field not found, append None
-                                        new_row.append(None)
-                            
-                            # Insert the row
-                            insert_cursor.insertRow(new_row)
-                            active_count += 1
-                            
-                        except Exception as e:
-                            print(f"    Error inserting row: {str(e)}")
-            
-            print(f"  - Active features found and copied: {active_count}")
+            except Exception as e:
+                print(f"Error processing feature class {fc}: {str(e)}")
+    else:
+        # Worker processes read the feature classes concurrently, this process writes all rows
+        print(f"\nReading {len(point_feature_classes)} feature classes in parallel...")
+        copied = copy_parallel(gdb_path, active_assets_path, point_schemas, where_clause, workers)
+        for fc, active_count in copied.items():
+            print(f"  - {fc}: active features found and copied: {active_count}")
             total_active_features += active_count
-            
-        except Exception as e:
-            print(f"Error processing feature class {fc}: {str(e)}")
     
     print(f"\n=== Processing Complete ===")
     print(f"Total Point feature classes processed: {len(point_feature_classes)}")
@@ -187,9 +220,22 @@ def process_geodatabase(gdb_path):
         print("No active features were found to copy.")
 
 
+def parse_arguments(args=None):
+    # "--incremental" only applies the changes since the last run, "--workers N" sets the worker
+    # processes; without it worker processes are only used for many feature classes
+    parser = argparse.ArgumentParser(description="Copy the active assets of all point feature classes")
+    parser.add_argument("--incremental", action="store_true",
+                        help="update active_assets from the change journal instead of rebuilding it")
+    parser.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="worker processes reading the feature classes, 1 reads them in this process")
+    return parser.parse_args(args)
+
+
 def main():
     """Main function to run the script"""
     
+    arguments = parse_arguments()
+    
     # Path to the geodatabase
     gdb_path = r"D:\study\UniMuenster\Sose2025\PythonInQgisandArcgis\week9\exercise_arcpy_1.gdb"
     
@@ -201,7 +247,7 @@ def main():
     
     try:
         # Process the geodatabase
-        process_geodatabase(gdb_path)
+        process_geodatabase(gdb_path, workers=arguments.workers, incremental=arguments.incremental)
         
     except Exception as e:
         print(f"Script execution failed: {str(e)}")
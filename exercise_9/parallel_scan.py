@@ -0,0 +1,210 @@
+"""
+Parallel per-feature-class scanning for the geodatabase consolidation (exercise 9.1).
+
+Worker processes describe the feature classes and read their filtered
+rows concurrently; the main process is the single writer. Workers build
+the target rows with the column map of cursor_copy and put them in
+batches into a bounded queue, so memory stays flat however many feature
+classes are read at the same time.
+
+Rows carry the point geometry as SHAPE@XY (a picklable tuple). That
+drops Z and M values, so feature classes with Z or M values are copied
+with full SHAPE@ geometries in the main process instead.
+
+Starting arcpy in a worker process costs seconds, so the pool only pays
+off for many feature classes: worker_count keeps small geodatabases in
+one process.
+"""
+
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import queue
+import sys
+
+from cursor_copy import CopyEngine, column_getter
+
+# The worker pool is shared with other exercises
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from worker_pool import START_ERRORS, map_jobs, process_pool, worker_executable
+
+# Geometry token used between the processes
+GEOMETRY_FIELD = 'SHAPE@XY'
+
+# Feature classes needed before worker processes are used by default
+PARALLEL_MIN_FEATURE_CLASSES = 8
+
+# Queue shared with the worker processes, set by _init_worker
+_rows_queue = None
+
+
+def describe_feature_class(gdb_path, fc):
+    """
+    Shape type, spatial reference and field names of one feature class.
+
+    Returns:
+        dict: 'name', 'shape_type', 'spatial_reference' (WKT), 'has_z', 'has_m' and 'fields'
+    """
+    import arcpy
+    arcpy.env.workspace = gdb_path
+    desc = arcpy.Describe(fc)
+    return {
+        'name': fc,
+        'shape_type': desc.shapeType,
+        'spatial_reference': desc.spatialReference.exportToString(),
+        'has_z': desc.hasZ,
+        'has_m': desc.hasM,
+        'fields': [field.name for field in arcpy.ListFields(fc)],
+    }
+
+
+def worker_count(feature_classes, workers=None):
+    """
+    Number of processes to read the feature classes with.
+
+    Args:
+        feature_classes (list): Feature classes to read
+        workers (int): Requested processes, None to decide from the number of feature classes
+
+    Returns:
+        int: 1 to read in this process, otherwise at most one worker per feature class
+    """
+    if workers is None:
+        if len(feature_classes) < PARALLEL_MIN_FEATURE_CLASSES:
+            return 1
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, len(feature_classes)))
+
+
+def inspect_schemas(gdb_path, feature_classes, workers=1):
+    """
+    Describe many feature classes, concurrently if more than one worker is given.
+
+    Returns:
+        dict: Feature class → describe_feature_class result, or {'error': message}
+    """
+    results = {}
+    if worker_count(feature_classes, workers) == 1:
+        for fc in feature_classes:
+            try:
+                results[fc] = describe_feature_class(gdb_path, fc)
+            except Exception as e:
+                results[fc] = {'name': fc, 'error': str(e)}
+        return results
+
+    for (_, fc), schema, error in map_jobs(describe_feature_class, [(gdb_path, fc) for fc in feature_classes],
+                                           worker_count(feature_classes, workers)):
+        results[fc] = schema if error is None else {'name': fc, 'error': str(error)}
+    return results
+
+
+def _init_worker(rows_queue):
+    global _rows_queue
+    _rows_queue = rows_queue
+
+
+def _scan_feature_class(gdb_path, fc, search_fields, indices, constants, where_clause, batch_size):
+    # Worker: read the filtered rows and put the built target rows into the queue in batches
+    import arcpy
+    arcpy.env.workspace = gdb_path
+    getter = column_getter(indices)
+    constants = tuple(constants)
+    read = 0
+    batch = []
+    with arcpy.da.SearchCursor(fc, search_fields, where_clause) as cursor:
+        for row in cursor:
+            batch.append(getter(row) + constants)
+            if len(batch) >= batch_size:
+                _rows_queue.put(('rows', fc, batch))
+                read += len(batch)
+                batch = []
+    if batch:
+        _rows_queue.put(('rows', fc, batch))
+        read += len(batch)
+    _rows_queue.put(('done', fc, read))
+    return read
+
+
+def copy_parallel(gdb_path, target_path, schemas, where_clause, workers=None, queue_size=16,
+                  batch_size=5000, on_error=print):
+    """
+    Copy the filtered rows of many feature classes into the target.
+
+    Args:
+        gdb_path (str): Geodatabase of the feature classes
+        target_path (str): Target feature class, e.g. active_assets
+        schemas (list): describe_feature_class results of the source feature classes
+        where_clause (str): SQL filter of the source rows
+        workers (int): Reader processes, None decides from the number of feature classes
+        queue_size (int): Batches that may wait for the writer
+        batch_size (int): Rows per batch
+        on_error (callable): Called with a message for rows or feature classes that failed
+
+    Returns:
+        dict: Feature class → number of rows copied
+    """
+    engine = CopyEngine(target_path, batch_size=batch_size)
+    # SHAPE@XY would drop Z and M values, those feature classes are copied in this process
+    columns = {schema['name']: engine.column_map(schema['name'], schema['fields'], GEOMETRY_FIELD)
+               for schema in schemas if not schema.get('has_z') and not schema.get('has_m')}
+    copied = {schema['name']: 0 for schema in schemas}
+
+    def copy_here(feature_classes):
+        # Copy one feature class after another in this process
+        import arcpy
+        arcpy.env.workspace = gdb_path
+        for fc in feature_classes:
+            try:
+                copied[fc] = engine.copy(fc, where_clause, on_error=on_error)
+            except Exception as e:
+                on_error(f"Error processing feature class {fc}: {str(e)}")
+
+    if worker_count(list(columns), workers) == 1:
+        copy_here(list(copied))
+        return copied
+
+    rows_queue = multiprocessing.get_context('spawn').Queue(maxsize=queue_size)
+    futures = {}
+    with process_pool(worker_count(list(columns), workers), _init_worker, (rows_queue,)) as executor:
+        try:
+            with worker_executable():
+                for fc, column_map in columns.items():
+                    futures[fc] = executor.submit(_scan_feature_class, gdb_path, fc, column_map.search_fields,
+                                                  column_map.indices, (fc,), where_clause, batch_size)
+        except START_ERRORS:
+            # The worker processes could not be started, the feature classes left are copied below
+            pass
+        pending = set(futures)
+        # Single writer: insert the batches as they arrive
+        while pending:
+            try:
+                kind, fc, payload = rows_queue.get(timeout=1)
+            except queue.Empty:
+                # A reader that failed never sends 'done'
+                for fc in [fc for fc in pending if futures[fc].done() and futures[fc].exception()]:
+                    if not isinstance(futures[fc].exception(), BrokenProcessPool):
+                        on_error(f"Error processing feature class {fc}: {futures[fc].exception()}")
+                    pending.discard(fc)
+                continue
+            if kind == 'rows':
+                copied[fc] += engine.insert_rows(columns[fc].insert_fields, payload, on_error)
+            else:
+                pending.discard(fc)
+
+    # Batches a failed reader sent before it stopped
+    while True:
+        try:
+            kind, fc, payload = rows_queue.get_nowait()
+        except queue.Empty:
+            break
+        if kind == 'rows':
+            copied[fc] += engine.insert_rows(columns[fc].insert_fields, payload, on_error)
+
+    # Feature classes the pool did not read because it could not start or broke
+    unread = [fc for fc in columns
+              if fc not in futures or isinstance(futures[fc].exception(), BrokenProcessPool)]
+    for fc in unread:
+        if copied[fc]:
+            on_error(f"Error processing feature class {fc}: worker stopped after {copied[fc]} rows were copied")
+    copy_here([fc for fc in unread if not copied[fc]] + [fc for fc in copied if fc not in columns])
+    return copied
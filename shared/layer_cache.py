@@ -0,0 +1,76 @@
+"""
+Session cache of values computed from QGIS layers (exercises 4, 5 and 7).
+
+Every entry names the layers it was built from. The cache connects once
+to dataChanged and willBeDeleted of each of those layers and drops the
+entries of a layer when it changes or is deleted. Once no entry uses a
+layer anymore its signals are disconnected again, so the cache does not
+keep slots on layers it no longer needs.
+"""
+
+from functools import partial
+
+
+class LayerCache:
+    # Values per key, dropped with the layers they depend on
+
+    def __init__(self):
+        self._entries = {}
+        # Layer id → (layer, slot) of the connected signals
+        self._watched = {}
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, layers, build):
+        """
+        Return the cached value of a key, building it if needed.
+
+        Args:
+            key: Hashable key of the value
+            layers (list): QgsMapLayer objects the value is computed from
+            build (callable): Computes the value, called without arguments
+
+        Returns:
+            The cached or newly built value
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = (build(), tuple(layer.id() for layer in layers))
+            for layer in layers:
+                self._watch(layer)
+        return entry[0]
+
+    def invalidate(self, layer_id):
+        # Drop every entry built from the layer and release layers no entry uses anymore
+        for key in [key for key, (_, layer_ids) in self._entries.items() if layer_id in layer_ids]:
+            del self._entries[key]
+        used = {layer_id for _, layer_ids in self._entries.values() for layer_id in layer_ids}
+        for watched_id in [watched_id for watched_id in self._watched if watched_id not in used]:
+            self._unwatch(watched_id)
+
+    def clear(self):
+        self._entries.clear()
+        for layer_id in list(self._watched):
+            self._unwatch(layer_id)
+
+    def _watch(self, layer):
+        layer_id = layer.id()
+        if layer_id in self._watched:
+            return
+        slot = partial(self.invalidate, layer_id)
+        layer.dataChanged.connect(slot)
+        layer.willBeDeleted.connect(slot)
+        self._watched[layer_id] = (layer, slot)
+
+    def _unwatch(self, layer_id):
+        layer, slot = self._watched.pop(layer_id)
+        for signal in ('dataChanged', 'willBeDeleted'):
+            try:
+                getattr(layer, signal).disconnect(slot)
+            except (TypeError, RuntimeError):
+                # Not connected anymore, or the layer is already gone
+                pass
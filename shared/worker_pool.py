@@ -0,0 +1,130 @@
+"""
+Worker process pools shared by the exercise scripts (exercises 6, 7 and 9).
+
+QGIS and ArcGIS Pro embed Python: sys.executable is the application, so
+spawned workers have to be started with the bundled interpreter. It is
+only swapped in while workers are started and restored afterwards, the
+multiprocessing setting of the host process stays as it was.
+
+A process pool starts its workers when the first jobs are submitted, so
+a pool that cannot run does not fail when it is created but later, with
+OSError on submit or BrokenProcessPool on the results. map_jobs then
+runs the jobs the pool did not finish in this process.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+import multiprocessing
+import multiprocessing.spawn
+import os
+import sys
+
+# Errors of submit() when the workers cannot be started
+START_ERRORS = (BrokenProcessPool, OSError)
+
+
+def python_executable():
+    # Inside QGIS or ArcGIS Pro sys.executable is the application, worker processes need python.exe
+    executable = sys.executable
+    if os.path.basename(executable).lower().startswith('python'):
+        return executable
+    for name in ('pythonw.exe', 'python.exe', 'python3', 'python'):
+        for folder in (sys.exec_prefix, os.path.join(sys.exec_prefix, 'bin')):
+            candidate = os.path.join(folder, name)
+            if os.path.exists(candidate):
+                return candidate
+    return executable
+
+
+@contextmanager
+def worker_executable():
+    # Start spawned processes with the bundled interpreter, submit() starts the pool workers
+    executable = python_executable()
+    previous = multiprocessing.spawn.get_executable()
+    # The setting is bytes on some platforms
+    if executable == os.fsdecode(previous):
+        yield
+        return
+    multiprocessing.spawn.set_executable(executable)
+    try:
+        yield
+    finally:
+        multiprocessing.spawn.set_executable(previous)
+
+
+def process_pool(workers=None, initializer=None, initargs=()):
+    # Pool of spawned workers, submit to it inside worker_executable()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=initializer, initargs=initargs)
+
+
+def _run_here(function, job):
+    try:
+        return job, function(*job), None
+    except Exception as e:
+        return job, None, e
+
+
+def map_jobs(function, jobs, workers=None, in_flight=None):
+    """
+    Run function(*job) for every job in worker processes.
+
+    Only in_flight jobs are submitted ahead of the one whose result is
+    yielded next, so a long job list does not pile up results in memory.
+    If the pool cannot start or breaks, the jobs it did not finish are
+    run one after another in this process.
+
+    Args:
+        function (callable): Module-level function, the workers import it by name
+        jobs (iterable): Argument tuples, one per call
+        workers (int): Worker processes, defaults to the CPU count
+        in_flight (int): Jobs submitted ahead, defaults to twice the workers
+
+    Yields:
+        tuple: (job, result, exception or None) in the order of the jobs
+    """
+    jobs = iter(jobs)
+    workers = workers or os.cpu_count() or 1
+    in_flight = in_flight or 2 * workers
+    pending = deque()
+    broken = False
+    exhausted = False
+    with process_pool(workers) as executor:
+        while not broken:
+            if not exhausted:
+                job = next(jobs, None)
+                exhausted = job is None
+            if not exhausted:
+                try:
+                    with worker_executable():
+                        pending.append((job, executor.submit(function, *job)))
+                except START_ERRORS:
+                    pending.append((job, None))
+                    broken = True
+                    break
+                if len(pending) < in_flight:
+                    continue
+            if not pending:
+                break
+            job, future = pending[0]
+            try:
+                outcome = job, future.result(), None
+            except BrokenProcessPool:
+                broken = True
+                break
+            except Exception as e:
+                outcome = job, None, e
+            pending.popleft()
+            yield outcome
+
+    # The pool broke: results it still delivered are kept, the other jobs run here
+    for job, future in pending:
+        if future is not None and not future.cancelled() and not isinstance(future.exception(), BrokenProcessPool):
+            error = future.exception()
+            yield job, None if error else future.result(), error
+        else:
+            yield _run_here(function, job)
+    for job in jobs:
+        yield _run_here(function, job)
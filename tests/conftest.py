@@ -0,0 +1,13 @@
+"""
+The exercise helper modules are imported the way the scripts import them:
+with their exercise folder on sys.path. Only modules that run without
+QGIS or arcpy are tested here.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for folder in ('exercise_4', 'exercise_5', 'exercise_6', 'exercise_7', 'exercise_9', 'exercise_10', 'exercise_11', 'shared'):
+    sys.path.insert(0, os.path.join(ROOT, folder))
@@ -0,0 +1,133 @@
+import pytest
+
+from asset_sync import AssetSync, SyncJournal
+from cursor_copy import MemoryBackend
+
+SOURCE_FIELDS = ['OBJECTID', 'name', 'status', 'SHAPE@XY']
+TARGET_FIELDS = ['OBJECTID', 'name', 'status', 'SHAPE@XY', 'SOURCE_FC']
+
+
+def active(row):
+    return row['status'] == 'active'
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend({
+        'pumps': {'fields': SOURCE_FIELDS, 'rows': [
+            (1, 'P1', 'active', (7.6, 51.9)),
+            (2, 'P2', 'active', (7.7, 51.9)),
+            (3, 'P3', 'retired', (7.8, 51.9)),
+        ]},
+        'active_assets': {'fields': TARGET_FIELDS, 'rows': []},
+    })
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = SyncJournal(str(tmp_path / 'journal.sqlite'))
+    yield journal
+    journal.close()
+
+
+def target_names(backend):
+    return sorted(row[1] for row in backend.tables['active_assets']['rows'])
+
+
+def set_source_row(backend, oid, row, source='pumps'):
+    rows = backend.tables[source]['rows']
+    rows[[r[0] for r in rows].index(oid)] = row
+
+
+def test_first_sync_inserts_active_rows(backend, journal):
+    sync = AssetSync('active_assets', journal, backend)
+    changes = sync.sync('pumps', active, on_error=pytest.fail)
+    assert changes == {'inserted': 2, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    assert target_names(backend) == ['P1', 'P2']
+    assert not journal.is_dirty()
+
+
+def test_changes_are_applied(backend, journal):
+    sync = AssetSync('active_assets', journal, backend)
+    sync.sync('pumps', active, on_error=pytest.fail)
+    set_source_row(backend, 1, (1, 'P1b', 'active', (7.6, 51.9)))
+    set_source_row(backend, 2, (2, 'P2', 'retired', (7.7, 51.9)))
+    set_source_row(backend, 3, (3, 'P3', 'active', (7.8, 51.9)))
+
+    changes = sync.sync('pumps', active, on_error=pytest.fail)
+    assert changes == {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 0}
+    assert target_names(backend) == ['P1b', 'P3']
+    assert sync.sync('pumps', active)['unchanged'] == 2
+
+
+def test_row_deleted_from_target_is_inserted_again(backend, journal):
+    sync = AssetSync('active_assets', journal, backend)
+    sync.sync('pumps', active, on_error=pytest.fail)
+    # P1 is deleted from active_assets outside the tool, then edited in the source
+    target = backend.tables['active_assets']
+    target['rows'] = [row for row in target['rows'] if row[1] != 'P1']
+    set_source_row(backend, 1, (1, 'P1b', 'active', (7.6, 51.9)))
+
+    changes = sync.sync('pumps', active, on_error=pytest.fail)
+    assert changes == {'inserted': 1, 'updated': 0, 'deleted': 0, 'unchanged': 1}
+    assert target_names(backend) == ['P1b', 'P2']
+
+    # The journal points at the new row, a later edit updates it
+    set_source_row(backend, 1, (1, 'P1c', 'active', (7.6, 51.9)))
+    assert sync.sync('pumps', active)['updated'] == 1
+    assert target_names(backend) == ['P1c', 'P2']
+
+
+def test_interrupted_sync_leaves_journal_dirty(backend, journal):
+    sync = AssetSync('active_assets', journal, backend)
+    sync.sync('pumps', active, on_error=pytest.fail)
+    sync.record_schema(['pumps'])
+    assert sync.schema_matches(['pumps'])
+
+    set_source_row(backend, 1, (1, 'P1b', 'active', (7.6, 51.9)))
+
+    def fail(*args):
+        raise RuntimeError('lock')
+    backend.update_rows = fail
+    with pytest.raises(RuntimeError):
+        sync.sync('pumps', active)
+    assert journal.is_dirty()
+    # The caller rebuilds the target instead of trusting the journal
+    assert not sync.schema_matches(['pumps'])
+
+    journal.reset({})
+    assert not journal.is_dirty()
+
+
+def test_remove_sources(backend, journal):
+    sync = AssetSync('active_assets', journal, backend)
+    sync.sync('pumps', active, on_error=pytest.fail)
+    assert sync.remove_sources([]) == 2
+    assert target_names(backend) == []
+    assert journal.sources() == []
+
+
+class Geometry:
+    # Stands for an arcpy geometry: no stable repr, WKB includes Z
+    def __init__(self, x, y, z):
+        self.WKB = bytearray(repr((x, y, z)).encode())
+
+
+def test_z_only_change_is_detected(journal):
+    backend = MemoryBackend({
+        'hydrants': {'fields': ['OBJECTID', 'name', 'status', 'SHAPE@'], 'has_z': True, 'rows': [
+            (1, 'H1', 'active', Geometry(7.6, 51.9, 60.0)),
+        ]},
+        'active_assets': {'fields': ['OBJECTID', 'name', 'status', 'SHAPE@', 'SOURCE_FC'], 'rows': []},
+    })
+    sync = AssetSync('active_assets', journal, backend)
+    assert sync.sync('hydrants', active, on_error=pytest.fail)['inserted'] == 1
+    # A new geometry object with the same coordinates is unchanged
+    set_source_row(backend, 1, (1, 'H1', 'active', Geometry(7.6, 51.9, 60.0)), 'hydrants')
+    assert sync.sync('hydrants', active)['unchanged'] == 1
+
+    moved = Geometry(7.6, 51.9, 62.5)
+    set_source_row(backend, 1, (1, 'H1', 'active', moved), 'hydrants')
+    assert sync.sync('hydrants', active, on_error=pytest.fail)['updated'] == 1
+    # The full geometry is written, Z included
+    assert backend.tables['active_assets']['rows'][0][3] is moved
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from coordinate_transform import BatchTransformer
+
+# Münster and Berlin
+LON = np.array([7.62476, 13.40495])
+LAT = np.array([51.96066, 52.52001])
+
+
+def test_numpy_backend_matches_pyproj():
+    pytest.importorskip('pyproj')
+    expected = BatchTransformer(25832, backend='pyproj').transform(LON, LAT)
+    # The numpy backend skips the WGS84 → ETRS89 datum shift, which is below a metre
+    np.testing.assert_allclose(BatchTransformer(25832, backend='numpy').transform(LON, LAT), expected, atol=1.0)
+
+
+def test_wkt_target_for_crs_without_epsg_code():
+    pyproj = pytest.importorskip('pyproj')
+    wkt = pyproj.CRS.from_epsg(25832).to_wkt()
+    expected = BatchTransformer(25832, backend='pyproj').transform(LON, LAT)
+    np.testing.assert_allclose(BatchTransformer(wkt, backend='pyproj').transform(LON, LAT), expected, atol=1e-6)
+    with pytest.raises(ValueError):
+        BatchTransformer(wkt, backend='numpy')
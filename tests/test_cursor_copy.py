@@ -0,0 +1,68 @@
+import pytest
+
+from cursor_copy import ColumnMap, CopyEngine, MemoryBackend, _copy_field_by_field, column_getter
+
+# The in-memory tables name their geometry column after the cursor token
+SOURCE_FIELDS = ['OBJECTID', 'name', 'status', 'Depth', 'GlobalID', 'SHAPE@']
+TARGET_FIELDS = ['OBJECTID', 'name', 'status', 'SHAPE@', 'SOURCE_FC']
+
+
+def tables():
+    return {
+        'pumps': {'fields': SOURCE_FIELDS, 'rows': [
+            (1, 'P1', 'active', 2.5, '{a}', (7.6, 51.9)),
+            (2, 'P2', 'retired', 3.0, '{b}', (7.7, 51.9)),
+            (3, 'P3', 'active', 1.0, '{c}', (7.8, 51.9)),
+        ]},
+        'active_assets': {'fields': TARGET_FIELDS, 'rows': []},
+    }
+
+
+def test_column_getter_always_returns_tuples():
+    assert column_getter([1])(('a', 'b')) == ('b',)
+    assert column_getter([2, 0])(('a', 'b', 'c')) == ('c', 'a')
+
+
+def test_column_map_matches_names_case_insensitively():
+    columns = ColumnMap(['OBJECTID', 'Name', 'status', 'Depth', 'GlobalID'], TARGET_FIELDS, 'SHAPE@', ['SOURCE_FC'])
+    # System fields are not read, fields missing in the target are not written
+    assert columns.search_fields == ['Name', 'status', 'Depth', 'SHAPE@']
+    assert columns.insert_fields == ['name', 'status', 'SHAPE@', 'SOURCE_FC']
+    assert columns.getter(('P1', 'active', 2.5, (0, 0))) == ('P1', 'active', (0, 0))
+
+
+def test_copy_filtered_rows():
+    backend = MemoryBackend(tables())
+    copied = CopyEngine('active_assets', backend, batch_size=1).copy(
+        'pumps', lambda row: row['status'] == 'active', on_error=pytest.fail)
+    assert copied == 2
+    assert backend.tables['active_assets']['rows'] == [
+        (1, 'P1', 'active', (7.6, 51.9), 'pumps'),
+        (2, 'P3', 'active', (7.8, 51.9), 'pumps'),
+    ]
+
+
+def test_copy_matches_field_by_field_loop():
+    engine_backend, loop_backend = MemoryBackend(tables()), MemoryBackend(tables())
+    CopyEngine('active_assets', engine_backend).copy('pumps')
+    _copy_field_by_field(loop_backend, 'pumps', 'active_assets')
+    assert engine_backend.tables['active_assets'] == loop_backend.tables['active_assets']
+
+
+def test_failed_rows_are_reported_and_skipped():
+    errors = []
+    rows = iter([None, 'error'])
+
+    def insert_row(values):
+        if next(rows):
+            raise RuntimeError('bad geometry')
+
+    assert CopyEngine._insert_batch(insert_row, [('a',), ('b',)], errors.append) == 1
+    assert errors == ['    Error inserting row: bad geometry']
+
+
+def test_memory_backend_rejects_sql():
+    backend = MemoryBackend(tables())
+    with pytest.raises(ValueError):
+        with backend.search('pumps', ['Name'], "status = 'active'"):
+            pass
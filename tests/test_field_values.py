@@ -0,0 +1,132 @@
+from contextlib import contextmanager
+import datetime
+import sys
+import types
+
+import pytest
+
+import field_values
+from field_values import (FieldValueIndex, HyperLogLog, field_value_index, like_prefix, prefix_value_index,
+                          prefix_where_clause)
+
+
+@pytest.mark.parametrize('distinct', [10, 1000, 50000])
+def test_hyperloglog_estimate(distinct):
+    sketch = HyperLogLog()
+    for i in range(distinct):
+        sketch.add(f'value {i}')
+        sketch.add(f'value {i}')  # Repeated values do not count
+    # About 1.6 % standard error at precision 12, allow four of them
+    assert sketch.estimate() == pytest.approx(distinct, rel=0.065)
+
+
+def test_value_index_lookups():
+    index = FieldValueIndex({'Bus': 3, 'bahnhof': 1, 'Tram': 2})
+    assert index.values() == ['Bus', 'Tram', 'bahnhof']
+    assert index.values(prefix='b') == ['Bus', 'bahnhof']
+    assert index.count(' Bus ') == 3
+    assert index.count('Ferry') == 0
+    assert FieldValueIndex({'Bus': 3}, complete=False).count('Ferry') is None
+
+
+def test_like_prefix_escapes_wildcards():
+    assert like_prefix('50%_off') == '50\\%\\_off%'
+    assert like_prefix("O'Neil") == "O''Neil%"
+    assert like_prefix('a\\b') == 'a\\\\b%'
+
+
+def test_prefix_where_clause_ignores_case():
+    assert prefix_where_clause('"NAME"', "o'n") == "UPPER(\"NAME\") LIKE UPPER('o''n%') ESCAPE '\\'"
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    # Replaces the arcpy scan, records the keys that were scanned
+    calls = []
+
+    def build(dataset, field_name, max_values=None, time_budget=None, where_clause=None, prefix=None):
+        calls.append((dataset, field_name, where_clause, prefix))
+        return FieldValueIndex({'value': 1}, signature=signatures.get(dataset))
+
+    signatures = {}
+    monkeypatch.setattr(FieldValueIndex, 'build', staticmethod(build))
+    monkeypatch.setattr(field_values, 'dataset_signature', lambda dataset: signatures.get(dataset))
+    monkeypatch.setattr(field_values, '_indexes', type(field_values._indexes)())
+    return calls, signatures
+
+
+def test_signed_dataset_is_rebuilt_when_changed(builds):
+    calls, signatures = builds
+    signatures['stops.shp'] = 1.0
+    field_value_index('stops.shp', 'name')
+    field_value_index('stops.shp', 'name')
+    assert len(calls) == 1
+    signatures['stops.shp'] = 2.0
+    field_value_index('stops.shp', 'name')
+    assert len(calls) == 2
+
+
+def test_unsigned_dataset_is_cached_for_ttl(builds, monkeypatch):
+    calls, _ = builds
+    field_value_index('db.sde/stops', 'name')
+    field_value_index('db.sde/stops', 'name')
+    assert len(calls) == 1
+    monkeypatch.setattr(field_values, 'UNSIGNED_TTL', 0.0)
+    field_value_index('db.sde/stops', 'name')
+    assert len(calls) == 2
+
+
+def test_cache_keeps_most_recently_used(builds, monkeypatch):
+    calls, signatures = builds
+    monkeypatch.setattr(field_values, 'MAX_CACHED', 2)
+    signatures['stops.shp'] = 1.0
+    field_value_index('stops.shp', 'name', where_clause='a')
+    field_value_index('stops.shp', 'name', where_clause='b')
+    field_value_index('stops.shp', 'name', where_clause='a')
+    field_value_index('stops.shp', 'name', where_clause='c')
+    assert len(field_values._indexes) == 2
+    # 'b' was least recently used and had to go, 'a' stayed
+    field_value_index('stops.shp', 'name', where_clause='a')
+    field_value_index('stops.shp', 'name', where_clause='b')
+    assert [call[2] for call in calls] == ['a', 'b', 'c', 'b']
+
+
+@pytest.fixture
+def fake_arcpy(monkeypatch):
+    # Table 'stops' with a text and a date field, cursors ignore the where clause
+    rows = {'name': ['Bahnhof', 'bus depot', 'Aasee', None],
+            'opened': [datetime.date(2019, 5, 1), datetime.date(2020, 1, 1), datetime.date(2019, 7, 1), None]}
+    field_types = {'name': 'String', 'opened': 'Date'}
+    where_clauses = []
+
+    @contextmanager
+    def search_cursor(dataset, fields, where_clause=None):
+        where_clauses.append(where_clause)
+        yield [(value,) for value in rows[fields[0].lower()]]
+
+    arcpy = types.SimpleNamespace(
+        da=types.SimpleNamespace(SearchCursor=search_cursor),
+        ListFields=lambda dataset: [types.SimpleNamespace(name=name, type=field_type)
+                                   for name, field_type in field_types.items()],
+        AddFieldDelimiters=lambda dataset, field_name: f'"{field_name}"')
+    monkeypatch.setitem(sys.modules, 'arcpy', arcpy)
+    monkeypatch.setattr(field_values, 'dataset_signature', lambda dataset: 1.0)
+    monkeypatch.setattr(field_values, '_indexes', type(field_values._indexes)())
+    return where_clauses
+
+
+def test_prefix_of_text_field_is_filtered_in_the_database(fake_arcpy):
+    prefix_value_index('stops', 'NAME', 'b')
+    assert fake_arcpy == [prefix_where_clause('"NAME"', 'b')]
+
+
+def test_prefix_of_date_field_is_filtered_while_scanning(fake_arcpy):
+    index = prefix_value_index('stops', 'opened', '2019')
+    assert fake_arcpy == [None]
+    assert index.values() == ['2019-05-01', '2019-07-01']
+    assert index.complete
+
+
+def test_prefix_scan_ignores_case(fake_arcpy):
+    index = FieldValueIndex.build('stops', 'name', prefix='B')
+    assert index.values() == ['Bahnhof', 'bus depot']
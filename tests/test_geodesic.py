@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from geodesic import (GRS80_A, GRS80_F, REFERENCE_DISTANCES, distance_matrix, geodesic_distance,
+                      haversine_distance, vincenty_distance)
+
+REFERENCE = [np.array(column) for column in zip(*REFERENCE_DISTANCES)]
+
+
+def test_vincenty_matches_reference():
+    lon1, lat1, lon2, lat2, expected = REFERENCE
+    np.testing.assert_allclose(vincenty_distance(lon1, lat1, lon2, lat2), expected, atol=1e-3)
+    np.testing.assert_allclose(geodesic_distance(lon1, lat1, lon2, lat2), expected, atol=1e-3)
+
+
+def test_haversine_is_close():
+    lon1, lat1, lon2, lat2, expected = REFERENCE
+    np.testing.assert_allclose(haversine_distance(lon1, lat1, lon2, lat2), expected, rtol=0.006)
+
+
+def test_scalar_pair_that_does_not_converge():
+    # Nearly antipodal on the equator: Vincenty does not converge, pyproj computes the pair
+    pyproj = pytest.importorskip('pyproj')
+    expected = pyproj.Geod(a=GRS80_A, f=GRS80_F).inv(0.0, 0.0, 179.7, 0.0)[2]
+    distance = geodesic_distance(0.0, 0.0, 179.7, 0.0)
+    assert np.ndim(distance) == 0
+    assert distance == pytest.approx(expected, abs=1e-3)
+
+
+def test_scalar_broadcast_against_array():
+    lon1, lat1, lon2, lat2, expected = REFERENCE
+    distances = geodesic_distance(lon1[0], lat1[0], lon2[:4], lat2[:4])
+    np.testing.assert_allclose(distances, expected[:4], atol=1e-3)
+
+
+def test_distance_matrix_shape():
+    lon1, lat1, lon2, lat2, _ = REFERENCE
+    matrix = distance_matrix(lon1[:3], lat1[:3], lon2, lat2)
+    assert matrix.shape == (3, len(lon2))
+    np.testing.assert_allclose(matrix[0], geodesic_distance(lon1[0], lat1[0], lon2, lat2))
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+import geometry_cache
+from geometry_cache import (CachedColumns, GeometryCache, load_with_cache, read_header, source_key,
+                            write_cache)
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    path = str(tmp_path / 'values.csv.wkbcache')
+    batches = [
+        ([1.5, 2.5], [b'\x01\x02', None], ['residential', 'commercial'], ['Mitte', 'Hiltrup']),
+        ([3.5], [b'\x03'], ['mixed'], ['Gievenbeck']),
+    ]
+    write_cache(path, {'source_size': 10, 'source_mtime_ns': 1}, batches)
+    return path
+
+
+def test_header_and_columns(cache_file):
+    header, _ = read_header(cache_file)
+    assert header['rows'] == 3
+    with CachedColumns(cache_file) as columns:
+        np.testing.assert_array_equal(columns.values, [1.5, 2.5, 3.5])
+        assert [columns.wkb(i) for i in range(3)] == [b'\x01\x02', b'', b'\x03']
+        assert columns.text('type', 2) == 'mixed'
+        assert columns.text('district', 1) == 'Hiltrup'
+
+
+def test_close_with_values_read_in_block(cache_file):
+    # Values read inside the block stay usable, leaving the block must not raise BufferError
+    with CachedColumns(cache_file) as columns:
+        wkb = columns.wkb(0)
+        values = columns.values.tolist()
+    assert wkb == b'\x01\x02'
+    assert values == [1.5, 2.5, 3.5]
+
+
+def test_close_with_array_still_referenced(cache_file):
+    columns = CachedColumns(cache_file)
+    array = columns.values
+    columns.close()
+    assert array.tolist() == [1.5, 2.5, 3.5]
+
+
+def test_cache_validity_follows_source(tmp_path):
+    csv_path = tmp_path / 'values.csv'
+    csv_path.write_text('header\n')
+    cache = GeometryCache(str(csv_path))
+    assert not cache.is_valid()
+    write_cache(cache.cache_path, source_key(str(csv_path)), [([1.0], [b''], ['a'], ['b'])])
+    assert cache.is_valid()
+    csv_path.write_text('header\nchanged\n')
+    assert not cache.is_valid()
+
+
+def test_truncated_cache_is_not_valid(tmp_path, cache_file):
+    csv_path = tmp_path / 'values.csv'
+    csv_path.write_text('header\n')
+    with open(cache_file, 'rb') as f:
+        start = f.read(20)
+    with open(cache_file, 'wb') as f:
+        f.write(start)
+    assert not GeometryCache(str(csv_path), cache_file).is_valid()
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, monkeypatch):
+    def refuse(*args):
+        raise PermissionError('read-only')
+    monkeypatch.setattr(geometry_cache.os, 'replace', refuse)
+    path = tmp_path / 'values.csv.wkbcache'
+    with pytest.raises(PermissionError):
+        write_cache(str(path), {}, [([1.0], [b''], ['a'], ['b'])])
+    assert list(tmp_path.iterdir()) == []
+
+
+class Loader:
+    # Stands for LandValueLoader, loads without parsing anything
+    batch_size = 10
+
+    def load(self, csv_path, layer, progress=print):
+        return {'rows': 3, 'seconds': 0.1, 'rows_per_sec': 30.0}
+
+
+def test_unwritable_cache_falls_back_to_the_csv(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'values.csv'
+    csv_path.write_text('header\n')
+
+    def build(self, loader):
+        raise PermissionError('read-only folder')
+    monkeypatch.setattr(GeometryCache, 'build', build)
+    result = load_with_cache(str(csv_path), None, Loader())
+    assert result['rows'] == 3
+    assert result['cache_hit'] is False
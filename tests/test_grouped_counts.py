@@ -0,0 +1,72 @@
+import pytest
+
+from grouped_counts import GroupedCounts, compute_grouped_counts
+
+DISTRICTS = ['north', 'south']
+
+# (district row, category, value), None is a NULL category or value
+CELLS = [
+    (0, 'primary', 10.0),
+    (0, 'primary', 20.0),
+    (0, None, 5.0),
+    (0, None, None),
+    (1, 'secondary', 30.0),
+    (1, None, 7.0),
+]
+
+
+def test_null_category_is_counted_like_any_other():
+    counts = GroupedCounts.from_cells(DISTRICTS, CELLS, with_sums=True)
+    assert counts.categories == ['primary', 'secondary', None]
+    assert counts.count('north', None) == 2
+    assert counts.count('south', None) == 1
+    assert counts.count('north', 'secondary') == 0
+    assert counts.count('north', 'unknown') == 0
+    # Without a category every point of the district is counted
+    assert counts.count('north') == counts.total('north') == 4
+    assert counts.total('south') == 2
+
+
+def test_mean_uses_the_cell_count():
+    counts = GroupedCounts.from_cells(DISTRICTS, CELLS, with_sums=True)
+    assert counts.mean('north', 'primary') == 15.0
+    # NULL values count as 0, the mean is over both NULL-category points
+    assert counts.mean('north', None) == 2.5
+    assert counts.mean('south', None) == 7.0
+    assert counts.mean('north', 'secondary') is None
+    assert counts.mean('north', 'unknown') is None
+    assert GroupedCounts.from_cells(DISTRICTS, CELLS).mean('north', 'primary') is None
+
+
+def test_table_and_empty_layer():
+    counts = GroupedCounts.from_cells(DISTRICTS, CELLS)
+    assert counts.table() == [('north', 'primary', 2), ('north', None, 2),
+                              ('south', 'secondary', 1), ('south', None, 1)]
+    empty = GroupedCounts.from_cells(DISTRICTS, [])
+    assert empty.categories == [] and empty.total('north') == 0 and empty.table() == []
+
+
+def test_layer_with_null_categories():
+    core = pytest.importorskip('qgis.core')
+    from qgis.PyQt.QtCore import QVariant
+
+    districts = core.QgsVectorLayer('Polygon?crs=EPSG:3067&field=Name:string', 'districts', 'memory')
+    for name, x in (('north', 0), ('south', 10)):
+        feature = core.QgsFeature(districts.fields())
+        feature.setAttributes([name])
+        feature.setGeometry(core.QgsGeometry.fromWkt(
+            f'POLYGON(({x} 0, {x + 10} 0, {x + 10} 10, {x} 10, {x} 0))'))
+        districts.dataProvider().addFeature(feature)
+
+    points = core.QgsVectorLayer('Point?crs=EPSG:3067&field=SchoolType:string', 'schools', 'memory')
+    for category, x in (('primary', 1), (None, 2), (None, 3), ('primary', 11)):
+        feature = core.QgsFeature(points.fields())
+        feature.setAttributes([QVariant() if category is None else category])
+        feature.setGeometry(core.QgsGeometry.fromWkt(f'POINT({x} 5)'))
+        points.dataProvider().addFeature(feature)
+
+    counts = compute_grouped_counts(districts, points, 'SchoolType')
+    assert counts.categories == ['primary', None]
+    assert counts.count('north', None) == 2
+    assert counts.total('north') == 3
+    assert counts.count('south', None) == 0
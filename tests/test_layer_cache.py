@@ -0,0 +1,61 @@
+from layer_cache import LayerCache
+
+
+class Signal:
+    # Stand-in for a Qt signal
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot):
+        if slot not in self.slots:
+            raise TypeError('not connected')
+        self.slots.remove(slot)
+
+    def emit(self):
+        for slot in list(self.slots):
+            slot()
+
+
+class Layer:
+    def __init__(self, layer_id):
+        self._id = layer_id
+        self.dataChanged = Signal()
+        self.willBeDeleted = Signal()
+
+    def id(self):
+        return self._id
+
+
+def test_value_is_built_once():
+    cache, layer, builds = LayerCache(), Layer('districts'), []
+    for _ in range(3):
+        assert cache.get('key', [layer], lambda: builds.append(1) or 'value') == 'value'
+    assert len(builds) == 1
+    assert len(layer.dataChanged.slots) == 1
+
+
+def test_change_drops_entries_of_the_layer_and_disconnects():
+    cache, districts, schools = LayerCache(), Layer('districts'), Layer('schools')
+    cache.get('pair', [districts, schools], lambda: 'pair')
+    cache.get('districts only', [districts], lambda: 'districts')
+    schools.dataChanged.emit()
+    assert 'pair' not in cache and 'districts only' in cache
+    # No entry uses the schools layer anymore
+    assert schools.dataChanged.slots == [] and schools.willBeDeleted.slots == []
+    assert len(districts.dataChanged.slots) == 1
+
+    districts.willBeDeleted.emit()
+    assert len(cache) == 0
+    assert districts.dataChanged.slots == [] and districts.willBeDeleted.slots == []
+
+
+def test_rebuilt_after_change():
+    cache, layer = LayerCache(), Layer('districts')
+    versions = iter(['v1', 'v2'])
+    assert cache.get('key', [layer], lambda: next(versions)) == 'v1'
+    layer.dataChanged.emit()
+    assert cache.get('key', [layer], lambda: next(versions)) == 'v2'
+    assert len(layer.dataChanged.slots) == 1
@@ -0,0 +1,39 @@
+import struct
+
+import pytest
+
+from map_renderer import PlaceholderRenderer, padded_extent
+
+
+def test_padded_extent():
+    assert padded_extent((0, 0, 10, 20)) == (-1, -2, 11, 22)
+
+
+def test_padded_extent_of_degenerate_extents():
+    # Zero width, e.g. a straight north-south line: padded like its height
+    assert padded_extent((5, 0, 5, 10)) == (4, -1, 6, 11)
+    # A single point
+    assert padded_extent((5, 5, 5, 5), min_padding=2) == (3, 3, 7, 7)
+
+
+def test_placeholder_png(tmp_path):
+    renderer = PlaceholderRenderer(size=(30, 20))
+    path = renderer.render(padded_extent((5, 0, 5, 10)), str(tmp_path / 'map.png'))
+    with open(path, 'rb') as png:
+        data = png.read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    assert struct.unpack('>II', data[16:24]) == (30, 20)
+    assert renderer.rendered_extents == [(4, -1, 6, 11)]
+
+
+def test_profile_pdf_with_placeholder_map(tmp_path):
+    pytest.importorskip('reportlab')
+    from profile_pdf import build_profile_pdf
+
+    renderer = PlaceholderRenderer(size=(60, 40))
+    map_image_path = renderer.render(padded_extent((5, 0, 5, 10)), str(tmp_path / 'map.png'))
+    statistics = {'name': 'Mitte', 'parent_district': 'Münster-Mitte', 'area_km2': 2.5,
+                  'households': 1200, 'parcels': 340, 'feature_type': 'Pools', 'feature_count': 0}
+    output_file = build_profile_pdf(statistics, map_image_path, str(tmp_path / 'Mitte.pdf'))
+    with open(output_file, 'rb') as pdf:
+        assert pdf.read(5) == b'%PDF-'
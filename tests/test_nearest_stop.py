@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from geodesic import geodesic_distance
+from nearest_stop import KDTree, NearestStopIndex, chord_length, unit_vectors
+
+
+@pytest.fixture
+def stops():
+    # Random stops around Münster
+    rng = np.random.default_rng(1)
+    return 7.62 + rng.uniform(-0.1, 0.1, 300), 51.96 + rng.uniform(-0.06, 0.06, 300)
+
+
+def brute_force(points, query, k):
+    distances = np.sqrt(((points[None, :, :] - query[:, None, :]) ** 2).sum(axis=2))
+    order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(distances, order, axis=1)
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points, query = rng.random((500, 3)), rng.random((50, 3))
+    distances, indices = KDTree(points, leaf_size=8).query(query, k=5)
+    np.testing.assert_allclose(distances, brute_force(points, query, 5))
+    np.testing.assert_allclose(np.sqrt(((points[indices] - query[:, None, :]) ** 2).sum(axis=2)), distances)
+
+
+def test_kdtree_with_fewer_points_than_k():
+    distances, indices = KDTree([[0.0, 0.0], [1.0, 0.0]]).query([[0.1, 0.0]], k=3)
+    np.testing.assert_allclose(distances[0, :2], [0.1, 0.9])
+    assert np.isinf(distances[0, 2]) and indices[0].tolist() == [0, 1, -1]
+    assert KDTree(np.empty((0, 2))).query([[0.0, 0.0]])[1].tolist() == [[-1]]
+
+
+def test_kdtree_radius():
+    rng = np.random.default_rng(2)
+    points, query = rng.random((400, 2)), rng.random((10, 2))
+    for point, found in zip(query, KDTree(points).query_radius(query, 0.1)):
+        expected = np.flatnonzero(np.sqrt(((points - point) ** 2).sum(axis=1)) <= 0.1)
+        assert sorted(found.tolist()) == expected.tolist()
+
+
+def test_chord_length_of_unit_vectors():
+    a, b = unit_vectors([7.0, 7.0], [51.0, 52.0])
+    assert np.linalg.norm(a - b) == pytest.approx(chord_length(np.radians(1.0) * 6371008.8))
+
+
+def test_nearest_ranks_by_geodesic_distance(stops):
+    lon, lat = stops
+    index = NearestStopIndex(lon, lat, [f'stop {i}' for i in range(len(lon))], backend='numpy')
+    query_lon, query_lat = np.array([7.62, 7.7]), np.array([51.96, 51.93])
+    distances, positions = index.nearest(query_lon, query_lat, k=3)
+    for row in range(2):
+        expected = np.sort(geodesic_distance(query_lon[row], query_lat[row], lon, lat))[:3]
+        np.testing.assert_allclose(distances[row], expected)
+    assert index.stop(positions[0, 0]) == (positions[0, 0], f'stop {positions[0, 0]}')
+
+
+def test_within_radius(stops):
+    lon, lat = stops
+    index = NearestStopIndex(lon, lat, range(len(lon)), backend='numpy')
+    [found] = index.within(7.62, 51.96, 1500.0)
+    expected = np.flatnonzero(geodesic_distance(7.62, 51.96, lon, lat) <= 1500.0)
+    assert sorted(position for _, position in found) == expected.tolist()
+    assert [distance for distance, _ in found] == sorted(distance for distance, _ in found)
@@ -0,0 +1,12 @@
+from parallel_scan import PARALLEL_MIN_FEATURE_CLASSES, worker_count
+
+
+def test_few_feature_classes_stay_in_this_process():
+    assert worker_count(['a', 'b'], None) == 1
+    assert worker_count(['fc'] * 20, 1) == 1
+
+
+def test_workers_are_capped_by_feature_classes():
+    assert worker_count(['a', 'b'], 4) == 2
+    many = [f'fc{i}' for i in range(PARALLEL_MIN_FEATURE_CLASSES)]
+    assert 1 <= worker_count(many, None) <= len(many)
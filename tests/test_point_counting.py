@@ -0,0 +1,35 @@
+import numpy as np
+
+from point_counting import PolygonSet, count_points_in_polygons, points_in_rings
+
+SQUARE = np.array([(0, 0), (10, 0), (10, 10), (0, 10)], dtype=float)
+HOLE = np.array([(4, 4), (6, 4), (6, 6), (4, 6)], dtype=float)
+
+
+def test_ray_casting_with_hole():
+    x = np.array([1.0, 5.0, 11.0, 9.0, 5.0])
+    y = np.array([1.0, 5.0, 5.0, 9.0, -1.0])
+    assert points_in_rings(x, y, [SQUARE, HOLE]).tolist() == [True, False, False, True, False]
+
+
+def test_closed_ring_and_concave_polygon():
+    # A U shape, the first vertex repeated at the end as in QGIS rings
+    u_shape = np.array([(0, 0), (3, 0), (3, 3), (2, 3), (2, 1), (1, 1), (1, 3), (0, 3), (0, 0)], dtype=float)
+    x = np.array([0.5, 1.5, 2.5, 1.5])
+    y = np.array([2.0, 2.0, 2.0, 0.5])
+    assert points_in_rings(x, y, [u_shape]).tolist() == [True, False, True, True]
+
+
+def test_counts_with_chunks_and_threads():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 20, (5000, 2))
+    polygons = PolygonSet([[SQUARE, HOLE], [SQUARE + 10], []], names=['a', 'b', 'empty'])
+    x, y = points[:, 0], points[:, 1]
+    expected = [
+        np.count_nonzero((x < 10) & (y < 10) & ~((x > 4) & (x < 6) & (y > 4) & (y < 6))),
+        np.count_nonzero((x > 10) & (y > 10)),
+        0,
+    ]
+    assert count_points_in_polygons(points, polygons, workers=1).tolist() == expected
+    assert count_points_in_polygons(points, polygons, chunk_size=700, workers=4).tolist() == expected
+    assert count_points_in_polygons(np.empty((0, 2)), polygons).tolist() == [0, 0, 0]
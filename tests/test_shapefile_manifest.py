@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+
+shapefile = pytest.importorskip('shapefile')
+
+from shapefile_manifest import LazyLayerCatalog, build_manifest, write_manifest
+
+
+def write_points(path, points):
+    with shapefile.Writer(path, shapeType=shapefile.POINT) as writer:
+        writer.field('Name', 'C', size=20)
+        for i, (x, y) in enumerate(points):
+            writer.point(x, y)
+            writer.record(f'point {i}')
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for subfolder, points in (('2023', [(1, 2)]), ('2024', [(3, 4), (5, 6)])):
+        os.makedirs(tmp_path / subfolder)
+        write_points(str(tmp_path / subfolder / 'schools'), points)
+    write_points(str(tmp_path / 'districts'), [(0, 0)])
+    return str(tmp_path)
+
+
+def test_manifest_reads_headers(folder):
+    manifest = {os.path.relpath(entry['path'], folder): entry for entry in build_manifest(folder)}
+    entry = manifest[os.path.join('2024', 'schools.shp')]
+    assert entry['feature_count'] == 2
+    assert [field['name'] for field in entry['fields']] == ['Name']
+
+
+def test_catalog_keeps_shapefiles_with_the_same_name(folder, tmp_path):
+    manifest_path = str(tmp_path / 'catalog.json')
+    write_manifest(folder, manifest_path)
+    catalog = LazyLayerCatalog(manifest_path)
+    assert catalog.names() == ['2023/schools', '2024/schools', 'districts']
+    assert catalog.info('2024/schools')['feature_count'] == 2
+    with open(manifest_path, encoding='utf-8') as manifest_file:
+        assert len(json.load(manifest_file)['layers']) == 3
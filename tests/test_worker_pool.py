@@ -0,0 +1,42 @@
+import multiprocessing
+import multiprocessing.spawn
+import operator
+import os
+
+from worker_pool import map_jobs
+
+
+def double_outside_workers(value):
+    # Kills the worker process, so the pool breaks; runs normally in the main process
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return value * 2
+
+
+def test_results_in_job_order_with_errors():
+    jobs = [(6, 3), (1, 0), (9, 3)]
+    outcomes = list(map_jobs(operator.floordiv, jobs, workers=2))
+    assert [job for job, _, _ in outcomes] == jobs
+    assert [result for _, result, _ in outcomes] == [2, None, 3]
+    assert isinstance(outcomes[1][2], ZeroDivisionError)
+
+
+def test_broken_pool_runs_jobs_here():
+    jobs = [(value,) for value in range(5)]
+    outcomes = list(map_jobs(double_outside_workers, jobs, workers=2, in_flight=2))
+    assert [(result, error) for _, result, error in outcomes] == [(value * 2, None) for value in range(5)]
+
+
+def test_spawn_executable_is_restored():
+    before = multiprocessing.spawn.get_executable()
+    list(map_jobs(operator.neg, [(1,)], workers=1))
+    assert multiprocessing.spawn.get_executable() == before
+
+
+def test_bundled_interpreter_inside_application(monkeypatch):
+    # Inside QGIS sys.executable is the application, the workers still start with python
+    before = multiprocessing.spawn.get_executable()
+    monkeypatch.setattr('sys.executable', os.path.join(os.path.dirname(os.fsdecode(before)), 'qgis-bin'))
+    outcomes = list(map_jobs(operator.neg, [(1,), (2,)], workers=1))
+    assert [result for _, result, _ in outcomes] == [-1, -2]
+    assert multiprocessing.spawn.get_executable() == before